@@ -1,7 +1,13 @@
 # app.py
+# Development server: python app.py (127.0.0.1, debug + reloader).
+# Production (multi-threaded / multi-process, warmed workers): python serve.py
 import os
+import sqlite3
+import time
 from flask import Flask
 
+from job_queue import get_queue
+
 # blueprint that contains the upload/parse/import pages (from earlier)
 from weldadmin_web import bp as weldadmin_bp
 
@@ -10,10 +16,25 @@ app = Flask(__name__, template_folder="templates", static_folder="static")
 # register weldadmin blueprint (which contains /, /upload, /import, /download routes)
 app.register_blueprint(weldadmin_bp)
 
-# minimal health-check API (optional)
+_STARTED_AT = time.time()
+
+
+# health check: this worker process, its server settings (see serve.py) and the job queue
 @app.route("/health")
 def health():
-    return {"status": "ok"}
+    body = {
+        "status": "ok",
+        "pid": os.getpid(),
+        "uptime_s": round(time.time() - _STARTED_AT, 1),
+        "server": app.config.get("WEB_SERVER", {"server": "development"}),
+        "warmup": app.config.get("WEB_WARMUP"),
+    }
+    try:
+        body["jobs"] = get_queue().stats()
+    except sqlite3.Error as e:
+        body["status"], body["error"] = "degraded", f"job queue: {e}"
+        return body, 503
+    return body
 
 if __name__ == "__main__":
     # ensure upload dir exists (blueprint creates it too, but safe to ensure here)
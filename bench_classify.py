@@ -0,0 +1,72 @@
+"""
+bench_classify.py
+-----------------
+Accuracy and latency of the early doc-type classifier
+(ocr.classify_document: page 1 title band, text layer or low-dpi OCR)
+against the full extraction pass.
+
+Each PDF may carry its expected type as <file.pdf>=WPS|PQR|WPQ; otherwise
+the expected type is the one extract_and_parse() detects with the
+classifier disabled (OCR_CLASSIFY=0), and that full pass is timed too.
+
+Usage:
+    python bench_classify.py <file.pdf>[=TYPE] [more.pdf ...]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("OCR_CACHE", "0")
+
+import ocr  # noqa: E402
+from ocr_layouts import CLASSIFY_BAND  # noqa: E402
+
+
+def _full_pass(pdf: str):
+    """(doc type, seconds) from extract_and_parse() without the classifier."""
+    os.environ["OCR_CLASSIFY"] = "0"
+    try:
+        t0 = time.perf_counter()
+        fields = ocr.extract_and_parse(pdf)
+        elapsed = time.perf_counter() - t0
+    finally:
+        os.environ.pop("OCR_CLASSIFY", None)
+    return (fields.get("doc_type") or "").lower() or None, elapsed
+
+
+def main(argv) -> int:
+    if not argv:
+        print(__doc__)
+        return 2
+    rows = []
+    for arg in argv:
+        pdf, _, expected = arg.partition("=")
+        full_s = None
+        if expected:
+            expected = expected.strip().lower()
+        else:
+            expected, full_s = _full_pass(pdf)
+        how = "text" if len(ocr._band_text_layer(pdf, CLASSIFY_BAND).strip()) >= 10 else "ocr"
+        t0 = time.perf_counter()
+        predicted = ocr.classify_document(pdf)
+        rows.append((os.path.basename(pdf), expected, predicted, how, time.perf_counter() - t0, full_s))
+
+    print()
+    print(f"{'file':<38} {'expected':>8} {'early':>6} {'via':>4} {'early ms':>9} {'full s':>7}")
+    for name, expected, predicted, how, early_s, full_s in rows:
+        mark = "" if predicted == expected else "  <- wrong"
+        full = f"{full_s:>7.2f}" if full_s is not None else f"{'-':>7}"
+        print(f"{name[:38]:<38} {expected or '?':>8} {predicted or '?':>6} {how:>4} {early_s * 1000:>9.0f} {full}{mark}")
+    correct = sum(1 for r in rows if r[2] == r[1])
+    for how in ("text", "ocr"):
+        sub = [r for r in rows if r[3] == how]
+        if sub:
+            print(f"{how:>4}: {sum(1 for r in sub if r[2] == r[1])}/{len(sub)} correct, "
+                  f"mean {sum(r[4] for r in sub) / len(sub) * 1000:.0f} ms")
+    print(f"accuracy: {correct}/{len(rows)}")
+    return 0 if correct == len(rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,82 @@
+"""
+bench_ocr_engines.py
+--------------------
+Pages/sec of the OCR engines used by ocr.py:
+
+  pytesseract   one tesseract process per image (image re-encoded to a temp
+                file, traineddata reloaded every call)
+  warm          ocr.TesseractPool: tesserocr instances kept loaded, images
+                passed in memory (needs `pip install tesserocr`)
+
+Each engine OCRs the same pre-rendered full pages, then the same small
+header crops (the ROI path of ocr_layouts.py), where per-call overhead
+dominates.
+
+Usage:
+    python bench_ocr_engines.py <file.pdf> [--pages 3] [--repeat 1] [--threads N] [--layout weldtrace_wps]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("OCR_CACHE", "0")
+
+import ocr  # noqa: E402
+from ocr_layouts import LAYOUT_TEMPLATES, crop_pixels  # noqa: E402
+
+
+def _run(engine: str, images, psm: int, repeat: int, threads: int) -> float:
+    """Seconds to OCR every image `repeat` times with the given engine."""
+    os.environ["OCR_ENGINE"] = engine
+    work = [img for _ in range(repeat) for img in images]
+    t0 = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda im: ocr._ocr_image(im, psm=psm), work))
+    else:
+        for im in work:
+            ocr._ocr_image(im, psm=psm)
+    return time.perf_counter() - t0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("pdf")
+    ap.add_argument("--pages", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--layout", default="weldtrace_wps", choices=sorted(LAYOUT_TEMPLATES))
+    args = ap.parse_args()
+
+    pages = [ocr._preprocess_for_ocr(im) for im in ocr._pdf_to_images(args.pdf, dpi=ocr.OCR_DPI, max_pages=args.pages)]
+    if not pages:
+        print("Could not render the PDF.")
+        return 1
+    template = LAYOUT_TEMPLATES[args.layout]
+    crops = [pages[0].crop(crop_pixels(f.box, *pages[0].size)) for f in template.fields]
+
+    engines = ["pytesseract"]
+    if ocr.tesserocr is not None:
+        ocr._tess_pool().image_to_string(crops[0])  # load traineddata outside the timing
+        engines.append("warm")
+    else:
+        print("tesserocr not installed: only the per-process path is measured.")
+
+    print(f"{args.pdf}: {len(pages)} pages @ {ocr.OCR_DPI} dpi, {len(crops)} header crops, "
+          f"repeat={args.repeat}, threads={args.threads}")
+    print(f"{'engine':<12} {'threads':>7} {'pages/s':>9} {'crops/s':>9}")
+    for engine in engines:
+        for threads in sorted({1, args.threads}):
+            env_engine = "auto" if engine == "warm" else engine
+            t_pages = _run(env_engine, pages, ocr.OCR_PSM, args.repeat, threads)
+            t_crops = _run(env_engine, crops, 7, args.repeat, threads)
+            n = args.repeat
+            print(f"{engine:<12} {threads:>7} {len(pages) * n / t_pages:>9.2f} {len(crops) * n / t_crops:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+bench_preprocess.py
+-------------------
+Compare the OCR preprocessing profiles of ocr_preprocess.py on PDFs that
+still have their text layer (e.g. the original WeldTrace exports):
+
+  * throughput: pages/s of the preprocessing step alone (batched), and
+    pages/s of preprocessing + OCR,
+  * field hit-rate: share of the fields parse_fields() finds in the text
+    layer that come out identical from the OCR'd, preprocessed pages.
+
+The pages are rendered and optionally degraded first to look like poor
+scans (--degrade mild|poor: skew, uneven lighting, low contrast, noise),
+so every profile OCRs the same input.
+
+Usage:
+    python bench_preprocess.py <file.pdf> [more.pdf ...] [--pages 2] [--degrade poor]
+                               [--profiles basic,otsu,sauvola,clean] [--batch 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List
+
+os.environ.setdefault("OCR_CACHE", "0")
+
+import ocr  # noqa: E402
+import ocr_preprocess  # noqa: E402
+from ocr_preprocess import np  # noqa: E402
+
+from PIL import Image  # noqa: E402
+
+# (skew degrees, lighting gradient, contrast, noise sigma)
+_DEGRADE = {
+    "none": (0.0, 0.0, 1.0, 0.0),
+    "mild": (0.8, 40.0, 0.85, 8.0),
+    "poor": (2.0, 90.0, 0.6, 20.0),
+}
+
+
+def _degrade(img: Image.Image, level: str, seed: int) -> Image.Image:
+    skew, gradient, contrast, sigma = _DEGRADE[level]
+    img = ocr._ensure_grayscale(img)
+    if skew:
+        img = img.rotate(skew, resample=Image.BILINEAR, fillcolor=255)
+    if not (gradient or sigma) and contrast == 1.0:
+        return img
+    a = np.asarray(img, dtype=np.float32)
+    a = 255.0 - (255.0 - a) * contrast
+    a -= np.linspace(0.0, gradient, a.shape[1], dtype=np.float32)[None, :]
+    a += np.random.default_rng(seed).normal(0.0, sigma, a.shape).astype(np.float32)
+    return Image.fromarray(np.clip(a, 0, 255).astype(np.uint8))
+
+
+def _norm(value: str) -> str:
+    return " ".join(str(value).split()).lower()
+
+
+def _reference(pdf_path: str, pages: int) -> Dict[str, str]:
+    text = ocr._join_pages([t for t, _ in ocr._text_layer_pages(pdf_path)[:pages]])
+    return {k: v for k, v in ocr.parse_fields(text).items() if v and not k.startswith("_")}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("pdfs", nargs="+")
+    ap.add_argument("--pages", type=int, default=2)
+    ap.add_argument("--degrade", default="poor", choices=sorted(_DEGRADE))
+    ap.add_argument("--profiles", default=",".join(ocr_preprocess.PROFILES))
+    ap.add_argument("--batch", type=int, default=2)
+    args = ap.parse_args()
+
+    if not ocr_preprocess.available():
+        print("NumPy is required for the preprocessing profiles.")
+        return 1
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    unknown = [p for p in profiles if p not in ocr_preprocess.PROFILES]
+    if unknown:
+        print(f"Unknown profile(s): {', '.join(unknown)}")
+        return 2
+
+    docs = []
+    for pdf in args.pdfs:
+        ref = _reference(pdf, args.pages)
+        pages = [_degrade(im, args.degrade, n)
+                 for n, im in enumerate(ocr._pdf_to_images(pdf, dpi=ocr.OCR_DPI, max_pages=args.pages))]
+        if not ref or not pages:
+            print(f"skipping {pdf}: no text-layer fields or could not render")
+            continue
+        docs.append((pdf, ref, pages))
+    if not docs:
+        return 1
+    n_pages = sum(len(p) for _, _, p in docs)
+    n_fields = sum(len(r) for _, r, _ in docs)
+    print(f"{len(docs)} PDFs, {n_pages} pages @ {ocr.OCR_DPI} dpi, degrade={args.degrade}, "
+          f"{n_fields} reference fields, batch={args.batch}")
+    print(f"{'profile':<10} {'prep pages/s':>12} {'total pages/s':>13} {'hit-rate':>9}")
+
+    for profile in profiles:
+        os.environ["OCR_PREPROCESS"] = profile
+        prep_s = ocr_s = 0.0
+        hits = 0
+        misses: List[str] = []
+        for pdf, ref, pages in docs:
+            t0 = time.perf_counter()
+            if profile == "basic":
+                ready = [ocr._preprocess_for_ocr(im) for im in pages]
+            else:
+                ready = []
+                for i in range(0, len(pages), args.batch):
+                    arrays = [np.asarray(im) for im in pages[i:i + args.batch]]
+                    ready += [Image.fromarray(a) for a in ocr_preprocess.preprocess_batch(arrays, profile)]
+            t1 = time.perf_counter()
+            fields = ocr.parse_fields(ocr._join_pages([ocr._ocr_image(im) for im in ready]))
+            t2 = time.perf_counter()
+            prep_s += t1 - t0
+            ocr_s += t2 - t1
+            for key, value in ref.items():
+                if _norm(fields.get(key, "")) == _norm(value):
+                    hits += 1
+                else:
+                    misses.append(f"{os.path.basename(pdf)}:{key}")
+        prep_rate = n_pages / prep_s if prep_s > 0 else float("inf")
+        print(f"{profile:<10} {prep_rate:>12.2f} {n_pages / (prep_s + ocr_s):>13.2f} {hits / n_fields:>8.1%}")
+        if misses:
+            print(f"{'':<10} missed: {', '.join(misses[:8])}{' ...' if len(misses) > 8 else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+bench_render_memory.py
+----------------------
+Per-page memory profile of the PyMuPDF -> OCR handoff in ocr.py:
+
+  rgb    the previous path: RGB pixmap, copied by Image.frombytes(), then
+         converted by _ensure_grayscale() (a third full-page buffer)
+  gray   ocr._pdf_to_images_pymupdf(): grayscale pixmap wrapped by
+         Image.frombuffer() with no copy (see ocr._pixmap_image)
+
+Each (page, path) is measured in a fresh child process: peak RSS growth
+while rendering the page and producing the grayscale image OCR receives.
+Peak RSS comes from resource.getrusage(), so this runs on Linux/macOS only.
+
+Usage:
+    python bench_render_memory.py <file.pdf> [--pages 2] [--dpi 300]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+try:
+    import resource  # POSIX only
+except Exception:  # pragma: no cover
+    resource = None
+
+
+def _peak_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+def _child(pdf_path: str, page_no: int, dpi: int, mode: str) -> None:
+    import fitz  # type: ignore
+    from PIL import Image
+
+    import ocr
+
+    # Warm up fonts / PIL codecs at low resolution so only the page's own buffers count
+    with fitz.open(pdf_path) as doc:
+        doc.load_page(page_no - 1).get_pixmap(dpi=36, alpha=False)
+    ocr._ensure_grayscale(Image.new("RGB", (8, 8)))
+    base = _peak_mb()
+
+    t0 = time.perf_counter()
+    if mode == "rgb":
+        with fitz.open(pdf_path) as doc:
+            zoom = dpi / 72.0
+            pix = doc.load_page(page_no - 1).get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+            del pix
+        img = ocr._ensure_grayscale(img)
+    else:
+        img = next(ocr._pdf_to_images_pymupdf(pdf_path, dpi=dpi, max_pages=page_no, first_page=page_no))
+        img = ocr._ensure_grayscale(img)
+    elapsed = time.perf_counter() - t0
+
+    print(json.dumps({
+        "peak_mb": _peak_mb() - base,
+        "page_mb": img.width * img.height / (1024 * 1024),
+        "size": img.size,
+        "ms": elapsed * 1000,
+    }))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("pdf")
+    ap.add_argument("--pages", type=int, default=2)
+    ap.add_argument("--dpi", type=int, default=300)
+    ap.add_argument("--child", nargs=2, metavar=("PAGE", "MODE"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if resource is None:
+        print("Peak RSS needs the POSIX resource module (Linux/macOS).")
+        return 1
+    if args.child:
+        _child(args.pdf, int(args.child[0]), args.dpi, args.child[1])
+        return 0
+
+    print(f"{args.pdf} @ {args.dpi} dpi: peak RSS growth per page (fresh process per measurement)")
+    print(f"{'page':>4} {'size':>11} {'gray MB':>8} {'rgb peak':>9} {'gray peak':>10} {'saved':>7} {'rgb ms':>7} {'gray ms':>8}")
+    for page_no in range(1, args.pages + 1):
+        res = {}
+        for mode in ("rgb", "gray"):
+            out = subprocess.run(
+                [sys.executable, __file__, args.pdf, "--dpi", str(args.dpi), "--child", str(page_no), mode],
+                capture_output=True, text=True,
+            )
+            lines = [ln for ln in out.stdout.splitlines() if ln.startswith("{")]
+            if out.returncode or not lines:
+                print(f"page {page_no} ({mode}) failed:\n{out.stderr.strip()}")
+                return 1
+            res[mode] = json.loads(lines[-1])
+        rgb, gray = res["rgb"], res["gray"]
+        size = "x".join(map(str, gray["size"]))
+        print(f"{page_no:>4} {size:>11} {gray['page_mb']:>8.1f} {rgb['peak_mb']:>8.1f}M {gray['peak_mb']:>9.1f}M "
+              f"{rgb['peak_mb'] - gray['peak_mb']:>6.1f}M {rgb['ms']:>7.0f} {gray['ms']:>8.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,7 +31,7 @@ from tkinter import ttk, filedialog, messagebox
 
 # Import your ingestion pipeline
 try:
-    from ingestion_pipeline import Repo, ingest_pdf
+    from ingestion_pipeline import Repo, ingest_many
 except Exception as e:
     raise SystemExit(
         "Could not import ingestion_pipeline. Ensure ingestion_pipeline.py is next to this file.\n" + str(e)
@@ -64,11 +64,14 @@ class ImportWorker(threading.Thread):
                 repo = Repo(Path(self.db_or_repo))
                 owns_repo = True
 
-            for f in self.files:
-                try:
-                    res = ingest_pdf(repo, f)
+            # Files overlap render/OCR/store; each result is posted as soon as it is stored
+            pending = list(self.files)
+            try:
+                for f, res in ingest_many(repo, self.files):
+                    pending.remove(f)
                     self.out_q.put(("RESULT", f, res))
-                except Exception as e:
+            except Exception as e:
+                for f in pending:
                     self.out_q.put(("ERROR", f, str(e)))
         finally:
             if owns_repo and repo is not None:
@@ -11,7 +11,11 @@ Features kept:
 - Drag & Drop on Import tab (drop file)
 - Drag & Drop in Bulk Import dialog (drop folder onto Folder box, or files into list)
 - Bulk Import with progress bar + per-file status
-- Search/Filter, Edit, Export, Delete, Auto-DB
+- Bulk Import runs in the background: parallel OCR workers feed a single
+  DB writer that commits in batches; Pause / Resume / Cancel supported
+  (worker count: env BULK_IMPORT_WORKERS)
+- Search/Filter (SQLite FTS5 word-prefix search when available), Edit,
+  Export, Delete, Auto-DB
 
 Run:
     python import_wps_manager_v6_1_bulk_integrated_dnd.py
@@ -20,8 +24,11 @@ Run:
 import os
 import json
 import csv
+import queue
 import re
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -71,6 +78,12 @@ try:
 except Exception:
     fitz = None
 
+# Warm in-process Tesseract pool from ocr.py (used when tesserocr is installed)
+try:
+    from ocr import warm_image_to_string  # type: ignore
+except Exception:
+    warm_image_to_string = None
+
 # ---------------- Parser import (with safe fallback) ----------------
 try:
     from parser_weldadmin import parse_fields as _parse_fields_ext, parse_weldtrace_layout as _parse_wt_ext  # type: ignore
@@ -154,9 +167,16 @@ else:
         return _parse_wt_ext(text)
 
 # ---------------- Pattern-safe PDF rendering ----------------
-def _render_with_pymupdf(path: str, max_pages: int = 3, dpi: int = 300) -> List[Image.Image]:
+# PyMuPDF is not thread-safe; bulk import renders from several workers
+_FITZ_LOCK = threading.Lock()
+
+def _render_with_pymupdf(path: str, max_pages: int = 3, dpi: int = 300, first_page: int = 1) -> List[Image.Image]:
     if not fitz:
         return []
+    with _FITZ_LOCK:
+        return _render_with_pymupdf_locked(path, max_pages, dpi, first_page)
+
+def _render_with_pymupdf_locked(path: str, max_pages: int, dpi: int, first_page: int = 1) -> List[Image.Image]:
     imgs: List[Image.Image] = []
     try:
         doc = fitz.open(path)
@@ -164,10 +184,12 @@ def _render_with_pymupdf(path: str, max_pages: int = 3, dpi: int = 300) -> List[
             n = min(len(doc), max_pages)
             zoom = dpi / 72.0
             mat = fitz.Matrix(zoom, zoom)
-            for i in range(n):
+            for i in range(first_page - 1, n):
                 page = doc.load_page(i)
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-                img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                # Grayscale, wrapped without copying; the image keeps its pixmap alive
+                pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+                img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+                img._pixmap = pix
                 imgs.append(img)
         finally:
             doc.close()
@@ -175,26 +197,29 @@ def _render_with_pymupdf(path: str, max_pages: int = 3, dpi: int = 300) -> List[
         pass
     return imgs
 
-def _render_with_poppler(path: str, poppler_path: str = None, max_pages: int = 3, dpi: int = 300) -> List[Image.Image]:
+def _render_with_poppler(path: str, poppler_path: str = None, max_pages: int = 3, dpi: int = 300,
+                         first_page: int = 1) -> List[Image.Image]:
     if not convert_from_path:
         return []
     try:
         images = convert_from_path(
-            path, dpi=dpi, poppler_path=poppler_path, first_page=1, last_page=max_pages,
+            path, dpi=dpi, poppler_path=poppler_path, first_page=first_page, last_page=max_pages,
             fmt="png", thread_count=1, use_pdftocairo=True, grayscale=True
         )
         return images
     except Exception:
         try:
             images = convert_from_path(
-                path, dpi=dpi, poppler_path=poppler_path, first_page=1, last_page=max_pages,
+                path, dpi=dpi, poppler_path=poppler_path, first_page=first_page, last_page=max_pages,
                 fmt="png", thread_count=1, use_pdftocairo=True
             )
             return images
         except Exception:
             return []
 
-def render_pdf_to_images(path: str, poppler_path: str = None, max_pages: int = 3, dpi: int = 300) -> List[Image.Image]:
+def render_pdf_to_images(path: str, poppler_path: str = None, max_pages: int = 3, dpi: int = 300,
+                         first_page: int = 1) -> List[Image.Image]:
+    """Render pages first_page..max_pages (1-based, inclusive)."""
     backend = (os.getenv("OCR_RASTER_BACKEND") or "").strip().lower()
     order = []
     if backend == "pymupdf":
@@ -204,7 +229,8 @@ def render_pdf_to_images(path: str, poppler_path: str = None, max_pages: int = 3
     else:
         order = ["pymupdf", "poppler"]  # prefer PyMuPDF
     for b in order:
-        imgs = _render_with_pymupdf(path, max_pages, dpi) if b == "pymupdf" else _render_with_poppler(path, poppler_path, max_pages, dpi)
+        imgs = (_render_with_pymupdf(path, max_pages, dpi, first_page) if b == "pymupdf"
+                else _render_with_poppler(path, poppler_path, max_pages, dpi, first_page))
         if imgs:
             return imgs
     return []
@@ -215,29 +241,49 @@ def set_tesseract_path(tesseract_path: str):
     if pytesseract and tesseract_path:
         pytesseract.pytesseract.tesseract_cmd = tesseract_path
 
+def _image_to_string(img) -> str:
+    """OCR one image: warm tesserocr pool when available, else a pytesseract process."""
+    if warm_image_to_string is not None:
+        text = warm_image_to_string(img, psm=3)  # psm 3 = pytesseract's default
+        if text is not None:
+            return text
+    return pytesseract.image_to_string(img)
+
+# A page's text layer is used when it has at least this many characters;
+# sparser pages (scans, signature pages) are OCR'd on their own
+TEXT_PAGE_MIN_CHARS = 50
+
 def extract_text_from_pdf(path: str, poppler_path: str = None, use_ocr_if_needed: bool = True, max_pages_ocr: int = 3) -> str:
-    text_parts: List[str] = []
-    text = ""
+    page_texts: List[str] = []
     if pdfplumber:
         try:
             with pdfplumber.open(path) as pdf:
                 for page in pdf.pages:
-                    t = page.extract_text() or ""
-                    if t.strip():
-                        text_parts.append(t)
-            text = "\n".join(text_parts).strip()
+                    page_texts.append(page.extract_text() or "")
         except Exception:
-            text = ""
-    if not text and use_ocr_if_needed and pytesseract:
-        images = render_pdf_to_images(path, poppler_path=poppler_path, max_pages=max_pages_ocr, dpi=300)
-        if images:
-            ocr_texts = []
-            for img in images:
-                try:
-                    ocr_texts.append(pytesseract.image_to_string(img))
-                except Exception:
-                    pass
-            text = "\n".join(ocr_texts)
+            page_texts = []
+    sparse = [n for n, t in enumerate(page_texts, 1) if len(t.strip()) < TEXT_PAGE_MIN_CHARS]
+    if use_ocr_if_needed and pytesseract:
+        if not page_texts or len(sparse) == len(page_texts):
+            # no text layer at all: OCR the first pages as a whole
+            images = render_pdf_to_images(path, poppler_path=poppler_path, max_pages=max_pages_ocr, dpi=300)
+            if images:
+                page_texts = []
+                for img in images:
+                    try:
+                        page_texts.append(_image_to_string(img))
+                    except Exception:
+                        pass
+        else:
+            # mixed document: OCR only the image-only pages
+            for n in sparse[:max_pages_ocr]:
+                images = render_pdf_to_images(path, poppler_path=poppler_path, max_pages=n, dpi=300, first_page=n)
+                if images:
+                    try:
+                        page_texts[n - 1] = _image_to_string(images[0])
+                    except Exception:
+                        pass
+    text = "\n".join(t for t in page_texts if t.strip())
     return normalize_text(text)
 
 def extract_text_from_image(path: str) -> str:
@@ -245,7 +291,7 @@ def extract_text_from_image(path: str) -> str:
         return ""
     try:
         img = Image.open(path)
-        return normalize_text(pytesseract.image_to_string(img))
+        return normalize_text(_image_to_string(img))
     except Exception:
         return ""
 
@@ -277,8 +323,58 @@ DB_NAME = "weld_docs.db"
 TABLE_NAME = "weld_documents"
 ALLOWED_EXTS = (".pdf", ".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp")
 
-def ensure_db():
-    conn = sqlite3.connect(DB_NAME)
+_SCHEMA_READY = set()  # DB paths whose schema was set up by this process
+_FTS_READY = {}        # DB path -> True if the FTS5 index exists there
+
+# Columns matched by the Records search box (LIKE fallback uses the first ten)
+SEARCH_COLS = [
+    "doc_code", "pqr", "process", "material", "gas",
+    "filler", "positions", "issue_date", "expiry_date", "code_family",
+    "raw_text",
+]
+FTS_TABLE = f"{TABLE_NAME}_fts"
+
+def _ensure_fts(cur) -> bool:
+    """
+    External-content FTS5 index over SEARCH_COLS, kept in sync by triggers.
+    Returns False when this SQLite build has no FTS5.
+    """
+    cols = ", ".join(SEARCH_COLS)
+    new_cols = ", ".join(f"new.{c}" for c in SEARCH_COLS)
+    old_cols = ", ".join(f"old.{c}" for c in SEARCH_COLS)
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (FTS_TABLE,))
+    existed = cur.fetchone() is not None
+    try:
+        cur.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                {cols}, content='{TABLE_NAME}', content_rowid='id'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return False
+    cur.executescript(f"""
+        CREATE TRIGGER IF NOT EXISTS {TABLE_NAME}_ai AFTER INSERT ON {TABLE_NAME} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {TABLE_NAME}_ad AFTER DELETE ON {TABLE_NAME} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {TABLE_NAME}_au AFTER UPDATE ON {TABLE_NAME} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END;
+    """)
+    if not existed:
+        # Index rows stored before the FTS table was added
+        cur.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+def ensure_db(db_path: str = None, force: bool = False):
+    """Create the table/indexes; runs once per DB file per process."""
+    db_path = db_path or DB_NAME
+    if not force and db_path in _SCHEMA_READY and os.path.exists(db_path):
+        return
+    conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     cur.execute(f"""
         CREATE TABLE IF NOT EXISTS {TABLE_NAME}(
@@ -305,7 +401,10 @@ def ensure_db():
     cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_path ON {TABLE_NAME}(file_path)")
     cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_code ON {TABLE_NAME}(doc_code)")
     conn.commit()
+    _FTS_READY[db_path] = _ensure_fts(cur)
+    conn.commit()
     conn.close()
+    _SCHEMA_READY.add(db_path)
 
 def _normalize_iso_date(s: str) -> str:
     s = (s or "").strip()
@@ -343,16 +442,16 @@ def _normalize_thickness(s: str) -> str:
         return f"{a}-{b} mm"
     return s
 
-def save_to_db(file_path: str, data: dict):
-    ensure_db()
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute(f"""
-        INSERT INTO {TABLE_NAME}(
-            file_path, doc_type, doc_code, pqr, process, material, thickness, gas, filler,
-            positions, issue_date, expiry_date, code_family, confidence, parser_excerpt, raw_text
-        ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-    """, (
+_INSERT_SQL = f"""
+    INSERT INTO {TABLE_NAME}(
+        file_path, doc_type, doc_code, pqr, process, material, thickness, gas, filler,
+        positions, issue_date, expiry_date, code_family, confidence, parser_excerpt, raw_text
+    ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+"""
+
+def _record_row(file_path: str, data: dict) -> tuple:
+    """Parameters for _INSERT_SQL from an extract_and_parse() result."""
+    return (
         file_path,
         data.get("type"),
         data.get("code"),
@@ -369,18 +468,109 @@ def save_to_db(file_path: str, data: dict):
         data.get("_parser_confidence") or data.get("confidence"),
         data.get("_parser_excerpt") or data.get("parser_excerpt"),
         data.get("_raw_text") or data.get("raw_text"),
-    ))
-    conn.commit()
-    conn.close()
+    )
+
+class RecordWriter:
+    """
+    Long-lived writer for the records table: one open connection, schema
+    set up once, inserts grouped into transactions of `batch_size` rows
+    (executemany). The file_paths already stored are loaded once, so
+    exists() is a set lookup rather than a query per file.
+
+    Not thread-safe by itself: the bulk pipeline only writes from its
+    writer thread, and save_to_db() serializes the shared instance.
+    """
+
+    def __init__(self, db_path: str = None, batch_size: int = 50):
+        self.db_path = db_path or DB_NAME
+        self.batch_size = max(1, batch_size)
+        ensure_db(self.db_path)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.known = set()
+        self._pending = []  # (tag, row) waiting for the next commit
+        self.reload_known()
+
+    def reload_known(self):
+        rows = self.conn.execute(f"SELECT DISTINCT file_path FROM {TABLE_NAME}")
+        self.known = {r[0] for r in rows}
+
+    def exists(self, file_path: str) -> bool:
+        return file_path in self.known
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, file_path: str, data: dict, tag=None):
+        """Queue one record; commits when the batch is full. Returns flush() results."""
+        self._pending.append((tag, _record_row(file_path, data)))
+        self.known.add(file_path)
+        if len(self._pending) >= self.batch_size:
+            return self.flush()
+        return []
+
+    def flush(self):
+        """Commit queued records. Returns [(tag, error message or None)]."""
+        if not self._pending:
+            return []
+        pending, self._pending = self._pending, []
+        try:
+            with self.conn:
+                self.conn.executemany(_INSERT_SQL, [row for _, row in pending])
+            return [(tag, None) for tag, _ in pending]
+        except sqlite3.Error:
+            pass
+        # Retry row by row so one bad record doesn't fail the whole batch
+        results = []
+        for tag, row in pending:
+            try:
+                with self.conn:
+                    self.conn.execute(_INSERT_SQL, row)
+                results.append((tag, None))
+            except sqlite3.Error as e:
+                self.known.discard(row[0])
+                results.append((tag, str(e)))
+        return results
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_WRITER = None
+_WRITER_LOCK = threading.Lock()
+
+def _default_writer() -> RecordWriter:
+    """Shared single-row writer behind save_to_db() / record_exists()."""
+    global _WRITER
+    if _WRITER is None or _WRITER.db_path != DB_NAME or not os.path.exists(DB_NAME):
+        if _WRITER is not None:
+            _WRITER.conn.close()
+        _WRITER = RecordWriter(DB_NAME, batch_size=1)
+    return _WRITER
+
+def save_to_db(file_path: str, data: dict):
+    with _WRITER_LOCK:
+        for _, err in _default_writer().add(file_path, data):
+            if err:
+                raise sqlite3.DatabaseError(err)
 
 def record_exists(file_path: str) -> bool:
-    ensure_db()
-    conn = sqlite3.connect(DB_NAME)
-    cur = conn.cursor()
-    cur.execute(f"SELECT 1 FROM {TABLE_NAME} WHERE file_path = ? LIMIT 1", (file_path,))
-    row = cur.fetchone()
-    conn.close()
-    return bool(row)
+    with _WRITER_LOCK:
+        return _default_writer().exists(file_path)
+
+def _reload_known_paths():
+    """Resync record_exists() after rows were added or removed elsewhere."""
+    with _WRITER_LOCK:
+        if _WRITER is not None:
+            _WRITER.reload_known()
 
 def update_record(row_id: int, payload: dict):
     ensure_db()
@@ -414,29 +604,46 @@ def fetch_record(row_id: int):
     conn.close()
     return row
 
+_RECORD_COLS = [
+    "id", "file_path", "doc_type", "doc_code", "pqr", "process", "material", "thickness", "gas", "filler",
+    "positions", "issue_date", "expiry_date", "code_family", "confidence", "parser_excerpt", "raw_text", "created_at",
+]
+
+def _fts_query(search_text: str) -> str:
+    """'sa 304' -> '"sa"* AND "304"*' (every word, prefix match); '' if no words."""
+    words = re.findall(r"\w+", search_text)
+    return " AND ".join('"' + w.replace('"', '""') + '"*' for w in words)
+
 def query_records(doc_type="ALL", search_text="", limit=1000):
     ensure_db()
     conn = sqlite3.connect(DB_NAME)
     cur = conn.cursor()
     where = []
     params = []
+    join = ""
+    order = "d.id"
     if doc_type and doc_type != "ALL":
-        where.append("doc_type = ?")
+        where.append("d.doc_type = ?")
         params.append(doc_type)
-    if search_text:
+    match = _fts_query(search_text) if search_text and _FTS_READY.get(DB_NAME) else ""
+    if match:
+        join = f"JOIN {FTS_TABLE} ON {FTS_TABLE}.rowid = d.id"
+        where.append(f"{FTS_TABLE} MATCH ?")
+        params.append(match)
+        # Same order as d.id, but lets FTS5 walk its index backwards and
+        # stop at LIMIT instead of sorting every hit
+        order = f"{FTS_TABLE}.rowid"
+    elif search_text:
         like = f"%{search_text}%"
-        where.append("(" + " OR ".join([
-            "doc_code LIKE ?","pqr LIKE ?","process LIKE ?","material LIKE ?","gas LIKE ?",
-            "filler LIKE ?","positions LIKE ?","issue_date LIKE ?","expiry_date LIKE ?","code_family LIKE ?"
-        ]) + ")")
+        where.append("(" + " OR ".join(f"d.{c} LIKE ?" for c in SEARCH_COLS[:10]) + ")")
         params.extend([like]*10)
     where_clause = "WHERE " + " AND ".join(where) if where else ""
     sql = f"""
-        SELECT id, file_path, doc_type, doc_code, pqr, process, material, thickness, gas, filler,
-               positions, issue_date, expiry_date, code_family, confidence, parser_excerpt, raw_text, created_at
-        FROM {TABLE_NAME}
+        SELECT {", ".join("d." + c for c in _RECORD_COLS)}
+        FROM {TABLE_NAME} AS d
+        {join}
         {where_clause}
-        ORDER BY id DESC
+        ORDER BY {order} DESC
         LIMIT ?
     """
     params.append(limit)
@@ -455,6 +662,145 @@ def delete_records(ids):
     cur.execute(f"DELETE FROM {TABLE_NAME} WHERE id IN ({qmarks})", ids)
     conn.commit()
     conn.close()
+    _reload_known_paths()
+
+# ---------------- Bulk import pipeline ----------------
+def _bulk_workers() -> int:
+    try:
+        n = int(os.getenv("BULK_IMPORT_WORKERS") or 0)
+    except ValueError:
+        n = 0
+    return n if n > 0 else max(1, min(4, os.cpu_count() or 1))
+
+def _bulk_batch_size() -> int:
+    try:
+        n = int(os.getenv("BULK_IMPORT_BATCH") or 0)
+    except ValueError:
+        n = 0
+    return n if n > 0 else 20
+
+class BulkImportPipeline:
+    """
+    Background bulk import, so the Tk main thread only draws progress:
+
+        feeder thread -> OCR worker pool (extract_and_parse) -> DB writer thread
+
+    The feeder skips duplicates and keeps at most 2 x workers files
+    queued for OCR. The writer thread owns a RecordWriter (one connection,
+    batched transactions); a file is reported "Imported" once its batch
+    commits.
+
+    Progress goes onto the thread-safe `events` queue, drained by the
+    dialog with after():
+        ("status", index, text)         final status of files[index]
+        ("done", processed, cancelled)  all threads have finished; `processed`
+                                        counts Imported / Error / Skipped files
+                                        (not the ones dropped by a cancel)
+    """
+
+    def __init__(self, files, skip_dups: bool = True, workers: int = None, batch_size: int = None):
+        self.files = list(files)
+        self.skip_dups = skip_dups
+        self.workers = workers or _bulk_workers()
+        self.batch_size = batch_size or _bulk_batch_size()
+        self.writer = None
+        self.events = queue.Queue()
+        self._results = queue.Queue()
+        self._slots = threading.Semaphore(self.workers * 2)
+        self._resume = threading.Event()
+        self._resume.set()
+        self._cancel = threading.Event()
+        self._finished = 0
+
+    # ----- control (safe from the Tk thread) -----
+    def start(self):
+        self.writer = RecordWriter(batch_size=self.batch_size)
+        threading.Thread(target=self._feed, name="bulk-feeder", daemon=True).start()
+        threading.Thread(target=self._write, name="bulk-writer", daemon=True).start()
+
+    def pause(self):
+        self._resume.clear()
+
+    def resume(self):
+        self._resume.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resume.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        self._resume.set()  # wake a paused feeder so it can stop
+
+    # ----- stages -----
+    def _status(self, idx: int, text: str):
+        if text != "Cancelled":
+            self._finished += 1
+        self.events.put(("status", idx, text))
+
+    def _feed(self):
+        seen = set()
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-ocr")
+        idx = 0
+        try:
+            for idx, path in enumerate(self.files):
+                self._resume.wait()
+                if self._cancel.is_set():
+                    break
+                if self.skip_dups and (path in seen or self.writer.exists(path)):
+                    self._results.put((idx, path, None, "Skipped (duplicate)"))
+                    continue
+                seen.add(path)
+                while not self._slots.acquire(timeout=0.2):
+                    if self._cancel.is_set():
+                        break
+                if self._cancel.is_set():
+                    break
+                fut = pool.submit(extract_and_parse, path)
+                fut.add_done_callback(lambda f, i=idx, p=path: self._ocr_done(f, i, p))
+            else:
+                idx = len(self.files)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=self._cancel.is_set())
+            for i in range(idx, len(self.files)):
+                self._results.put((i, self.files[i], None, "Cancelled"))
+            self._results.put(None)
+
+    def _ocr_done(self, fut, idx: int, path: str):
+        self._slots.release()
+        if fut.cancelled():
+            self._results.put((idx, path, None, "Cancelled"))
+        elif fut.exception() is not None:
+            self._results.put((idx, path, None, f"Error: {fut.exception()}"))
+        else:
+            self._results.put((idx, path, fut.result() or {}, None))
+
+    def _write(self):
+        writer = self.writer
+        try:
+            while True:
+                try:
+                    # Commit a partial batch as soon as the OCR stage goes quiet
+                    item = self._results.get(timeout=0.5) if writer.pending else self._results.get()
+                except queue.Empty:
+                    self._report(writer.flush())
+                    continue
+                if item is None:
+                    break
+                idx, path, data, status = item
+                if data is None:
+                    self._status(idx, status)
+                    continue
+                self._report(writer.add(path, data, tag=idx))
+            self._report(writer.flush())
+        finally:
+            writer.close()
+            _reload_known_paths()
+            self.events.put(("done", self._finished, self._cancel.is_set()))
+
+    def _report(self, results):
+        for idx, err in results:
+            self._status(idx, "Imported" if err is None else f"Error: {err}")
 
 # ---------------- Utilities for Drag & Drop ----------------
 def _split_dnd_paths(widget, data: str):
@@ -860,6 +1206,9 @@ class BulkImportDialog(BaseToplevel):
         self.dir_var = tk.StringVar()
         self.skip_dups = tk.BooleanVar(value=True)
         self.files = []
+        self.pipeline = None
+        self._poll_id = None
+        self._done = 0
 
         row = ttk.Frame(self, padding=8)
         row.pack(fill="x")
@@ -908,7 +1257,12 @@ class BulkImportDialog(BaseToplevel):
         ttk.Button(btns, text="Scan Folder", command=self.scan_folder).pack(side="left")
         self.btn_start = ttk.Button(btns, text="Start Import", command=self.start_import, state="disabled")
         self.btn_start.pack(side="left", padx=6)
-        ttk.Button(btns, text="Close", command=self.destroy).pack(side="right")
+        self.btn_pause = ttk.Button(btns, text="Pause", command=self.toggle_pause, state="disabled")
+        self.btn_pause.pack(side="left")
+        self.btn_cancel = ttk.Button(btns, text="Cancel", command=self.cancel_import, state="disabled")
+        self.btn_cancel.pack(side="left", padx=6)
+        ttk.Button(btns, text="Close", command=self._on_close).pack(side="right")
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         tip = "Tip: Drag a folder to the Folder box; or drop files onto the list." if HAVE_DND else "Tip: Install 'tkinterdnd2' for drag & drop (pip install tkinterdnd2)."
         ttk.Label(self, text=tip).pack(anchor="w", padx=10, pady=(0,8))
@@ -925,6 +1279,8 @@ class BulkImportDialog(BaseToplevel):
         messagebox.showinfo("Drag & Drop", "Please drop a folder onto the Folder box.")
 
     def _on_drop_files(self, event):
+        if self.pipeline:
+            return
         items = _split_dnd_paths(self.tree, event.data)
         allowed = [p for p in items if os.path.splitext(p)[1].lower() in ALLOWED_EXTS and os.path.exists(p)]
         if not allowed:
@@ -943,6 +1299,9 @@ class BulkImportDialog(BaseToplevel):
             self.dir_var.set(d)
 
     def scan_folder(self):
+        if self.pipeline:
+            messagebox.showinfo("Bulk Import", "Wait for the running import to finish (or cancel it).")
+            return
         root = self.dir_var.get().strip()
         if not root or not os.path.isdir(root):
             messagebox.showerror("Folder", "Please choose a valid folder.")
@@ -968,35 +1327,80 @@ class BulkImportDialog(BaseToplevel):
         self.lbl_prog.config(text=f"0 / {len(self.files)}")
 
     def start_import(self):
-        if not self.files:
+        if not self.files or self.pipeline:
             return
         self.btn_start.config(state="disabled")
-        total = len(self.files)
-        done = 0
-        for iid, fp in zip(self.tree.get_children(), self.files):
-            if self.skip_dups.get() and record_exists(fp):
-                self.tree.set(iid, "status", "Skipped (duplicate)")
-                done += 1
-                self.pb['value'] = (done / total) * 100
-                self.lbl_prog.config(text=f"{done} / {total}")
-                self.update_idletasks()
-                continue
+        self.btn_pause.config(state="normal", text="Pause")
+        self.btn_cancel.config(state="normal")
+        self._done = 0
+        self.pb['value'] = 0
+        self.lbl_prog.config(text=f"0 / {len(self.files)}")
+        self.pipeline = BulkImportPipeline(self.files, skip_dups=self.skip_dups.get())
+        self.pipeline.start()
+        self._poll_id = self.after(100, self._poll_pipeline)
 
-            try:
-                data = extract_and_parse(fp) or {}
-                save_to_db(fp, data)
-                self.tree.set(iid, "status", "Imported")
-            except Exception as e:
-                self.tree.set(iid, "status", f"Error: {e}")
-            done += 1
-            self.pb['value'] = (done / total) * 100
-            self.lbl_prog.config(text=f"{done} / {total}")
-            self.update_idletasks()
-
-        messagebox.showinfo("Bulk Import", f"Completed: {done} file(s).")
+    def toggle_pause(self):
+        if not self.pipeline:
+            return
+        if self.pipeline.paused:
+            self.pipeline.resume()
+            self.btn_pause.config(text="Pause")
+        else:
+            self.pipeline.pause()
+            self.btn_pause.config(text="Resume")
+
+    def cancel_import(self):
+        if self.pipeline:
+            self.pipeline.cancel()
+            self.btn_pause.config(state="disabled")
+            self.btn_cancel.config(state="disabled")
+
+    def _poll_pipeline(self):
+        self._poll_id = None
+        pipeline = self.pipeline
+        total = len(pipeline.files)
+        items = self.tree.get_children()
+        finished = None
+        try:
+            for _ in range(500):  # keep each tick short on huge folders
+                ev = pipeline.events.get_nowait()
+                if ev[0] == "status":
+                    _, idx, text = ev
+                    self.tree.set(items[idx], "status", text)
+                    self._done += 1
+                elif ev[0] == "done":
+                    finished = ev
+                    break
+        except queue.Empty:
+            pass
+        self.pb['value'] = (self._done / total) * 100 if total else 100
+        self.lbl_prog.config(text=f"{self._done} / {total}")
+
+        if finished is None:
+            self._poll_id = self.after(100, self._poll_pipeline)
+            return
+
+        self.pipeline = None
+        self.btn_pause.config(state="disabled", text="Pause")
+        self.btn_cancel.config(state="disabled")
+        _, done, cancelled = finished
+        if cancelled:
+            messagebox.showinfo("Bulk Import", f"Cancelled after {done} of {total} file(s).")
+        else:
+            messagebox.showinfo("Bulk Import", f"Completed: {done} file(s).")
         if self.on_done:
             self.on_done()
 
+    def _on_close(self):
+        if self.pipeline:
+            # Finish the in-flight files in the background, drop the rest
+            self.pipeline.cancel()
+            self.pipeline = None
+        if self._poll_id:
+            self.after_cancel(self._poll_id)
+            self._poll_id = None
+        self.destroy()
+
 # ---------------- Main app ----------------
 class MainApp(BaseTk):
     def __init__(self):
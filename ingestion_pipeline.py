@@ -11,22 +11,65 @@ This module gives you a production‑ready ingestion pipeline for WPS/PQR/WPQR P
 - Simple CLI usage examples at bottom
 
 No external Python packages required beyond standard library + sqlite3.
+With PyMuPDF installed, pages are rendered in memory and piped straight into
+tesseract (no temp files); otherwise Poppler/Ghostscript + temp files are used.
+Set INGEST_OCR_PATH=inprocess|subprocess to force one path. Per-stage timings
+are reported on IngestResult.timings.
+ingest_many() runs several files as a staged pipeline (render | OCR workers |
+parse + store) with bounded queues, yielding results as files finish; the
+`ingest` CLI and gui_import use it. INGEST_WORKERS sets the OCR worker count.
+External binaries (tesseract, pdftoppm, pdftocairo, Ghostscript) are resolved
+and version-checked once, cached in ingest_toolchain.json (INGEST_TOOLCHAIN_PATH)
+and shown/refreshed with the `toolchain` subcommand.
+Adaptive resolution (in-process path): INGEST_DPI_LADDER=150,300 OCRs each page
+at the lowest dpi and re-renders only pages below INGEST_MIN_CONF (default 70)
+mean word confidence, or a first page without a WPS/PQR/Welder anchor; the dpi
+used per page is reported as timings["page_dpi"].
+With tesserocr installed the in-process path OCRs the raw pixmap on the warm
+Tesseract pool from ocr.py (ocr.TesseractPool: bounded, closed at exit; no
+tesseract process per page); the temp-file fallback
+OCRs all page images in one tesseract run via a list file.
+Before OCR, classify_pdf() reads the doc type from the title band of page 1
+(text layer, else one low-dpi OCR of just that band; needs PyMuPDF and
+ocr_layouts.py) and only the type's _PAGE_BUDGET pages are OCR'd, so raw
+text / FTS cover those pages. INGEST_CLASSIFY=0 OCRs every page as before.
 Tested on Windows; paths assume UTF‑8.
 """
 from __future__ import annotations
 import dataclasses as dc
 import json
 import os
+import queue
 import re
 import shutil
 import sqlite3
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+try:
+    import fitz  # PyMuPDF (optional: in-memory rendering)  # type: ignore
+except Exception:  # pragma: no cover
+    fitz = None
+
+try:
+    # optional: warm in-process Tesseract pool (tesserocr) and ocr.py's PyMuPDF lock
+    from ocr import _FITZ_LOCK as _OCR_FITZ_LOCK, _tess_pool
+except Exception:  # pragma: no cover
+    _OCR_FITZ_LOCK = None
+    _tess_pool = None
+
+try:
+    from ocr_layouts import CLASSIFY_BAND, classify_title  # optional: title-based early classification
+except Exception:  # pragma: no cover
+    CLASSIFY_BAND = None
+    classify_title = None
+
 # ---------------------------
 # Configuration
 # ---------------------------
@@ -122,28 +165,152 @@ def _which(name: str, extra: list[str] = None) -> Optional[str]:
             return c
     return None
 
-def _render_pdf_images(pdf_path: Path, out_prefix: Path, dpi: int) -> list[Path]:
+_TESSERACT_CANDIDATES = [
+    r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+    r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
+    os.path.join(os.environ.get("LOCALAPPDATA", r"C:\Users\%USERNAME%\AppData\Local"),
+                 "Programs", "Tesseract-OCR", "tesseract.exe"),
+]
+
+# ---------------------------
+# Toolchain registry (resolve external binaries once per process)
+# ---------------------------
+
+TOOLCHAIN_PATH = "ingest_toolchain.json"  # override with INGEST_TOOLCHAIN_PATH
+
+# name -> (executable names tried in order, extra candidate paths, version args)
+_TOOL_SPECS: Dict[str, Tuple[Tuple[str, ...], List[str], List[str]]] = {
+    "tesseract": (("tesseract",), _TESSERACT_CANDIDATES, ["--version"]),
+    "pdftoppm": (("pdftoppm",), [
+        r"C:\poppler\Library\bin\pdftoppm.exe",
+        r"C:\Program Files\poppler\bin\pdftoppm.exe",
+        r"C:\poppler-24.07.0\Library\bin\pdftoppm.exe",
+    ], ["-v"]),
+    "pdftocairo": (("pdftocairo",), [
+        r"C:\poppler\Library\bin\pdftocairo.exe",
+        r"C:\Program Files\poppler\bin\pdftocairo.exe",
+        r"C:\poppler-24.07.0\Library\bin\pdftocairo.exe",
+    ], ["-v"]),
+    "gs": (("gswin64c.exe", "gswin32c.exe", "gs"), [
+        r"C:\Program Files\gs\gs10.04.0\bin\gswin64c.exe",
+        r"C:\Program Files\gs\gs10.03.0\bin\gswin64c.exe",
+    ], ["--version"]),
+}
+
+
+def _tool_version(path: str, args: List[str]) -> Optional[str]:
+    """First non-empty line the tool prints for its version flag (poppler uses stderr)."""
+    try:
+        proc = subprocess.run([path] + args, capture_output=True, timeout=15)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    out = (proc.stdout or b"") + b"\n" + (proc.stderr or b"")
+    for line in out.decode("utf-8", errors="ignore").splitlines():
+        if line.strip():
+            return line.strip()
+    return None
+
+
+@dc.dataclass
+class Toolchain:
+    tools: Dict[str, Dict[str, Optional[str]]]  # name -> {"path": ..., "version": ...}
+    detected_at: str = ""
+
+    def path(self, name: str) -> Optional[str]:
+        return (self.tools.get(name) or {}).get("path")
+
+    @classmethod
+    def detect(cls) -> "Toolchain":
+        """Probe PATH + known install locations and run each tool's version flag."""
+        tools: Dict[str, Dict[str, Optional[str]]] = {}
+        for name, (exes, extra, version_args) in _TOOL_SPECS.items():
+            found = None
+            for i, exe in enumerate(exes):
+                # candidate paths belong to the first (preferred) executable name
+                found = _which(exe, extra if i == 0 else None)
+                if found:
+                    break
+            version = _tool_version(found, version_args) if found else None
+            if found and version is None:
+                found = None  # present but not runnable
+            tools[name] = {"path": found, "version": version}
+        return cls(tools=tools, detected_at=datetime.now().isoformat(timespec="seconds"))
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["Toolchain"]:
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            tools = data["tools"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if set(tools) != set(_TOOL_SPECS):
+            return None
+        # A binary that was uninstalled/moved invalidates the cache
+        for info in tools.values():
+            if info.get("path") and not Path(info["path"]).exists():
+                return None
+        return cls(tools=tools, detected_at=data.get("detected_at", ""))
+
+    def save(self, path: Path) -> None:
+        try:
+            Path(path).write_text(json.dumps(dc.asdict(self), indent=2), encoding="utf-8")
+        except OSError:
+            pass  # read-only location: keep the in-process registry only
+
+
+def _toolchain_path() -> Path:
+    return Path(os.environ.get("INGEST_TOOLCHAIN_PATH") or TOOLCHAIN_PATH)
+
+_TOOLCHAIN: Optional[Toolchain] = None
+_TOOLCHAIN_REFRESHED = False
+_TOOLCHAIN_LOCK = threading.Lock()
+
+def get_toolchain(refresh: bool = False) -> Toolchain:
+    """
+    Process-wide toolchain: loaded from the config file (or detected and saved)
+    on first use, then served from memory with no further filesystem probing.
     """
-    Render PDF pages to images at out_prefix-###.png (preferred) or .ppm.
+    global _TOOLCHAIN, _TOOLCHAIN_REFRESHED
+    with _TOOLCHAIN_LOCK:
+        if _TOOLCHAIN is None or refresh:
+            cfg = _toolchain_path()
+            tc = None if refresh else Toolchain.load(cfg)
+            if tc is None:
+                tc = Toolchain.detect()
+                tc.save(cfg)
+                _TOOLCHAIN_REFRESHED = True
+            _TOOLCHAIN = tc
+        return _TOOLCHAIN
+
+def _tool(name: str) -> Optional[str]:
+    """Resolved path for a tool; re-detects once per process if a required tool is missing."""
+    p = get_toolchain().path(name)
+    if p is None and not _TOOLCHAIN_REFRESHED:
+        p = get_toolchain(refresh=True).path(name)
+    return p
+
+def _render_pdf_images(pdf_path: Path, out_prefix: Path, dpi: int,
+                       last_page: Optional[int] = None) -> list[Path]:
+    """
+    Render PDF pages (1..last_page, default all) to images at
+    out_prefix-###.png (preferred) or .ppm.
     Tries: pdftoppm -> pdftocairo -> Ghostscript.
     Returns a list of image Paths.
     """
     images: list[Path] = []
+    poppler_range = ["-l", str(last_page)] if last_page else []
 
     # 1) pdftoppm
-    pdftoppm_bin = _which("pdftoppm", [
-        r"C:\poppler\Library\bin\pdftoppm.exe",
-        r"C:\Program Files\poppler\bin\pdftoppm.exe",
-        r"C:\poppler-24.07.0\Library\bin\pdftoppm.exe",
-    ])
+    pdftoppm_bin = get_toolchain().path("pdftoppm")
     if pdftoppm_bin:
         try:
-            subprocess.run([pdftoppm_bin, "-r", str(dpi), pdf_path.as_posix(), out_prefix.as_posix()],
+            subprocess.run([pdftoppm_bin, "-r", str(dpi)] + poppler_range + [pdf_path.as_posix(), out_prefix.as_posix()],
                            check=True, capture_output=True)
             images = sorted(out_prefix.parent.glob(out_prefix.name + "-*.ppm"))
             if not images:
                 # some builds output PNG with -png
-                subprocess.run([pdftoppm_bin, "-png", "-r", str(dpi), pdf_path.as_posix(), out_prefix.as_posix()],
+                subprocess.run([pdftoppm_bin, "-png", "-r", str(dpi)] + poppler_range
+                               + [pdf_path.as_posix(), out_prefix.as_posix()],
                                check=True, capture_output=True)
                 images = sorted(out_prefix.parent.glob(out_prefix.name + "-*.png"))
             if images:
@@ -153,14 +320,11 @@ def _render_pdf_images(pdf_path: Path, out_prefix: Path, dpi: int) -> list[Path]
             pass
 
     # 2) pdftocairo (often handles fonts better)
-    pdftocairo_bin = _which("pdftocairo", [
-        r"C:\poppler\Library\bin\pdftocairo.exe",
-        r"C:\Program Files\poppler\bin\pdftocairo.exe",
-        r"C:\poppler-24.07.0\Library\bin\pdftocairo.exe",
-    ])
+    pdftocairo_bin = get_toolchain().path("pdftocairo")
     if pdftocairo_bin:
         try:
-            subprocess.run([pdftocairo_bin, "-png", "-r", str(dpi), pdf_path.as_posix(), out_prefix.as_posix()],
+            subprocess.run([pdftocairo_bin, "-png", "-r", str(dpi)] + poppler_range
+                           + [pdf_path.as_posix(), out_prefix.as_posix()],
                            check=True, capture_output=True)
             images = sorted(out_prefix.parent.glob(out_prefix.name + "-*.png"))
             if images:
@@ -169,10 +333,7 @@ def _render_pdf_images(pdf_path: Path, out_prefix: Path, dpi: int) -> list[Path]
             pass
 
     # 3) Ghostscript fallback
-    gs_bin = _which("gswin64c.exe", [
-        r"C:\Program Files\gs\gs10.04.0\bin\gswin64c.exe",
-        r"C:\Program Files\gs\gs10.03.0\bin\gswin64c.exe",
-    ]) or _which("gswin32c.exe")
+    gs_bin = get_toolchain().path("gs")
     if gs_bin:
         try:
             png_pattern = (out_prefix.parent / (out_prefix.name + "-%03d.png")).as_posix()
@@ -180,6 +341,7 @@ def _render_pdf_images(pdf_path: Path, out_prefix: Path, dpi: int) -> list[Path]
                 gs_bin, "-dSAFER", "-dBATCH", "-dNOPAUSE",
                 "-sDEVICE=png16m",
                 "-r" + str(dpi),
+            ] + ([f"-dLastPage={last_page}"] if last_page else []) + [
                 "-o", png_pattern,
                 pdf_path.as_posix()
             ], check=True, capture_output=True)
@@ -191,37 +353,215 @@ def _render_pdf_images(pdf_path: Path, out_prefix: Path, dpi: int) -> list[Path]
 
     raise RuntimeError("Failed to render PDF pages via pdftoppm/pdftocairo/Ghostscript")
 
-def pdf_to_ocr_text(pdf_path: Path, dpi: int = 300, lang: str = "eng") -> str:
+_OCR_MIN_CONF = 70.0
+_OCR_ANCHOR_RE = re.compile(r"\bWPS\s*(?:No\.?|Number)|\bPQR\b|\bWelder\b", re.IGNORECASE)
+
+def _dpi_ladder(dpi: int) -> List[int]:
+    """Ascending rungs from INGEST_DPI_LADDER, or just [dpi] (fixed resolution)."""
+    raw = os.environ.get("INGEST_DPI_LADDER", "").strip()
+    try:
+        rungs = sorted({int(x) for x in raw.split(",") if x.strip()})
+    except ValueError:
+        rungs = []
+    return [r for r in rungs if r > 0] or [dpi]
+
+def _tsv_text_and_conf(tsv: str) -> Tuple[str, float]:
+    """Rebuild page text from tesseract TSV output (one line per OCR line) + mean word conf."""
+    lines: List[str] = []
+    confs: List[float] = []
+    current = None
+    for row in tsv.splitlines():
+        cols = row.split("\t")  # the CLI's header row fails the float(conf) check below
+        if len(cols) < 12 or not cols[11].strip():
+            continue
+        try:
+            conf = float(cols[10])
+        except ValueError:
+            continue
+        if conf < 0:
+            continue
+        confs.append(conf)
+        key = (cols[2], cols[3], cols[4])  # block, paragraph, line
+        if key == current:
+            lines[-1] += " " + cols[11].strip()
+            continue
+        if current is not None and key[:2] != current[:2]:
+            lines.append("")
+        lines.append(cols[11].strip())
+        current = key
+    return "\n".join(lines) + ("\n" if lines else ""), (sum(confs) / len(confs) if confs else 0.0)
+
+# PyMuPDF is not thread-safe: every open/render/close goes through this lock
+# (OCR runs outside it); the same lock as ocr.py's, so the web / GUI parse
+# paths and the ingest pipeline never render at the same time
+_FITZ_LOCK = _OCR_FITZ_LOCK or threading.Lock()
+
+def _ocr_pixmap(pix, tesseract_bin: str, lang: str, tsv: bool) -> str:
+    """OCR one grayscale pixmap: warm tesserocr pool if available, else `tesseract stdin stdout`."""
+    pool = None
+    if _tess_pool is not None and os.environ.get("INGEST_OCR_ENGINE", "").lower() != "cli":
+        pool = _tess_pool(lang)
+    if pool is not None:
+        with pool.api() as api:
+            api.SetPageSegMode(6)
+            api.SetImageBytes(pix.samples, pix.width, pix.height, pix.n, pix.stride)
+            return api.GetTSVText(0) if tsv else api.GetUTF8Text()
+    cmd = [tesseract_bin, "stdin", "stdout", "-l", lang, "--psm", "6"] + (["tsv"] if tsv else [])
+    proc = subprocess.run(cmd, input=pix.tobytes("pgm"), capture_output=True, check=True)
+    return proc.stdout.decode("utf-8", errors="ignore")
+
+def _ocr_inprocess(pdf_path: Path, tesseract_bin: str, dpi: int, lang: str,
+                   timings: Dict, max_pages: Optional[int] = None) -> List[str]:
     """
-    Convert PDF to images, then OCR with tesseract. Robust renderer fallback.
+    Render each page with PyMuPDF straight to an in-memory grayscale pixmap
+    and OCR it on a warm tesserocr instance or through `tesseract stdin
+    stdout`: no temp dir, no image or .txt files, no re-globbing. With more
+    than one dpi rung (see _dpi_ladder) tesseract emits TSV so each page can
+    be scored and re-rendered if weak.
     """
-    if not _which("tesseract", [
-        r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-        r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-        rf"{os.environ.get('LOCALAPPDATA', r'C:\Users\%USERNAME%\AppData\Local')}\Programs\Tesseract-OCR\tesseract.exe",
-    ]):
-        raise RuntimeError("tesseract not found on PATH")
-
+    texts: List[str] = []
+    ladder = _dpi_ladder(dpi)
+    adaptive = len(ladder) > 1
+    try:
+        min_conf = float(os.environ.get("INGEST_MIN_CONF", _OCR_MIN_CONF))
+    except ValueError:
+        min_conf = _OCR_MIN_CONF
+    page_dpi: List[int] = []
+    with _FITZ_LOCK:
+        doc = fitz.open(pdf_path.as_posix())
+    try:
+        for page_no in range(1, doc.page_count + 1):
+            if max_pages and page_no > max_pages:
+                break
+            for rung, rung_dpi in enumerate(ladder):
+                zoom = rung_dpi / 72.0
+                t0 = time.perf_counter()
+                with _FITZ_LOCK:
+                    pix = doc.load_page(page_no - 1).get_pixmap(matrix=fitz.Matrix(zoom, zoom),
+                                                                colorspace=fitz.csGRAY, alpha=False)
+                t1 = time.perf_counter()
+                out = _ocr_pixmap(pix, tesseract_bin, lang, adaptive)
+                timings["render_s"] += t1 - t0
+                timings["ocr_s"] += time.perf_counter() - t1
+                if not adaptive:
+                    break
+                out, conf = _tsv_text_and_conf(out)
+                anchored = page_no != 1 or bool(_OCR_ANCHOR_RE.search(out))
+                if conf >= min_conf and anchored:
+                    break
+            texts.append(out)
+            page_dpi.append(rung_dpi)
+    finally:
+        with _FITZ_LOCK:
+            doc.close()
+    timings["page_dpi"] = page_dpi
+    return texts
+
+def _ocr_subprocess(pdf_path: Path, tesseract_bin: str, dpi: int, lang: str,
+                    timings: Dict, max_pages: Optional[int] = None) -> List[str]:
+    """Poppler/Ghostscript render to a temp dir, then one tesseract run over a list of all images."""
     with tempfile.TemporaryDirectory() as td:
         td = Path(td)
         out_prefix = td / "page"
         # Render pages with fallback chain
-        images = _render_pdf_images(pdf_path, out_prefix, dpi)
-
-        # OCR each page
-        full_text = []
-        tesseract_bin = _which("tesseract", [
-            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-            rf"{os.environ.get('LOCALAPPDATA', r'C:\Users\%USERNAME%\AppData\Local')}\Programs\Tesseract-OCR\tesseract.exe",
-        ])
-        for i, img in enumerate(images, 1):
-            out_txt = td / f"ocr_{i}"
-            subprocess.run([tesseract_bin, img.as_posix(), out_txt.as_posix(), "-l", lang, "--psm", "6"],
-                           check=True)
-            txt = Path(str(out_txt) + ".txt").read_text(encoding="utf-8", errors="ignore")
-            full_text.append(txt)
-        return "\n".join(full_text)
+        t0 = time.perf_counter()
+        images = _render_pdf_images(pdf_path, out_prefix, dpi, last_page=max_pages)
+        timings["render_s"] += time.perf_counter() - t0
+
+        # OCR all pages in one tesseract process (traineddata loaded once);
+        # pages come back separated by form feeds
+        t0 = time.perf_counter()
+        list_file = td / "pages.txt"
+        list_file.write_text("\n".join(img.as_posix() for img in images) + "\n", encoding="utf-8")
+        out_txt = td / "ocr"
+        subprocess.run([tesseract_bin, list_file.as_posix(), out_txt.as_posix(), "-l", lang, "--psm", "6"],
+                       check=True)
+        txt = Path(str(out_txt) + ".txt").read_text(encoding="utf-8", errors="ignore")
+        full_text = txt.split("\f")
+        if len(full_text) > len(images):
+            full_text = full_text[:len(images)]  # trailing separator
+        timings["ocr_s"] += time.perf_counter() - t0
+        return full_text
+
+def pdf_to_ocr_text(pdf_path: Path, dpi: int = 300, lang: str = "eng",
+                    timings: Optional[Dict] = None, max_pages: Optional[int] = None) -> str:
+    """
+    Convert PDF to images (the first `max_pages`, default all), then OCR with tesseract.
+
+    Uses the in-memory PyMuPDF -> tesseract stdin/stdout path when PyMuPDF is
+    installed, falling back to the Poppler/Ghostscript temp-file chain.
+    If `timings` is given it is filled with the path taken, page count and
+    seconds spent per stage (render_s, ocr_s, total_s), plus the dpi used
+    for each page (page_dpi) on the in-process path.
+    """
+    pdf_path = Path(pdf_path)
+    t_start = time.perf_counter()
+    tesseract_bin = _tool("tesseract")
+    if not tesseract_bin:
+        raise RuntimeError("tesseract not found on PATH (see `toolchain --refresh`)")
+
+    stages: Dict = {"render_s": 0.0, "ocr_s": 0.0}
+    mode = (os.environ.get("INGEST_OCR_PATH") or "auto").strip().lower()
+    pages: Optional[List[str]] = None
+    path = "subprocess"
+    if fitz is not None and mode != "subprocess":
+        try:
+            pages = _ocr_inprocess(pdf_path, tesseract_bin, dpi, lang, stages, max_pages)
+            path = "inprocess"
+        except Exception:
+            if mode == "inprocess":
+                raise
+            pages = None
+            stages = {"render_s": 0.0, "ocr_s": 0.0}
+    if pages is None:
+        pages = _ocr_subprocess(pdf_path, tesseract_bin, dpi, lang, stages, max_pages)
+
+    if timings is not None:
+        timings.update({k: round(v, 4) if isinstance(v, float) else v for k, v in stages.items()})
+        timings["path"] = path
+        timings["pages"] = len(pages)
+        timings["total_s"] = round(time.perf_counter() - t_start, 4)
+    return "\n".join(pages)
+
+# Pages OCR'd per doc type once the title is known (WeldTrace samples: WPS
+# fields are complete by page 2, PQR by page 3, WPQR on page 1)
+_PAGE_BUDGET = {"WPS": 2, "PQR": 3, "WPQR": 1}
+_CLASSIFY_DPI = 100
+
+def classify_pdf(pdf_path: Path, lang: str = "eng") -> Optional[str]:
+    """
+    Early doc type ("WPS" / "PQR" / "WPQR") from the title strings in the top
+    band of page 1, before the full OCR pass: the band's text layer if it has
+    one, else a single OCR of only that band at low dpi. None when the title
+    is not recognised, PyMuPDF / ocr_layouts are missing or INGEST_CLASSIFY=0.
+    """
+    if classify_title is None or fitz is None:
+        return None
+    if os.environ.get("INGEST_CLASSIFY", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    pix = None
+    try:
+        with _FITZ_LOCK:
+            with fitz.open(Path(pdf_path).as_posix()) as doc:
+                page = doc[0]
+                r = page.rect
+                x0, y0, x1, y1 = CLASSIFY_BAND
+                clip = fitz.Rect(r.x0 + x0 * r.width, r.y0 + y0 * r.height,
+                                 r.x0 + x1 * r.width, r.y0 + y1 * r.height)
+                text = page.get_text("text", clip=clip)
+                if len(text.strip()) < 10:
+                    zoom = _CLASSIFY_DPI / 72.0
+                    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip,
+                                          colorspace=fitz.csGRAY, alpha=False)
+        if pix is not None:
+            tesseract_bin = _tool("tesseract")
+            if not tesseract_bin:
+                return None
+            text = _ocr_pixmap(pix, tesseract_bin, lang, False)
+    except Exception:
+        return None
+    doc_type = classify_title(text)
+    return "WPQR" if doc_type == "WPQ" else doc_type
 
 # ---------------------------
 # Parsing utilities
@@ -251,8 +591,8 @@ def guess_doc_type(text: str) -> str:
     return max(counts.items(), key=lambda kv: kv[1])[0] if any(counts.values()) else "WPS"
 
 
-def parse_record(text: str) -> BaseRecord:
-    doc_type = guess_doc_type(text)
+def parse_record(text: str, doc_type: Optional[str] = None) -> BaseRecord:
+    doc_type = doc_type or guess_doc_type(text)
     # Pick number pattern based on type
     num_pat = {
         "WPS": PATS["wps_number"],
@@ -364,12 +704,38 @@ CREATE TABLE IF NOT EXISTS documents (
     imported_at TEXT NOT NULL
 );
 
--- FTS index (contentless) for fast global search over key fields + raw text
+-- FTS index over key fields + raw text. External content: the text lives
+-- only in documents (read back for snippets); triggers keep it in sync.
 CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
     doc_type, doc_number, process, material, filler, shielding_gas, position, company, date, raw_text,
-    content=''
+    content='documents', content_rowid='id'
 );
 
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, doc_type, doc_number, process, material, filler, shielding_gas,
+                              position, company, date, raw_text)
+    VALUES (new.id, new.doc_type, new.doc_number, new.process, new.material, new.filler, new.shielding_gas,
+            new.position, new.company, new.date, new.raw_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, doc_type, doc_number, process, material, filler,
+                              shielding_gas, position, company, date, raw_text)
+    VALUES ('delete', old.id, old.doc_type, old.doc_number, old.process, old.material, old.filler,
+            old.shielding_gas, old.position, old.company, old.date, old.raw_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, doc_type, doc_number, process, material, filler,
+                              shielding_gas, position, company, date, raw_text)
+    VALUES ('delete', old.id, old.doc_type, old.doc_number, old.process, old.material, old.filler,
+            old.shielding_gas, old.position, old.company, old.date, old.raw_text);
+    INSERT INTO documents_fts(rowid, doc_type, doc_number, process, material, filler, shielding_gas,
+                              position, company, date, raw_text)
+    VALUES (new.id, new.doc_type, new.doc_number, new.process, new.material, new.filler, new.shielding_gas,
+            new.position, new.company, new.date, new.raw_text);
+END;
+
 CREATE TABLE IF NOT EXISTS import_log (
     id INTEGER PRIMARY KEY,
     file_path TEXT NOT NULL,
@@ -397,8 +763,19 @@ class Repo:
         self._init()
 
     def _init(self):
+        # DBs created before documents_fts became external-content carry a
+        # contentless index (content=''); drop it so the DDL recreates it
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='documents_fts'"
+        ).fetchone()
+        rebuild = row is None or "content=''" in (row[0] or "")
+        if row is not None and rebuild:
+            self.conn.execute("DROP TABLE documents_fts")
         # Run the whole DDL block in one go (supports multiple statements)
         self.conn.executescript(DDL)
+        if rebuild:
+            # Index any documents stored before the index (re)appeared
+            self.conn.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
         self.conn.commit()
 
     def log_import(self, file_path: Path, status: str, message: str = ""):
@@ -431,15 +808,7 @@ class Repo:
             )
         )
         doc_id = cur.lastrowid
-        # FTS index write
-        cur.execute(
-            "INSERT INTO documents_fts(doc_type, doc_number, process, material, filler, shielding_gas, position, company, date, raw_text) VALUES (?,?,?,?,?,?,?,?,?,?)",
-            (
-                rec.doc_type, rec.doc_number.value or "", rec.process.value or "", rec.material.value or "",
-                rec.filler.value or "", rec.shielding_gas.value or "", rec.position.value or "",
-                rec.company.value or "", rec.date.value or "", raw_text
-            )
-        )
+        # (documents_fts is updated by the documents_ai trigger)
         # Store validation issues
         for isue in issues:
             cur.execute(
@@ -449,31 +818,97 @@ class Repo:
         self.conn.commit()
         return doc_id
 
-    def search(self, query: str, limit: int = 20) -> List[Dict[str, str]]:
-        cur = self.conn.cursor()
-        # Rank via bm25; show key fields
-        q = (
-            "SELECT rowid, highlight(documents_fts, 9, '[', ']') AS text_snippet FROM documents_fts WHERE documents_fts MATCH ? ORDER BY bm25(documents_fts) LIMIT ?"
+    _SEARCH_COLS = "d.id, d.doc_type, d.doc_number, d.process, d.material, d.thickness_mm, d.company, d.date, d.avg_conf"
+
+    def search(self, query: str, limit: int = 20, after: Optional[str] = None) -> List[Dict[str, str]]:
+        """Best matches first (bm25); see search_page() for paging."""
+        return self.search_page(query, limit, after)[0]
+
+    def search_page(
+        self,
+        query: str,
+        limit: int = 20,
+        after: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        """
+        One joined FTS query returning metadata + snippet per hit, ordered
+        by (bm25 rank, id). Keyset pagination: pass the returned cursor as
+        `after` to get the next page; the cursor is None on the last page.
+        Invalid FTS syntax falls back to a LIKE scan of raw_text.
+        """
+        # Rank and page on (rank, rowid) alone, then join metadata and build
+        # snippets for just that page (CROSS JOIN keeps `page` the outer loop)
+        keyset = ""
+        params: list = [query]
+        if after:
+            rank, last_id = _decode_cursor(after)
+            keyset = "AND (rank > ? OR (rank = ? AND rowid > ?)) "
+            params += [rank, rank, last_id]
+        params += [limit + 1, query]  # one extra row tells us whether a next page exists
+        sql = (
+            "WITH page AS ("
+            "  SELECT rowid AS id, rank FROM documents_fts "
+            f"  WHERE documents_fts MATCH ? {keyset}"
+            "  ORDER BY rank, rowid LIMIT ?"
+            ") "
+            f"SELECT {self._SEARCH_COLS}, "
+            "snippet(documents_fts, -1, '[', ']', '…', 16), page.rank "
+            "FROM page CROSS JOIN documents_fts CROSS JOIN documents AS d "
+            "WHERE documents_fts MATCH ? AND documents_fts.rowid = page.id AND d.id = page.id "
+            "ORDER BY page.rank, page.id"
         )
-        cur.execute(q, (query, limit))
-        fts_rows = cur.fetchall()
-        out = []
-        for rowid, snippet in fts_rows:
-            doc = cur.execute("SELECT id, doc_type, doc_number, process, material, thickness_mm, company, date, avg_conf FROM documents WHERE id=?", (rowid,)).fetchone()
-            if doc:
-                out.append({
-                    "id": str(doc[0]),
-                    "doc_type": doc[1],
-                    "doc_number": doc[2] or "",
-                    "process": doc[3] or "",
-                    "material": doc[4] or "",
-                    "thickness_mm": str(doc[5]) if doc[5] is not None else "",
-                    "company": doc[6] or "",
-                    "date": doc[7] or "",
-                    "avg_conf": f"{doc[8]:.2f}" if doc[8] is not None else "",
-                    "snippet": snippet,
-                })
-        return out
+
+        try:
+            rows = self.conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError:
+            return self._search_like(query, limit, after)
+
+        page = rows[:limit]
+        out = [_search_row(r[:9], r[9]) for r in page]
+        cursor = _encode_cursor(page[-1][10], page[-1][0]) if len(rows) > limit else None
+        return out, cursor
+
+    def _search_like(self, query: str, limit: int, after: Optional[str]) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        # Fallback: simple LIKE over documents.raw_text, newest first
+        safe = (query or "").replace("%", "").replace("_", "")
+        sql = (
+            f"SELECT {self._SEARCH_COLS}, substr(d.raw_text, 1, 200) "
+            "FROM documents AS d WHERE d.raw_text LIKE ? "
+        )
+        params: list = [f"%{safe}%"]
+        if after:
+            sql += "AND d.id < ? "
+            params.append(_decode_cursor(after)[1])
+        sql += "ORDER BY d.id DESC LIMIT ?"
+        params.append(limit + 1)
+        rows = self.conn.execute(sql, params).fetchall()
+        page = rows[:limit]
+        cursor = _encode_cursor(0.0, page[-1][0]) if len(rows) > limit else None
+        return [_search_row(r[:9], r[9]) for r in page], cursor
+
+
+def _search_row(doc: tuple, snippet: Optional[str]) -> Dict[str, str]:
+    return {
+        "id": str(doc[0]),
+        "doc_type": doc[1],
+        "doc_number": doc[2] or "",
+        "process": doc[3] or "",
+        "material": doc[4] or "",
+        "thickness_mm": str(doc[5]) if doc[5] is not None else "",
+        "company": doc[6] or "",
+        "date": doc[7] or "",
+        "avg_conf": f"{doc[8]:.2f}" if doc[8] is not None else "",
+        "snippet": snippet or "",
+    }
+
+
+def _encode_cursor(rank: float, doc_id: int) -> str:
+    return f"{rank!r}:{doc_id}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    rank, _, doc_id = cursor.rpartition(":")
+    return float(rank), int(doc_id)
 
 # ---------------------------
 # Ingest pipeline
@@ -485,34 +920,293 @@ class IngestResult:
     document_id: Optional[int]
     issues: List[ValidationIssue]
     summary: Dict[str, str]
+    timings: Dict = dc.field(default_factory=dict)  # per-stage seconds (see pdf_to_ocr_text)
+
+
+def _classify_stage(pdf_path: Path, timings: Dict) -> Optional[str]:
+    t0 = time.perf_counter()
+    doc_type = classify_pdf(pdf_path)
+    timings["classify_s"] = round(time.perf_counter() - t0, 4)
+    timings["doc_type_hint"] = doc_type
+    return doc_type
+
+
+def _store_result(repo: Repo, pdf_path: Path, raw_text: str, doc_type: Optional[str], timings: Dict) -> IngestResult:
+    """Parse, validate, insert and log one OCR'd document (runs on the repo's thread)."""
+    t0 = time.perf_counter()
+    rec = parse_record(raw_text, doc_type)
+    issues = validate_record(rec)
+    t1 = time.perf_counter()
+    doc_id = repo.insert_document(pdf_path, rec, raw_text, issues)
+    repo.log_import(pdf_path, "SUCCESS", f"Imported as {rec.doc_type} {rec.doc_number.value}")
+    timings["parse_s"] = round(t1 - t0, 4)
+    timings["db_s"] = round(time.perf_counter() - t1, 4)
+    return IngestResult(
+        status="SUCCESS",
+        document_id=doc_id,
+        issues=issues,
+        summary={
+            "doc_type": rec.doc_type,
+            "doc_number": rec.doc_number.value or "(missing)",
+            "avg_conf": f"{rec.avg_conf():.2f}",
+            "fields": json.dumps(rec.to_dict(), ensure_ascii=False)
+        },
+        timings=timings,
+    )
+
+
+def _failed_result(repo: Repo, pdf_path: Path, error: Exception, timings: Dict) -> IngestResult:
+    repo.log_import(pdf_path, "FAILED", str(error))
+    return IngestResult(
+        status="FAILED",
+        document_id=None,
+        issues=[ValidationIssue("_pipeline", str(error), "ERROR")],
+        summary={},
+        timings=timings,
+    )
 
 
 def ingest_pdf(repo: Repo, pdf_path: Path) -> IngestResult:
+    timings: Dict = {}
     try:
-        raw_text = pdf_to_ocr_text(pdf_path)
-        rec = parse_record(raw_text)
-        issues = validate_record(rec)
-        doc_id = repo.insert_document(pdf_path, rec, raw_text, issues)
-        repo.log_import(pdf_path, "SUCCESS", f"Imported as {rec.doc_type} {rec.doc_number.value}")
-        return IngestResult(
-            status="SUCCESS",
-            document_id=doc_id,
-            issues=issues,
-            summary={
-                "doc_type": rec.doc_type,
-                "doc_number": rec.doc_number.value or "(missing)",
-                "avg_conf": f"{rec.avg_conf():.2f}",
-                "fields": json.dumps(rec.to_dict(), ensure_ascii=False)
-            }
-        )
+        doc_type = _classify_stage(pdf_path, timings)
+        raw_text = pdf_to_ocr_text(pdf_path, timings=timings, max_pages=_PAGE_BUDGET.get(doc_type or ""))
+        return _store_result(repo, pdf_path, raw_text, doc_type, timings)
     except Exception as e:
-        repo.log_import(pdf_path, "FAILED", str(e))
-        return IngestResult(
-            status="FAILED",
-            document_id=None,
-            issues=[ValidationIssue("_pipeline", str(e), "ERROR")],
-            summary={}
-        )
+        return _failed_result(repo, pdf_path, e, timings)
+
+# ---------------------------
+# Multi-document pipeline
+# ---------------------------
+
+_PAGES_AHEAD = 2  # rendered pages queued per OCR worker
+
+
+@dc.dataclass
+class _GrayPage:
+    """Grayscale page samples copied out of a pixmap, so OCR workers never touch PyMuPDF."""
+    samples: bytes
+    width: int
+    height: int
+    stride: int
+    n: int = 1
+
+    def tobytes(self, fmt: str = "pgm") -> bytes:
+        rows = self.samples
+        if self.stride != self.width:
+            rows = b"".join(self.samples[y * self.stride:y * self.stride + self.width] for y in range(self.height))
+        return b"P5\n%d %d\n255\n" % (self.width, self.height) + rows
+
+
+class _IngestJob:
+    """One document moving through ingest_many(); pages may be OCR'd by several workers."""
+
+    def __init__(self, pdf_path: Path):
+        self.pdf_path = Path(pdf_path)
+        self.doc_type: Optional[str] = None
+        self.timings: Dict = {"render_s": 0.0, "ocr_s": 0.0}
+        self.texts: Dict[int, str] = {}
+        self.expected: Optional[int] = None  # pages queued; None while still rendering
+        self.raw_text: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self.done = False
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def finish(self, expected: Optional[int] = None, error: Optional[Exception] = None) -> bool:
+        """Record rendering end / a failure; True exactly once, when the job is ready to store."""
+        with self.lock:
+            if expected is not None:
+                self.expected = expected
+            if error is not None and self.error is None:
+                self.error = error
+            return self._complete()
+
+    def page_done(self, index: int, text: str, ocr_s: float) -> bool:
+        with self.lock:
+            self.texts[index] = text
+            self.timings["ocr_s"] += ocr_s
+            return self._complete()
+
+    def _complete(self) -> bool:
+        if self.done:
+            return False
+        if self.error is None and self.raw_text is None:
+            if self.expected is None or len(self.texts) < self.expected:
+                return False
+            self.raw_text = "\n".join(self.texts[i] for i in range(self.expected))
+            self.timings.update(path="inprocess", pages=self.expected)
+            self.timings["total_s"] = round(time.perf_counter() - self.started, 4)
+        self.done = True
+        self.timings.update({k: round(v, 4) for k, v in self.timings.items() if isinstance(v, float)})
+        return True
+
+
+def _put(q: "queue.Queue", item, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.2)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _render_stage(jobs: List[_IngestJob], pages_q: "queue.Queue", done_q: "queue.Queue",
+                  workers: int, dpi: int, stop: threading.Event) -> None:
+    """
+    Classify each document, then render its budgeted pages to grayscale
+    samples for the OCR workers. Documents that cannot be pre-rendered here
+    (no PyMuPDF, INGEST_OCR_PATH=subprocess, adaptive dpi ladder, open
+    failure) go to a worker whole, through pdf_to_ocr_text().
+    """
+    mode = (os.environ.get("INGEST_OCR_PATH") or "auto").strip().lower()
+    prerender = fitz is not None and mode != "subprocess" and len(_dpi_ladder(dpi)) == 1
+    zoom = dpi / 72.0
+    try:
+        for job in jobs:
+            if stop.is_set():
+                return
+            try:
+                job.doc_type = _classify_stage(job.pdf_path, job.timings)
+            except Exception as e:
+                if job.finish(error=e) and not _put(done_q, job, stop):
+                    return
+                continue
+            budget = _PAGE_BUDGET.get(job.doc_type or "")
+            doc = None
+            if prerender:
+                try:
+                    with _FITZ_LOCK:
+                        doc = fitz.open(job.pdf_path.as_posix())
+                except Exception:
+                    if mode == "inprocess":
+                        if job.finish(error=RuntimeError(f"PyMuPDF could not open {job.pdf_path}")):
+                            _put(done_q, job, stop)
+                        continue
+            if doc is None:
+                if not _put(pages_q, ("doc", job, budget), stop):
+                    return
+                continue
+            queued = 0
+            try:
+                n_pages = min(budget or doc.page_count, doc.page_count)
+                for index in range(n_pages):
+                    if job.done:
+                        break
+                    t0 = time.perf_counter()
+                    with _FITZ_LOCK:
+                        pix = doc.load_page(index).get_pixmap(matrix=fitz.Matrix(zoom, zoom),
+                                                              colorspace=fitz.csGRAY, alpha=False)
+                        page = _GrayPage(pix.samples, pix.width, pix.height, pix.stride)
+                        del pix
+                    job.timings["render_s"] += time.perf_counter() - t0
+                    if not _put(pages_q, ("page", job, index, page), stop):
+                        return
+                    queued += 1
+                job.timings["page_dpi"] = [dpi] * queued
+                ready = job.finish(expected=queued)
+            except Exception as e:
+                ready = job.finish(error=e)
+            finally:
+                with _FITZ_LOCK:
+                    doc.close()
+            if ready and not _put(done_q, job, stop):
+                return
+    finally:
+        for _ in range(workers):
+            _put(pages_q, None, stop)
+
+
+def _ocr_stage(pages_q: "queue.Queue", done_q: "queue.Queue", tesseract_bin: Optional[str],
+               dpi: int, lang: str, stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            item = pages_q.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        if item is None:
+            return
+        job = item[1]
+        if job.done:
+            continue
+        try:
+            if not tesseract_bin:
+                raise RuntimeError("tesseract not found on PATH (see `toolchain --refresh`)")
+            if item[0] == "doc":
+                timings: Dict = {}
+                job.raw_text = pdf_to_ocr_text(job.pdf_path, dpi=dpi, lang=lang, timings=timings, max_pages=item[2])
+                job.timings.update(timings)
+                ready = job.finish()
+            else:
+                _, _, index, page = item
+                t0 = time.perf_counter()
+                text = _ocr_pixmap(page, tesseract_bin, lang, False)
+                ready = job.page_done(index, text, time.perf_counter() - t0)
+        except Exception as e:
+            ready = job.finish(error=e)
+        if ready and not _put(done_q, job, stop):
+            return
+
+
+def _default_workers() -> int:
+    try:
+        return max(1, int(os.environ.get("INGEST_WORKERS", "")))
+    except ValueError:
+        return max(1, min(4, os.cpu_count() or 1))
+
+
+def ingest_many(repo: Repo, paths: List[Path], workers: Optional[int] = None,
+                dpi: int = 300, lang: str = "eng"):
+    """
+    Ingest several PDFs with the stages overlapped across documents: one
+    thread classifies and renders, `workers` threads OCR pages (of any
+    document) and the calling thread parses, validates and inserts, so
+    document B renders while A is OCR'd and an earlier one is stored.
+
+    Yields (pdf_path, IngestResult) as each document finishes (completion
+    order, not input order). Queues between the stages are bounded
+    (_PAGES_AHEAD rendered pages per worker, `workers` finished documents),
+    so memory stays flat however many files are passed. Failures come back
+    as FAILED results, like ingest_pdf(). `workers` defaults to
+    INGEST_WORKERS, else min(4, CPU count).
+
+    The repo is only used from the calling thread (sqlite3 connections are
+    per-thread). Closing the generator early stops the stage threads.
+    """
+    jobs = [_IngestJob(p) for p in paths]
+    if not jobs:
+        return
+    workers = max(1, workers or _default_workers())
+    pages_q: "queue.Queue" = queue.Queue(maxsize=workers * _PAGES_AHEAD)
+    done_q: "queue.Queue" = queue.Queue(maxsize=workers)
+    stop = threading.Event()
+    tesseract_bin = _tool("tesseract")
+    threads = [threading.Thread(target=_render_stage, args=(jobs, pages_q, done_q, workers, dpi, stop),
+                                name="ingest-render", daemon=True)]
+    threads += [threading.Thread(target=_ocr_stage, args=(pages_q, done_q, tesseract_bin, dpi, lang, stop),
+                                 name=f"ingest-ocr-{i}", daemon=True) for i in range(workers)]
+    for t in threads:
+        t.start()
+    try:
+        for _ in jobs:
+            while True:
+                try:
+                    job = done_q.get(timeout=0.5)
+                    break
+                except queue.Empty:
+                    if not any(t.is_alive() for t in threads) and done_q.empty():
+                        raise RuntimeError("ingest pipeline stopped before all documents finished")
+            if job.error is not None:
+                res = _failed_result(repo, job.pdf_path, job.error, job.timings)
+            else:
+                try:
+                    res = _store_result(repo, job.pdf_path, job.raw_text, job.doc_type, job.timings)
+                except Exception as e:
+                    res = _failed_result(repo, job.pdf_path, e, job.timings)
+            yield job.pdf_path, res
+    finally:
+        stop.set()
 
 # ---------------------------
 # CLI helpers for quick testing
@@ -521,8 +1215,9 @@ def ingest_pdf(repo: Repo, pdf_path: Path) -> IngestResult:
 HELP = f"""
 Usage:
   python {Path(__file__).name} init <db.sqlite>
-  python {Path(__file__).name} ingest <db.sqlite> <file1.pdf> [file2.pdf ...]
+  python {Path(__file__).name} ingest <db.sqlite> <file1.pdf> [file2.pdf ...] [--workers N]
   python {Path(__file__).name} search <db.sqlite> <fts query>
+  python {Path(__file__).name} toolchain [--refresh]
 
 Examples:
   python {Path(__file__).name} init data.sqlite
@@ -547,85 +1242,47 @@ def _cmd_ingest(db_path: Path, files: List[str]):
                 print(f"  - {isue.severity}: {isue.field}: {isue.message}")
 
 
-def search(self, query: str, limit: int = 20) -> List[Dict[str, str]]:
-    cur = self.conn.cursor()
-    fts_sql = (
-        "SELECT rowid, highlight(documents_fts, 9, '[', ']') AS text_snippet "
-        "FROM documents_fts WHERE documents_fts MATCH ? "
-        "ORDER BY bm25(documents_fts) LIMIT ?"
-    )
-    out: List[Dict[str, str]] = []
-    try:
-        cur.execute(fts_sql, (query, limit))
-        fts_rows = cur.fetchall()
-        for rowid, snippet in fts_rows:
-            doc = cur.execute(
-                "SELECT id, doc_type, doc_number, process, material, thickness_mm, company, date, avg_conf "
-                "FROM documents WHERE id=?",
-                (rowid,)
-            ).fetchone()
-            if doc:
-                out.append({
-                    "id": str(doc[0]),
-                    "doc_type": doc[1],
-                    "doc_number": doc[2] or "",
-                    "process": doc[3] or "",
-                    "material": doc[4] or "",
-                    "thickness_mm": str(doc[5]) if doc[5] is not None else "",
-                    "company": doc[6] or "",
-                    "date": doc[7] or "",
-                    "avg_conf": f"{doc[8]:.2f}" if doc[8] is not None else "",
-                    "snippet": snippet or "",
-                })
-        return out
-    except sqlite3.OperationalError:
-        # Fallback: simple LIKE over documents.raw_text
-        safe = (query or "").replace("%", "").replace("_", "")
-        like = f"%{safe}%"
-        cur.execute(
-            "SELECT id, doc_type, doc_number, process, material, thickness_mm, company, date, avg_conf, "
-            "substr(raw_text, 1, 200) "
-            "FROM documents WHERE raw_text LIKE ? ORDER BY id DESC LIMIT ?",
-            (like, limit)
-        )
-        rows = cur.fetchall()
-        for doc in rows:
-            out.append({
-                "id": str(doc[0]),
-                "doc_type": doc[1],
-                "doc_number": doc[2] or "",
-                "process": doc[3] or "",
-                "material": doc[4] or "",
-                "thickness_mm": str(doc[5]) if doc[5] is not None else "",
-                "company": doc[6] or "",
-                "date": doc[7] or "",
-                "avg_conf": f"{doc[8]:.2f}" if doc[8] is not None else "",
-                "snippet": doc[9] or "",
-            })
-        return out
-
 # -----------------------------
 # Command-line helpers
 # -----------------------------
-def _cmd_ingest(db_path: Path, pdf_path: Path):
+def _cmd_ingest(db_path: Path, pdf_paths: List[Path], workers: Optional[int] = None):
     repo = Repo(db_path)
-    res = ingest_pdf(repo, pdf_path)
-    print(f"[{res.status}] {pdf_path.name}")
-    if res.issues:
-        for i in res.issues:
-            print(f"  - {i.severity}: {i.field} → {i.message}")
-    else:
-        print("  (no issues)")
-
-def _cmd_search(db_path: Path, query: str):
+    t0 = time.perf_counter()
+    for pdf_path, res in ingest_many(repo, pdf_paths, workers=workers):
+        print(f"[{res.status}] {pdf_path.name}")
+        if res.timings:
+            print("  timings: " + ", ".join(f"{k}={v}" for k, v in res.timings.items()))
+        if res.issues:
+            for i in res.issues:
+                print(f"  - {i.severity}: {i.field} → {i.message}")
+        else:
+            print("  (no issues)")
+    if len(pdf_paths) > 1:
+        print(f"{len(pdf_paths)} files in {time.perf_counter() - t0:.2f}s")
+
+def _cmd_search(db_path: Path, query: str, after: Optional[str] = None):
     repo = Repo(db_path)
-    rows = repo.search(query)
+    rows, cursor = repo.search_page(query, after=after)
     for r in rows:
         snippet = (r.get("snippet") or "")[:200]   # ← guard against None
         print(
             f"[{r['id']}] {r['doc_type']} {r['doc_number']} "
             f"({r['company']}) {r['date']} conf={r['avg_conf']}\n  {snippet}"
         )
+    if cursor:
+        print(f"\nMore results: add --after {cursor}")
+
+
+def _cmd_toolchain(refresh: bool = False):
+    tc = get_toolchain(refresh=refresh)
+    print(f"Toolchain config: {_toolchain_path().resolve()} (detected {tc.detected_at or '?'})")
+    for name in _TOOL_SPECS:
+        info = tc.tools.get(name) or {}
+        if info.get("path"):
+            print(f"  {name:<11} {info['path']}\n  {'':<11} {info.get('version') or ''}")
+        else:
+            print(f"  {name:<11} (not found)")
+    print(f"  {'pymupdf':<11} {'available' if fitz is not None else '(not installed)'}")
 
 
 # -----------------------------
@@ -634,14 +1291,29 @@ def _cmd_search(db_path: Path, query: str):
 if __name__ == "__main__":
     import sys
     if len(sys.argv) < 2:
-        print("Usage:\n  python ingestion_pipeline.py ingest <db> <pdf>\n  python ingestion_pipeline.py search <db> <query>")
+        print("Usage:\n  python ingestion_pipeline.py ingest <db> <pdf> [pdf ...] [--workers N]\n  python ingestion_pipeline.py search <db> <query>"
+              "\n  python ingestion_pipeline.py toolchain [--refresh]")
         sys.exit(1)
 
     cmd = sys.argv[1].lower()
     if cmd == "ingest" and len(sys.argv) >= 4:
-        _cmd_ingest(Path(sys.argv[2]), Path(sys.argv[3]))
+        args = sys.argv[3:]
+        workers = None
+        if "--workers" in args and args.index("--workers") + 1 < len(args):
+            i = args.index("--workers")
+            workers = int(args[i + 1])
+            del args[i:i + 2]
+        _cmd_ingest(Path(sys.argv[2]), [Path(a) for a in args], workers)
     elif cmd == "search" and len(sys.argv) >= 4:
-        _cmd_search(Path(sys.argv[2]), " ".join(sys.argv[3:]))
+        args = sys.argv[3:]
+        after = None
+        if "--after" in args and args.index("--after") + 1 < len(args):
+            i = args.index("--after")
+            after = args[i + 1]
+            del args[i:i + 2]
+        _cmd_search(Path(sys.argv[2]), " ".join(args), after)
+    elif cmd == "toolchain":
+        _cmd_toolchain(refresh="--refresh" in sys.argv[2:])
     else:
         print("Invalid usage.\nExample:\n  python ingestion_pipeline.py search data.sqlite GMAW")
 
@@ -0,0 +1,471 @@
+"""
+job_queue.py
+------------
+SQLite-backed background job queue for the WeldAdmin Pro web API.
+
+/api/parse and /api/import enqueue the uploaded PDF and return a job id
+straight away; a pool of worker threads in the web process claims jobs from
+the queue, runs the handler registered for the job kind and stores its JSON
+result. GET /api/jobs/<id> reads the job row (status, per-page progress,
+result or error).
+
+The queue is a single SQLite file, so no external broker is needed and
+several web processes can share it: a job is claimed in one IMMEDIATE
+transaction, and a running job holds a lease that its worker renews on every
+progress update. Jobs whose worker died (lease expired) are picked up again
+(at most MAX_ATTEMPTS times). The attempt number is the claim token:
+progress and results are only written by the worker holding the latest
+attempt, and a superseded worker's handler is stopped at its next progress
+report (JobSuperseded), before it can store anything.
+Finished jobs are kept for JOB_TTL seconds. Jobs carry the upload's SHA-256
+so an identical upload can be answered with the existing job
+(find_reusable); the upload files themselves belong to upload_store.py.
+
+Job lifecycle:  queued -> running -> done | failed
+
+Configuration (environment variables):
+    JOB_DB_PATH=...      queue file (default: web_jobs.db)
+    JOB_WORKERS=2        worker threads per web process
+    JOB_TTL=3600         seconds a finished job is kept
+    JOB_LEASE=120        seconds a running job may go without a progress update
+
+CLI:
+    python job_queue.py stats
+    python job_queue.py list [--status queued] [--limit 50]
+    python job_queue.py purge (--finished | --all)
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_DB_PATH = "web_jobs.db"
+DEFAULT_WORKERS = 2
+DEFAULT_TTL_S = 3600
+DEFAULT_LEASE_S = 120
+MAX_ATTEMPTS = 3  # a job whose worker died this many times is failed, not re-claimed
+_POLL_S = 1.0  # idle workers re-check the queue (jobs enqueued by other processes)
+_SWEEP_EVERY_S = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    filename TEXT,
+    sha256 TEXT,
+    status TEXT NOT NULL,           -- queued|running|done|failed
+    progress TEXT,                  -- JSON, written by the handler
+    result TEXT,                    -- JSON
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(finished_at);
+"""
+
+# Created after the schema above (ALTER TABLE on queues from older versions)
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_jobs_sha ON jobs(sha256, kind);
+"""
+
+_COLUMNS = ("id, kind, path, filename, sha256, status, progress, result, error, attempts, "
+            "created_at, started_at, finished_at, lease_until")
+
+# A handler gets the upload path and a report(progress_dict) callback and
+# returns the JSON-serialisable result.
+Handler = Callable[[str, Callable[[Dict[str, Any]], None]], Any]
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class JobSuperseded(Exception):
+    """The job was re-claimed by another worker (this worker's lease expired)."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    path: str
+    filename: Optional[str]
+    sha256: Optional[str]
+    status: str
+    progress: Optional[Dict[str, Any]]
+    result: Any
+    error: Optional[str]
+    attempts: int
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    lease_until: Optional[float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public view for the API (no server-side path / lease)."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "filename": self.filename,
+            "sha256": self.sha256,
+            "status": self.status,
+            "progress": self.progress or {},
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# -----------------------------
+# Queue store
+# -----------------------------
+
+class JobQueue:
+    """SQLite job table + an in-process worker pool."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_s: Optional[float] = None,
+        lease_s: Optional[float] = None,
+    ):
+        self.path = path or os.environ.get("JOB_DB_PATH") or DEFAULT_DB_PATH
+        self.ttl_s = ttl_s if ttl_s is not None else _env_number("JOB_TTL", DEFAULT_TTL_S)
+        self.lease_s = lease_s if lease_s is not None else _env_number("JOB_LEASE", DEFAULT_LEASE_S)
+        self._handlers: Dict[str, Handler] = {}
+        self._wake = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._last_sweep = 0.0
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "sha256" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN sha256 TEXT")
+            conn.executescript(_INDEXES)
+
+    @contextmanager
+    def _connect(self):
+        # One connection per thread, reused across operations (request threads
+        # poll GET /api/jobs constantly); re-opened in a forked worker process
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+    @staticmethod
+    def _row_to_job(row) -> Job:
+        return Job(
+            id=row[0],
+            kind=row[1],
+            path=row[2],
+            filename=row[3],
+            sha256=row[4],
+            status=row[5],
+            progress=json.loads(row[6]) if row[6] else None,
+            result=json.loads(row[7]) if row[7] else None,
+            error=row[8],
+            attempts=row[9],
+            created_at=row[10],
+            started_at=row[11],
+            finished_at=row[12],
+            lease_until=row[13],
+        )
+
+    # ---- producer side ----
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self._handlers[kind] = handler
+
+    def submit(
+        self,
+        kind: str,
+        path: str,
+        filename: Optional[str] = None,
+        job_id: Optional[str] = None,
+        sha256: Optional[str] = None,
+    ) -> str:
+        """Queue `path` for the `kind` handler; returns the job id."""
+        job_id = job_id or uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs(id, kind, path, filename, sha256, status, created_at) "
+                "VALUES (?,?,?,?,?, 'queued', ?)",
+                (job_id, kind, path, filename, sha256, time.time()),
+            )
+        with self._wake:
+            self._wake.notify()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = self._row_to_job(row)
+        if job.finished_at is not None and job.finished_at < time.time() - self.ttl_s:
+            return None  # expired; the next sweep deletes it
+        return job
+
+    def find_reusable(self, kind: str, sha256: str, include_done: bool = True) -> Optional[Job]:
+        """Newest queued / running (/ unexpired done) job of `kind` for this content, if any."""
+        done_since = time.time() - self.ttl_s if include_done else float("inf")
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE sha256 = ? AND kind = ? "
+                "AND (status IN ('queued', 'running') OR (status = 'done' AND finished_at >= ?)) "
+                "ORDER BY created_at DESC LIMIT 1",
+                (sha256, kind, done_since),
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def active_paths(self) -> List[str]:
+        """Upload paths that queued / running jobs still need."""
+        with self._connect() as conn:
+            return [r[0] for r in conn.execute(
+                "SELECT DISTINCT path FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()]
+
+    def queue_position(self, job: Job) -> int:
+        """Jobs queued ahead of `job` (0 when it is next or already running)."""
+        if job.status != "queued":
+            return 0
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (job.created_at,)
+            ).fetchone()[0]
+
+    # ---- worker side ----
+
+    def _claim(self) -> Optional[Job]:
+        """Atomically take the oldest queued job, or a running one whose lease expired."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    f"SELECT {_COLUMNS} FROM jobs "
+                    "WHERE status = 'queued' OR (status = 'running' AND lease_until < ? AND attempts < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now, MAX_ATTEMPTS),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                job = self._row_to_job(row)
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, lease_until = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (now, now + self.lease_s, job.id),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        job.status, job.started_at, job.attempts = "running", now, job.attempts + 1
+        return job
+
+    def _report(self, job: Job, progress: Dict[str, Any]) -> None:
+        """Store progress and renew the lease; raises JobSuperseded if another attempt owns the job."""
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET progress = ?, lease_until = ? "
+                "WHERE id = ? AND attempts = ? AND status = 'running'",
+                (json.dumps(progress, ensure_ascii=False), time.time() + self.lease_s, job.id, job.attempts),
+            ).rowcount
+        if not updated:
+            raise JobSuperseded(job.id)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None) -> bool:
+        """Record the outcome of `job`'s attempt; False if a newer attempt owns the job."""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL "
+                "WHERE id = ? AND attempts = ?",
+                (status, json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                 error, time.time(), job.id, job.attempts),
+            ).rowcount > 0
+
+    def run_job(self, job: Job) -> None:
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            self._finish(job, "failed", error=f"no handler for job kind {job.kind!r}")
+            return
+        print(f"DEBUG: job {job.id} ({job.kind}) started: {job.filename or job.path} (attempt {job.attempts})")
+        t0 = time.perf_counter()
+        try:
+            result = handler(job.path, lambda progress: self._report(job, progress))
+        except JobSuperseded:
+            print(f"DEBUG: job {job.id} attempt {job.attempts} superseded after {time.perf_counter() - t0:.1f}s")
+            return
+        except Exception as e:
+            traceback.print_exc()
+            self._finish(job, "failed", error=str(e) or e.__class__.__name__)
+            print(f"DEBUG: job {job.id} failed after {time.perf_counter() - t0:.1f}s: {e}")
+            return
+        if not self._finish(job, "done", result=result):
+            print(f"DEBUG: job {job.id} attempt {job.attempts} superseded; result discarded")
+            return
+        print(f"DEBUG: job {job.id} done in {time.perf_counter() - t0:.1f}s")
+
+    def sweep(self) -> int:
+        """Fail abandoned jobs out of retries; delete finished jobs older than the TTL."""
+        now = time.time()
+        cutoff = now - self.ttl_s
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'worker stopped responding', finished_at = ?, "
+                "lease_until = NULL WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, now, MAX_ATTEMPTS),
+            )
+            removed = conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,)
+            ).rowcount
+        self._last_sweep = time.time()
+        return removed
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if time.time() - self._last_sweep > _SWEEP_EVERY_S:
+                    self.sweep()
+                job = self._claim()
+            except sqlite3.Error as e:
+                print(f"DEBUG: job queue error: {e}")
+                job = None
+            if job is None:
+                with self._wake:
+                    self._wake.wait(_POLL_S)
+                continue
+            self.run_job(job)
+
+    def start(self, workers: Optional[int] = None) -> None:
+        """Start the worker threads (idempotent)."""
+        if self._threads:
+            return
+        if workers is None:
+            workers = int(_env_number("JOB_WORKERS", DEFAULT_WORKERS))
+        for i in range(max(1, workers)):
+            t = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        with self._wake:
+            self._wake.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+        self._stop.clear()
+
+    # ---- maintenance ----
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            by_status = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {"path": os.path.abspath(self.path), "by_status": by_status, "workers": sum(1 for t in self._threads if t.is_alive())}
+
+    def jobs(self, status: Optional[str] = None, limit: Optional[int] = None) -> List[Job]:
+        """Jobs, newest first."""
+        sql = f"SELECT {_COLUMNS} FROM jobs"
+        params: List[Any] = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created_at DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            return [self._row_to_job(r) for r in conn.execute(sql, params).fetchall()]
+
+    def purge(self, finished_only: bool = True) -> int:
+        sql = "DELETE FROM jobs" + (" WHERE status IN ('done', 'failed')" if finished_only else "")
+        with self._connect() as conn:
+            return conn.execute(sql).rowcount
+
+
+_QUEUE: Optional[JobQueue] = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    """Process-wide queue instance."""
+    global _QUEUE
+    with _QUEUE_LOCK:
+        if _QUEUE is None:
+            _QUEUE = JobQueue()
+        return _QUEUE
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def _fmt_time(ts: Optional[float]) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) if ts else "-"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="WeldAdmin Pro – web job queue")
+    parser.add_argument("--path", help="Queue file (default: JOB_DB_PATH or web_jobs.db)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("stats", help="Show job counts per status")
+
+    p_list = sub.add_parser("list", help="List jobs, newest first")
+    p_list.add_argument("--status", choices=("queued", "running", "done", "failed"))
+    p_list.add_argument("--limit", type=int, default=50)
+
+    p_purge = sub.add_parser("purge", help="Delete jobs")
+    grp = p_purge.add_mutually_exclusive_group(required=True)
+    grp.add_argument("--finished", action="store_true", help="Delete done/failed jobs")
+    grp.add_argument("--all", action="store_true", help="Delete every job, including queued ones")
+
+    args = parser.parse_args(argv)
+    q = JobQueue(path=args.path)
+
+    if args.cmd == "stats":
+        st = q.stats()
+        print(f"Queue: {st['path']}")
+        print(f"Jobs:  {', '.join(f'{k}={v}' for k, v in sorted(st['by_status'].items())) or 'none'}")
+    elif args.cmd == "list":
+        for j in q.jobs(status=args.status, limit=args.limit):
+            pages = (j.progress or {}).get("pages_done", 0)
+            print(f"{j.id[:12]}  {j.kind:<6}  {j.status:<7}  pages={pages:<3} tries={j.attempts}  "
+                  f"created={_fmt_time(j.created_at)}  finished={_fmt_time(j.finished_at)}  "
+                  f"{j.filename or j.path}{'  ERROR: ' + j.error if j.error else ''}")
+    elif args.cmd == "purge":
+        removed = q.purge(finished_only=not args.all)
+        print(f"Removed {removed} job{'' if removed == 1 else 's'}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
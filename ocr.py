@@ -6,20 +6,89 @@ Fixes noisy Poppler "PatternX invalid float" warnings by:
 - Using pdf2image with pdftocairo backend and grayscale fallback
 - Allowing backend override via env var OCR_RASTER_BACKEND = pymupdf|poppler
 
+Scanned pages can be OCR'd in parallel by a small process pool; set
+OCR_WORKERS=N (or pass ocr_workers=N to extract_and_parse). The default of 1
+keeps the single-core serial path.
+
+Extracted page text is cached on disk by file hash + OCR settings
+(see ocr_cache.py; disable with OCR_CACHE=0).
+
+Adaptive resolution: set OCR_DPI_LADDER=150,300 to OCR every page at the
+lowest dpi first and re-render only the pages whose mean word confidence is
+below OCR_MIN_CONF (default 70), or whose first page has no "WPS Number" /
+"PQR" / "Welder" anchor, at the next rung. The dpi chosen per page is logged.
+
+Known scanned layouts (WeldTrace WPS / PQR / WPQ, see ocr_layouts.py) skip
+full-page OCR: the layout is identified from low-res title/footer strips and
+only the template's header boxes are OCR'd, in parallel, and mapped straight
+to fields. Disable with OCR_ROI=0.
+
+Text vs OCR is decided per page: pages with a dense text layer use it, and
+only image-only pages (e.g. a scanned signature page in a typed WPS) are
+OCR'd. extract_and_parse() reports them as "_ocr_pages".
+
+With tesserocr installed, OCR runs on a pool of warm in-process Tesseract
+instances (traineddata loaded once, images passed in memory) instead of one
+tesseract process per call; OCR_ENGINE=pytesseract forces the old path.
+
+Before any page is OCR'd, classify_document() reads the title from the top
+band of page 1 (text layer, else a low-dpi OCR of just that band) and the
+doc type's DOC_TYPE_PAGE_BUDGET caps the pages OCR'd in a scanned document
+(see _OcrBudget). Disable with OCR_CLASSIFY=0.
+
+PyMuPDF renders pages straight to grayscale and the pixmap buffer is handed
+on without copying (PIL image / NumPy view over pix.samples_mv).
+
+Preprocessing is selected with OCR_PREPROCESS=basic|otsu|sauvola|clean (see
+ocr_preprocess.py; the NumPy profiles binarize, deskew and strip table rules).
+Non-basic profiles preprocess OCR_PREPROCESS_BATCH pages (default 2) at once.
+
 Public API:
 
     from ocr import extract_and_parse
     fields = extract_and_parse(r"C:\path\to\your\file.pdf")
 
 Returns a dictionary of parsed fields (WPS/PQR/WPQ) plus raw text.
+
+    from ocr import iter_extract_and_parse
+    for res in iter_extract_and_parse(path):   # one PageResult per page
+        show(res.fields, res.missing)          # stops once MANDATORY_FIELDS are found
+
+    from ocr import page_progress
+    with page_progress(lambda page_no, source: ...):  # called as each page's text is ready
+        fields = extract_and_parse(path)
 """
 
+import atexit
 import os
+import queue
 import re
-from typing import Dict, List, Optional, Any
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from contextlib import contextmanager
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Any
 
 from PIL import Image, ImageFilter, ImageOps
 
+import ocr_preprocess
+from ocr_cache import file_digest, get_cache, make_key
+from ocr_layouts import (
+    CLASSIFY_BAND,
+    FOOTER_BOX,
+    LAYOUT_TEMPLATES,
+    TITLE_BOX,
+    LayoutTemplate,
+    classify_title,
+    crop_pixels,
+    identify_layout,
+    layouts_signature,
+)
+
 # Optional imports
 try:
     import pytesseract  # type: ignore
@@ -32,15 +101,39 @@ except Exception:  # pragma: no cover
     pdfplumber = None
 
 try:
-    from pdf2image import convert_from_path  # type: ignore
+    from pdf2image import convert_from_path, pdfinfo_from_path  # type: ignore
 except Exception:  # pragma: no cover
     convert_from_path = None
+    pdfinfo_from_path = None
 
 try:
     import fitz  # PyMuPDF  # type: ignore
 except Exception:  # pragma: no cover
     fitz = None
 
+try:
+    import tesserocr  # warm in-process Tesseract  # type: ignore
+except Exception:  # pragma: no cover
+    tesserocr = None
+
+
+# OCR settings (also part of the OCR cache key)
+OCR_DPI = 300
+OCR_LANG = "eng"
+OCR_PSM = 6
+OCR_MIN_CONF = 70.0
+OCR_ROI_DETECT_DPI = 100
+# OCR page budget per doc type once the title is known (WeldTrace samples:
+# WPS fields are complete by page 2, PQR by page 3, WPQ on page 1); how it
+# is applied is defined in one place, _OcrBudget
+DOC_TYPE_PAGE_BUDGET: Dict[str, int] = {"wps": 2, "pqr": 3, "wpq": 1}
+# A page's text layer is used when it has at least this many characters
+# (more if most of the page is covered by images, e.g. a scan with a typed stamp)
+OCR_TEXT_MIN_CHARS = 50
+
+# A first page without any of these is re-OCR'd at a higher dpi (adaptive mode)
+_OCR_ANCHOR_RE = re.compile(r"\bWPS\s*(?:No\.?|Number)|\bPQR\b|\bWelder\b", re.IGNORECASE)
+
 
 # -----------------------------
 # Small helpers
@@ -86,11 +179,179 @@ def _find_likely_thickness_mm(raw: str) -> str:
     return ""
 
 
+# -----------------------------
+# Line index (tokenize a document once)
+# -----------------------------
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+class LineIndex:
+    """
+    Index over one document's text, built once and shared by parse_fields,
+    parse_weldtrace_layout and _parse_pqr_from_text.
+
+      upper_text   text.upper(), computed once
+      line_starts  offset of each line (as split by str.splitlines)
+      postings     keyword -> offsets of its occurrences in upper_text,
+                   filled on first lookup and cached; lines_with() maps
+                   them to line numbers
+
+    search()/finditer()/first_match() take the keyword(s) a match must
+    START with and only try the regex at those occurrences, instead of
+    scanning the whole text. Don't pass keywords that can sit anywhere but
+    the start of a match.
+    """
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self.upper_text = self.text.upper()
+        # str.upper() never shrinks a character, so equal lengths mean the
+        # upper-case text lines up with the original character by character
+        self._aligned = len(self.upper_text) == len(self.text)
+
+        starts: List[int] = []
+        pos = 0
+        for line in self.text.splitlines(keepends=True):
+            starts.append(pos)
+            pos += len(line)
+        self.line_starts = starts
+        self.postings: Dict[str, Tuple[int, ...]] = {}
+        self._keyword_lines: Dict[str, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.line_starts)
+
+    def line(self, lineno: int) -> str:
+        """Line `lineno`, stripped (like splitlines() + strip())."""
+        start = self.line_starts[lineno]
+        end = self.line_starts[lineno + 1] if lineno + 1 < len(self.line_starts) else len(self.text)
+        return self.text[start:end].strip()
+
+    def upper_line(self, lineno: int) -> str:
+        return self.line(lineno).upper()
+
+    def _occurrences(self, keyword: str) -> Tuple[int, ...]:
+        hit = self.postings.get(keyword)
+        if hit is None:
+            found: List[int] = []
+            find = self.upper_text.find
+            pos = find(keyword)
+            while pos != -1:
+                found.append(pos)
+                pos = find(keyword, pos + 1)
+            hit = self.postings[keyword] = tuple(found)
+        return hit
+
+    def lines_with(self, keyword: str) -> Tuple[int, ...]:
+        """Line numbers (ascending) whose upper-case form contains `keyword`."""
+        hit = self._keyword_lines.get(keyword)
+        if hit is not None:
+            return hit
+        if self._aligned:
+            starts = self.line_starts
+            linenos = (bisect_right(starts, pos) - 1 for pos in self._occurrences(keyword))
+            hit = tuple(dict.fromkeys(linenos))
+        else:
+            hit = tuple(i for i in range(len(self)) if keyword in self.upper_line(i))
+        self._keyword_lines[keyword] = hit
+        return hit
+
+    def has_word(self, lineno: int, *words: str) -> bool:
+        """True if line `lineno` has one of `words` as a whole word (like \\bWORD\\b)."""
+        return not set(words).isdisjoint(_TOKEN_RE.findall(self.upper_line(lineno)))
+
+    def first_offset(self, *keywords: str) -> Optional[int]:
+        """Text offset of the first line containing any of `keywords`."""
+        first = [hit[0] for hit in map(self.lines_with, keywords) if hit]
+        return self.line_starts[min(first)] if first else None
+
+    def _candidates(self, keywords: Tuple[str, ...]) -> Iterable[int]:
+        """Offsets where a match starting with one of `keywords` may begin."""
+        if self._aligned:
+            if len(keywords) == 1:
+                return self._occurrences(keywords[0])
+            return sorted(set().union(*map(self._occurrences, keywords)))
+        # Offsets don't line up: fall back to one scan from the first line
+        pos = self.first_offset(*keywords)
+        return () if pos is None else (pos,)
+
+    def finditer(
+        self,
+        pattern,
+        *keywords: str,
+        flags: int = re.IGNORECASE,
+    ) -> Iterator["re.Match[str]"]:
+        """Same matches as regex.finditer(text) for keyword-led patterns."""
+        regex = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+        if not self._aligned:
+            for pos in self._candidates(keywords):
+                yield from regex.finditer(self.text, pos)
+            return
+        end = 0
+        for pos in self._candidates(keywords):
+            if pos < end:
+                continue
+            m = regex.match(self.text, pos)
+            if m:
+                end = m.end()
+                yield m
+
+    def search(
+        self,
+        pattern,
+        *keywords: str,
+        flags: int = re.IGNORECASE,
+    ) -> Optional["re.Match[str]"]:
+        """Same result as regex.search(text) for keyword-led patterns."""
+        return next(self.finditer(pattern, *keywords, flags=flags), None)
+
+    def first_match(self, pattern, *keywords: str, group: int = 1) -> str:
+        """Indexed counterpart of _first_match()."""
+        m = self.search(pattern, *keywords)
+        return m.group(group).strip() if m else ""
+
+
 # -----------------------------
 # PQR / WPQ parsing helpers
 # -----------------------------
 
-def _parse_pqr_from_text(raw: str, base_fields: Dict[str, Any]) -> Dict[str, Any]:
+_REF_DATE_RE = re.compile(r'(?:Date\s*)?(\d{2}/\d{2}/\d{4}|\d{4}-\d{2}-\d{2})', re.IGNORECASE)
+_REF_SPLIT_RE = re.compile(r'\bRev\b|\bVer\b|\bDate\b', re.IGNORECASE)
+
+
+def _pick_reference_line(index: LineIndex, keyword: str) -> str:
+    """
+    First line mentioning `keyword` (e.g. "PQR"), skipping ASME code
+    references and preferring a line that also carries Rev/Ver/Date.
+    """
+    skip = set(index.lines_with("ASME BPVC SEC"))
+    candidates = [i for i in index.lines_with(keyword) if i not in skip]
+    if not candidates:
+        return ""
+    preferred = [i for i in candidates if index.has_word(i, "REV", "VER", "DATE")]
+    return index.line(preferred[0] if preferred else candidates[0])
+
+
+def _split_reference_line(line: str, prefix: str) -> Tuple[str, str]:
+    """Split e.g. 'PQR No: ABC-1 Rev 0 Date 01/02/2024' into (number, date)."""
+    m = _REF_DATE_RE.search(line)
+    date = m.group(1).strip() if m else ""
+    tmp = re.sub(
+        rf'^\s*{prefix}\s*(?:No\.?|Number)?\s*[:\-]?\s*',
+        '',
+        line,
+        flags=re.IGNORECASE,
+    )
+    core = _REF_SPLIT_RE.split(tmp)[0]
+    return core.strip(), date
+
+
+def _parse_pqr_from_text(
+    raw: str,
+    base_fields: Dict[str, Any],
+    index: Optional[LineIndex] = None,
+) -> Dict[str, Any]:
     """
     Extract PQR/WPQ-specific fields from raw OCR text.
 
@@ -110,77 +371,34 @@ def _parse_pqr_from_text(raw: str, base_fields: Dict[str, Any]) -> Dict[str, Any
       - stamp_number
       - test_lab
       - test_report_no
+
+    Pass the LineIndex already built for parse_fields() to avoid
+    re-tokenizing the text.
     """
     out: Dict[str, Any] = {}
-
-    lines = [ln.strip() for ln in raw.splitlines() if ln.strip()]
-    upper_lines = [ln.upper() for ln in lines]
+    if index is None:
+        index = LineIndex(raw)
+    raw = index.text
 
     # ------------ PQR NUMBER + DATE ------------
-    pqr_candidates: List[str] = []
-    for ln, up in zip(lines, upper_lines):
-        if "PQR" in up and "ASME BPVC SEC" not in up:
-            pqr_candidates.append(ln)
-
-    pqr_line = ""
-    if pqr_candidates:
-        preferred = [
-            ln for ln in pqr_candidates
-            if re.search(r'\b(REV|VER|DATE)\b', ln, re.IGNORECASE)
-        ]
-        pqr_line = preferred[0] if preferred else pqr_candidates[0]
-
+    pqr_line = _pick_reference_line(index, "PQR")
     if pqr_line:
-        date = _first_match(
-            r'(?:Date\s*)?(\d{2}/\d{2}/\d{4}|\d{4}-\d{2}-\d{2})',
-            pqr_line,
-        )
+        number, date = _split_reference_line(pqr_line, "PQR")
         if date:
             out["pqr_date"] = date
-
-        tmp = re.sub(
-            r'^\s*PQR\s*(?:No\.?|Number)?\s*[:\-]?\s*',
-            '',
-            pqr_line,
-            flags=re.IGNORECASE,
-        )
-        core = re.split(r'\bRev\b|\bVer\b|\bDate\b', tmp, flags=re.IGNORECASE)[0]
-        out["pqr_number"] = core.strip()
+        out["pqr_number"] = number
 
     # ------------ WPS NUMBER + DATE ------------
-    wps_candidates: List[str] = []
-    for ln, up in zip(lines, upper_lines):
-        if "WPS" in up and "ASME BPVC SEC" not in up:
-            wps_candidates.append(ln)
-
-    wps_line = ""
-    if wps_candidates:
-        preferred = [
-            ln for ln in wps_candidates
-            if re.search(r'\b(REV|VER|DATE)\b', ln, re.IGNORECASE)
-        ]
-        wps_line = preferred[0] if preferred else wps_candidates[0]
-
+    wps_line = _pick_reference_line(index, "WPS")
     if wps_line:
-        date = _first_match(
-            r'(?:Date\s*)?(\d{2}/\d{2}/\d{4}|\d{4}-\d{2}-\d{2})',
-            wps_line,
-        )
+        number, date = _split_reference_line(wps_line, "WPS")
         if date:
             out["wps_date"] = date
-
-        tmp = re.sub(
-            r'^\s*WPS\s*(?:No\.?|Number)?\s*[:\-]?\s*',
-            '',
-            wps_line,
-            flags=re.IGNORECASE,
-        )
-        core = re.split(r'\bRev\b|\bVer\b|\bDate\b', tmp, flags=re.IGNORECASE)[0]
-        out["wps_number"] = core.strip()
+        out["wps_number"] = number
 
     # If we still don't have pqr_date, infer from dates
     if not out.get("pqr_date"):
-        all_dates = re.findall(r'(\d{2}/\d{2}/\d{4})', raw)
+        all_dates = _DATE_RE.findall(raw)
         uniq_dates = sorted(set(all_dates))
         if len(uniq_dates) == 2 and out.get("wps_date") in uniq_dates:
             other = [d for d in uniq_dates if d != out["wps_date"]]
@@ -192,42 +410,38 @@ def _parse_pqr_from_text(raw: str, base_fields: Dict[str, Any]) -> Dict[str, Any
         out["code_standard"] = base_fields["code_standard"]
 
     # ------------ PROCESS ------------
-    process = _first_match(
+    process = index.first_match(
         r'\b(?:Process|Welding\s*Process)\s*[:\-]?\s*([A-Z0-9 /,+]+)',
-        raw,
+        "PROCESS", "WELDING",
     )
     if not process:
-        process = _first_match(r'(GTAW|SMAW|GMAW|FCAW|SAW)', raw)
+        process = index.first_match(r'(GTAW|SMAW|GMAW|FCAW|SAW)', "GTAW", "SMAW", "GMAW", "FCAW", "SAW")
     if process:
         out["process"] = process.strip(" .,")
 
     # ------------ POSITION ------------
-    position = _first_match(
+    position = index.first_match(
         r'\b(?:Test\s*Position|Welding\s*Position|Position)\s*[:\-]?\s*([0-9A-Z/ ]{1,10})',
-        raw,
+        "TEST", "WELDING", "POSITION",
     )
     if position:
         out["position"] = position.strip()
 
     # ------------ JOINT TYPE ------------
-    joint = _first_match(
+    joint = index.first_match(
         r'\bJoint\s*Type\s*[:\-]?\s*([A-Za-z0-9 /\-]+)',
-        raw,
+        "JOINT",
     )
     if joint:
         out["joint_type"] = joint.strip()
 
     # ------------ BASE MATERIAL SPEC ------------
-    base_spec = _first_match(
+    base_spec = index.first_match(
         r'\b(?:Base|Parent)\s*(?:Material|Metal)\s*(?:Spec(?:ification)?|Grade|Type)?\s*[:\-]?\s*([A-Za-z0-9 /,\-]+)',
-        raw,
+        "BASE", "PARENT",
     )
     if not base_spec:
-        m = re.search(
-            r'(?:Base|Parent)\s*(?:Material|Metal)[^\n]*',
-            raw,
-            re.IGNORECASE,
-        )
+        m = index.search(r'(?:Base|Parent)\s*(?:Material|Metal)[^\n]*', "BASE", "PARENT")
         if m:
             line = m.group(0)
             line = re.sub(
@@ -239,7 +453,7 @@ def _parse_pqr_from_text(raw: str, base_fields: Dict[str, Any]) -> Dict[str, Any
             base_spec = line.strip(" :-")
 
     if base_spec and len(base_spec.strip()) <= 2:
-        m = re.search(r'(?:SA\s*)?304L', raw, re.IGNORECASE)
+        m = index.search(r'(?:SA\s*)?304L', "SA", "304L")
         if m:
             base_spec = m.group(0)
 
@@ -247,14 +461,14 @@ def _parse_pqr_from_text(raw: str, base_fields: Dict[str, Any]) -> Dict[str, Any
         out["base_material_spec"] = base_spec.strip()
 
     # ------------ BASE MATERIAL THICKNESS ------------
-    base_thk = _first_match(
+    base_thk = index.first_match(
         r'\b(?:Base|Parent)\s*(?:Material|Metal)\s*Thickness\s*[:\-]?\s*([0-9.,]+)',
-        raw,
+        "BASE", "PARENT",
     )
     if not base_thk:
-        base_thk = _first_match(
+        base_thk = index.first_match(
             r'\bThickness\s*(?:of\s*(?:Test\s*Coupon|Test\s*Piece|Test\s*Plate))?\s*[:\-]?\s*([0-9.,]+)\s*mm',
-            raw,
+            "THICKNESS",
         )
     if not base_thk:
         base_thk = _find_likely_thickness_mm(raw)
@@ -264,17 +478,17 @@ def _parse_pqr_from_text(raw: str, base_fields: Dict[str, Any]) -> Dict[str, Any
         out["base_material_thickness_mm"] = base_thk
 
     # ------------ WELDER INFO ------------
-    welder_name = _first_match(
+    welder_name = index.first_match(
         r'\bWelder(?:\'s)?\s*(?:Name)?\s*[:\-]?\s*([A-Za-z][A-Za-z .\-]{2,})',
-        raw,
+        "WELDER",
     )
     if welder_name:
         welder_name = re.sub(r'\bWelder\s*ID\b.*$', '', welder_name, flags=re.IGNORECASE)
         out["welder_name"] = welder_name.strip(" :-")
 
-    welder_id = _first_match(
+    welder_id = index.first_match(
         r'\bWelder\s*(?:ID|No\.?|Number)?\s*[:\-]?\s*([A-Za-z0-9\-]+)',
-        raw,
+        "WELDER",
     )
     if not welder_id and base_fields.get("welder_id"):
         welder_id = str(base_fields["welder_id"])
@@ -291,24 +505,24 @@ def _parse_pqr_from_text(raw: str, base_fields: Dict[str, Any]) -> Dict[str, Any
             out["welder_name"] = m.group(1).strip()
 
     # ------------ STAMP NUMBER ------------
-    stamp = _first_match(
+    stamp = index.first_match(
         r'\bStamp\s*(?:No\.?|Number)?\s*[:\-]?\s*([A-Za-z0-9\-]+)',
-        raw,
+        "STAMP",
     )
     if stamp:
         out["stamp_number"] = stamp.strip()
 
     # ------------ LAB / REPORT ------------
-    lab = _first_match(
+    lab = index.first_match(
         r'\b(?:Testing\s*Laboratory|Test\s*Lab|Laboratory)\s*[:\-]?\s*([A-Za-z0-9 .,&\-]+)',
-        raw,
+        "TEST", "LABORATORY",
     )
     if lab:
         out["test_lab"] = lab.strip()
 
-    report_no = _first_match(
+    report_no = index.first_match(
         r'\bTest\s*Report\s*(?:No\.?|Number)?\s*[:\-]?\s*([A-Za-z0-9\-]+)',
-        raw,
+        "TEST",
     )
     if report_no:
         out["test_report_no"] = report_no.strip()
@@ -328,447 +542,1129 @@ def _ensure_grayscale(img: Image.Image) -> Image.Image:
     return img
 
 
-def _preprocess_for_ocr(img: Image.Image) -> Image.Image:
-    """Basic pre-processing: grayscale + sharpen."""
-    img = _ensure_grayscale(img)
-    img = img.filter(ImageFilter.SHARPEN)
+_PREPROCESSED = "ocr_preprocessed"  # Image.info flag set by the batched path
+_PROFILE_WARNED = set()
+
+
+def _preprocess_profile() -> str:
+    """Active OCR_PREPROCESS profile ("basic" when unset, unknown or NumPy is missing)."""
+    name = os.environ.get("OCR_PREPROCESS", "").strip().lower() or ocr_preprocess.DEFAULT_PROFILE
+    if name not in ocr_preprocess.PROFILES:
+        problem = f"unknown OCR_PREPROCESS={name!r}"
+    elif name != "basic" and not ocr_preprocess.available():
+        problem = f"OCR_PREPROCESS={name} needs NumPy"
+    else:
+        return name
+    if name not in _PROFILE_WARNED:
+        _PROFILE_WARNED.add(name)
+        print(f"DEBUG: {problem}; using basic preprocessing")
+    return "basic"
+
+
+def _preprocess_batch_size() -> int:
+    try:
+        return max(1, int(os.environ.get("OCR_PREPROCESS_BATCH", "2") or 2))
+    except ValueError:
+        return 2
+
+
+def _preprocessed_image(arr) -> Image.Image:
+    img = Image.fromarray(arr)
+    img.info[_PREPROCESSED] = True
     return img
 
 
-def _ocr_image(img: Image.Image, lang: str = "eng") -> str:
-    """Run Tesseract OCR on a PIL image."""
+def _preprocess_for_ocr(img: Image.Image) -> Image.Image:
+    """
+    Pre-process one page for OCR with the active profile ("basic": grayscale
+    + sharpen). Pages that already went through _render_for_ocr() are
+    returned unchanged.
+    """
+    if img.info.get(_PREPROCESSED):
+        return img
+    profile = _preprocess_profile()
+    if profile == "basic":
+        return _ensure_grayscale(img).filter(ImageFilter.SHARPEN)
+    return _preprocessed_image(ocr_preprocess.preprocess_batch([_page_array(img)], profile)[0])
+
+
+# -----------------------------
+# Warm Tesseract pool (tesserocr)
+# -----------------------------
+
+class TesseractPool:
+    """
+    Long-lived tesserocr.PyTessBaseAPI instances for one language.
+
+    Each instance keeps its traineddata loaded; a caller borrows one for a
+    single image, so up to `size` threads can OCR at once. Instances are
+    created on demand. Each process (including OCR pool workers) has its own.
+    """
+
+    def __init__(self, lang: str = OCR_LANG, size: Optional[int] = None, path: Optional[str] = None):
+        self.lang = lang
+        self.size = max(1, size or (os.cpu_count() or 1))
+        self.path = path or os.environ.get("TESSDATA_PREFIX")
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._all: List[Any] = []
+        self._lock = threading.Lock()
+
+    def _new_api(self):
+        kwargs = {"lang": self.lang}
+        if self.path:
+            kwargs["path"] = self.path
+        return tesserocr.PyTessBaseAPI(**kwargs)
+
+    @contextmanager
+    def api(self):
+        """Borrow a warm API instance (blocks while all `size` are busy)."""
+        try:
+            api = self._idle.get_nowait()
+        except queue.Empty:
+            api = None
+            with self._lock:
+                if len(self._all) < self.size:
+                    api = self._new_api()
+                    self._all.append(api)
+            if api is None:
+                api = self._idle.get()
+        try:
+            yield api
+        finally:
+            self._idle.put(api)
+
+    @staticmethod
+    def _set_image(api, img: Image.Image) -> None:
+        """Grayscale pages go in as raw rows (one memcpy) instead of an encoded BMP."""
+        if img.mode == "L":
+            api.SetImageBytes(img.tobytes(), img.width, img.height, 1, img.width)
+        else:
+            api.SetImage(img)
+
+    def image_to_string(self, img: Image.Image, psm: int = OCR_PSM) -> str:
+        with self.api() as api:
+            api.SetPageSegMode(psm)
+            self._set_image(api, img)
+            return api.GetUTF8Text() or ""
+
+    def image_to_data(self, img: Image.Image, psm: int = OCR_PSM) -> Dict[str, List[Any]]:
+        """Word boxes like pytesseract.image_to_data(output_type=DICT)."""
+        with self.api() as api:
+            api.SetPageSegMode(psm)
+            self._set_image(api, img)
+            tsv = api.GetTSVText(0) or ""
+        cols = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                "left", "top", "width", "height", "conf", "text")
+        data: Dict[str, List[Any]] = {c: [] for c in cols}
+        for row in tsv.splitlines():
+            parts = row.split("\t")
+            if len(parts) < len(cols):
+                parts += [""] * (len(cols) - len(parts))
+            for c, v in zip(cols, parts):
+                data[c].append(v)
+        return data
+
+    def close(self) -> None:
+        with self._lock:
+            for api in self._all:
+                api.End()
+            self._all = []
+            self._idle = queue.LifoQueue()
+
+
+_TESS_POOLS: Dict[str, TesseractPool] = {}
+_TESS_POOLS_LOCK = threading.Lock()
+
+
+def _tess_pool(lang: str = OCR_LANG) -> Optional[TesseractPool]:
+    """Shared warm pool for `lang`, or None when tesserocr is unavailable/disabled."""
+    if tesserocr is None:
+        return None
+    if os.environ.get("OCR_ENGINE", "").strip().lower() == "pytesseract":
+        return None
+    with _TESS_POOLS_LOCK:
+        pool = _TESS_POOLS.get(lang)
+        if pool is None:
+            pool = _TESS_POOLS[lang] = TesseractPool(lang)
+        return pool
+
+
+def _close_tess_pools() -> None:
+    with _TESS_POOLS_LOCK:
+        for pool in _TESS_POOLS.values():
+            pool.close()
+        _TESS_POOLS.clear()
+
+
+atexit.register(_close_tess_pools)
+
+
+def warm_image_to_string(img: Image.Image, lang: str = OCR_LANG, psm: int = OCR_PSM) -> Optional[str]:
+    """OCR on the warm pool, or None when no warm engine is available."""
+    pool = _tess_pool(lang)
+    if pool is None:
+        return None
+    return pool.image_to_string(img, psm=psm)
+
+
+def _ocr_image(img: Image.Image, lang: str = OCR_LANG, psm: int = OCR_PSM) -> str:
+    """Run Tesseract OCR on a PIL image (warm pool first, else pytesseract)."""
+    text = warm_image_to_string(img, lang=lang, psm=psm)
+    if text is not None:
+        return text
     if not pytesseract:
         raise RuntimeError("pytesseract is not installed / not importable")
-    config = "--psm 6"
+    config = f"--psm {psm}"
     text = pytesseract.image_to_string(img, lang=lang, config=config)
     return text or ""
 
 
-def _extract_text_pdfplumber(pdf_path: str) -> str:
-    """Try text extraction with pdfplumber (no OCR)."""
+def _iter_text_layer_pages(pdf_path: str) -> Iterator[Tuple[str, float]]:
+    """
+    (text, image coverage) per page via pdfplumber (no OCR), extracted
+    lazily. Coverage is the fraction of the page area under images.
+    Raises if the PDF cannot be read.
+    """
     if not pdfplumber:
-        return ""
+        return
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text() or ""
+            area = float(page.width * page.height) or 1.0
+            covered = 0.0
+            for im in page.images:
+                w = min(im["x1"], page.width) - max(im["x0"], 0)
+                h = min(im["bottom"], page.height) - max(im["top"], 0)
+                if w > 0 and h > 0:
+                    covered += w * h
+            yield page_text, min(1.0, covered / area)
+
+
+def _text_layer_pages(pdf_path: str) -> List[Tuple[str, float]]:
+    """(text, image coverage) for every page; [] on failure."""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            parts: List[str] = []
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                parts.append(page_text)
-        return "\n\n".join(parts).strip()
+        return list(_iter_text_layer_pages(pdf_path))
     except Exception:
-        return ""
+        return []
+
+
+def _page_needs_ocr(text: str, image_coverage: float) -> bool:
+    """True for image-only pages: no usable text layer, or a scan with a little typed text."""
+    n = len(text.strip())
+    if n < OCR_TEXT_MIN_CHARS:
+        return True
+    return image_coverage >= 0.5 and n < 4 * OCR_TEXT_MIN_CHARS
+
+
+def _extract_pages_pdfplumber(pdf_path: str) -> List[str]:
+    """Text layer of every page via pdfplumber (no OCR); [] on failure."""
+    return [text for text, _ in _text_layer_pages(pdf_path)]
+
+
+def _extract_text_pdfplumber(pdf_path: str) -> str:
+    """Try text extraction with pdfplumber (no OCR)."""
+    return _join_pages(_extract_pages_pdfplumber(pdf_path))
+
 
+def _join_pages(pages: List[str]) -> str:
+    """Join per-page texts the same way for the text-layer and OCR paths."""
+    return "\n\n".join(pages).strip()
 
-def _pdf_to_images_pymupdf(pdf_path: str, dpi: int = 300) -> List[Image.Image]:
-    """Rasterize PDF pages using PyMuPDF if available."""
+
+# PyMuPDF is not thread-safe: every open/render/close goes through this lock
+# (OCR runs outside it). ingestion_pipeline.py shares it.
+_FITZ_LOCK = threading.Lock()
+
+
+def _pixmap_image(pix) -> Image.Image:
+    """
+    Zero-copy "L" image over a grayscale PyMuPDF pixmap's samples.
+
+    The image holds the pixmap, so the buffer outlives every user of the
+    image (PyMuPDF frees the samples when the Pixmap is collected).
+    Anything that modifies the image gets its own copy from PIL.
+    """
+    img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+    img._ocr_pixmap = pix  # set after img.im, so it is released after the buffer export
+    return img
+
+
+def _pdf_to_images_pymupdf(
+    pdf_path: str,
+    dpi: int = 300,
+    max_pages: Optional[int] = None,
+    first_page: int = 1,
+) -> Iterator[Image.Image]:
+    """
+    Rasterize PDF pages using PyMuPDF if available.
+
+    Pages are rendered one at a time as the caller consumes them, and only
+    pages `first_page`..`max_pages` (1-based) are ever rendered. They are
+    rendered in grayscale and wrapped without copying (see _pixmap_image).
+    """
     if not fitz:
-        return []
-    images: List[Image.Image] = []
+        return
     try:
-        with fitz.open(pdf_path) as doc:
-            for page_index in range(len(doc)):
-                page = doc.load_page(page_index)
-                zoom = dpi / 72.0
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-                img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
-                images.append(img)
+        with _FITZ_LOCK:
+            doc = fitz.open(pdf_path)
+            n_pages = len(doc) if max_pages is None else min(len(doc), max_pages)
     except Exception:
-        return []
-    return images
-
-
-def _pdf_to_images_poppler(pdf_path: str, dpi: int = 300) -> List[Image.Image]:
-    """Rasterize PDF pages using pdf2image + Poppler."""
-    if not convert_from_path:
-        return []
+        return
     try:
-        images = convert_from_path(
-            pdf_path,
-            dpi=dpi,
-            fmt="ppm",
-            grayscale=True,
-        )
-        return images
+        zoom = dpi / 72.0
+        mat = fitz.Matrix(zoom, zoom)
+        for page_index in range(first_page - 1, n_pages):
+            # Lock only the render; the caller OCRs the page while others render
+            with _FITZ_LOCK:
+                pix = doc.load_page(page_index).get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+            yield _pixmap_image(pix)
+            del pix
     except Exception:
-        return []
+        return
+    finally:
+        with _FITZ_LOCK:
+            doc.close()
+
+
+def _pdf_to_images_poppler(
+    pdf_path: str,
+    dpi: int = 300,
+    max_pages: Optional[int] = None,
+    first_page: int = 1,
+) -> Iterator[Image.Image]:
+    """
+    Rasterize PDF pages using pdf2image + Poppler.
 
+    Each page is a separate first_page/last_page render, so pages beyond
+    `max_pages` are never rasterized and only one bitmap is held at a time.
+    """
+    if not convert_from_path:
+        return
+    last_page = max_pages
+    if pdfinfo_from_path:
+        try:
+            n_pages = int(pdfinfo_from_path(pdf_path)["Pages"])
+            last_page = n_pages if max_pages is None else min(n_pages, max_pages)
+        except Exception:
+            pass
 
-def _pdf_to_images(pdf_path: str, dpi: int = 300) -> List[Image.Image]:
-    """Convert a PDF into a list of PIL images."""
+    page_no = first_page
+    while last_page is None or page_no <= last_page:
+        try:
+            images = convert_from_path(
+                pdf_path,
+                dpi=dpi,
+                fmt="ppm",
+                grayscale=True,
+                first_page=page_no,
+                last_page=page_no,
+            )
+        except Exception:
+            return
+        if not images:
+            return
+        yield images[0]
+        page_no += 1
+
+
+def _pdf_to_images(
+    pdf_path: str,
+    dpi: int = 300,
+    max_pages: Optional[int] = None,
+    first_page: int = 1,
+) -> Iterator[Image.Image]:
+    """Lazily convert a PDF into PIL images (pages first_page..max_pages)."""
     backend_override = os.environ.get("OCR_RASTER_BACKEND", "").strip().lower()
 
     if backend_override in ("pymupdf", "") and fitz:
-        imgs = _pdf_to_images_pymupdf(pdf_path, dpi=dpi)
-        if imgs:
-            return imgs
+        pages = _pdf_to_images_pymupdf(pdf_path, dpi=dpi, max_pages=max_pages, first_page=first_page)
+        first = next(pages, None)
+        if first is not None:
+            yield first
+            yield from pages
+            return
 
     if backend_override in ("poppler", "") and convert_from_path:
-        imgs = _pdf_to_images_poppler(pdf_path, dpi=dpi)
-        if imgs:
-            return imgs
+        yield from _pdf_to_images_poppler(pdf_path, dpi=dpi, max_pages=max_pages, first_page=first_page)
 
-    return []
 
+def _page_array(img: Image.Image):
+    """(H, W) uint8 array of a page: a view of the pixmap for PyMuPDF pages, else a copy."""
+    pix = getattr(img, "_ocr_pixmap", None)
+    if pix is not None:
+        return ocr_preprocess.gray_view(pix)
+    return ocr_preprocess.np.asarray(_ensure_grayscale(img))
 
-def _ocr_pdf_pages(pdf_path: str, max_pages: Optional[int] = 3) -> str:
-    """OCR the first N pages of the PDF, returning concatenated text."""
-    images = _pdf_to_images(pdf_path, dpi=300)
-    if not images:
-        return ""
-    texts: List[str] = []
-    for i, img in enumerate(images):
-        if max_pages is not None and i >= max_pages:
+
+def _render_for_ocr(
+    pdf_path: str,
+    dpi: int = 300,
+    max_pages: Optional[int] = None,
+    first_page: int = 1,
+) -> Iterator[Image.Image]:
+    """
+    _pdf_to_images() for OCR: with a NumPy preprocessing profile, pages are
+    preprocessed in batches here and come out flagged as done.
+
+    On the PyMuPDF path the arrays are zero-copy views of grayscale pixmap
+    samples; the pixmaps are released once their batch has been processed.
+    """
+    pages = _pdf_to_images(pdf_path, dpi=dpi, max_pages=max_pages, first_page=first_page)
+    profile = _preprocess_profile()
+    if profile == "basic":
+        yield from pages
+        return
+
+    batch_size = _preprocess_batch_size()
+    while True:
+        batch = list(islice(pages, batch_size))
+        if not batch:
+            return
+        arrays = ocr_preprocess.preprocess_batch([_page_array(p) for p in batch], profile)
+        images = [_preprocessed_image(a) for a in arrays]
+        del batch, arrays
+        yield from images
+
+
+# -----------------------------
+# Adaptive OCR resolution
+# -----------------------------
+
+def _dpi_ladder() -> Tuple[int, ...]:
+    """Ascending dpi rungs from OCR_DPI_LADDER; (OCR_DPI,) when unset (fixed mode)."""
+    raw = os.environ.get("OCR_DPI_LADDER", "").strip()
+    try:
+        rungs = sorted({int(x) for x in raw.replace(";", ",").split(",") if x.strip()})
+    except ValueError:
+        rungs = []
+    rungs = [r for r in rungs if r > 0]
+    return tuple(rungs) if rungs else (OCR_DPI,)
+
+
+def _min_conf() -> float:
+    try:
+        return float(os.environ.get("OCR_MIN_CONF", OCR_MIN_CONF))
+    except ValueError:
+        return OCR_MIN_CONF
+
+
+def _text_from_ocr_data(data: Dict[str, List[Any]]) -> Tuple[str, float]:
+    """
+    Rebuild page text from pytesseract.image_to_data() output.
+
+    Words are joined per Tesseract line, with a blank line between
+    paragraphs, and the mean word confidence is returned alongside.
+    """
+    lines: List[str] = []
+    confs: List[float] = []
+    current = None
+    for i, word in enumerate(data.get("text", [])):
+        try:
+            conf = float(data["conf"][i])
+        except (KeyError, ValueError, TypeError):
+            continue
+        if conf < 0 or not (word or "").strip():
+            continue
+        confs.append(conf)
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        if key == current:
+            lines[-1] += " " + word.strip()
+            continue
+        if current is not None and key[:2] != current[:2]:
+            lines.append("")
+        lines.append(word.strip())
+        current = key
+    mean_conf = sum(confs) / len(confs) if confs else 0.0
+    return "\n".join(lines) + ("\n" if lines else ""), mean_conf
+
+
+def _ocr_image_scored(img: Image.Image, lang: str = OCR_LANG) -> Tuple[str, float]:
+    """OCR a PIL image, returning (text, mean word confidence)."""
+    pool = _tess_pool(lang)
+    if pool is not None:
+        return _text_from_ocr_data(pool.image_to_data(img, psm=OCR_PSM))
+    if not pytesseract:
+        raise RuntimeError("pytesseract is not installed / not importable")
+    data = pytesseract.image_to_data(
+        img, lang=lang, config=f"--psm {OCR_PSM}", output_type=pytesseract.Output.DICT
+    )
+    return _text_from_ocr_data(data)
+
+
+def _ocr_page_adaptive(img: Image.Image, pdf_path: str, page_no: int) -> str:
+    """
+    OCR one page rendered at the lowest ladder rung, re-rendering it at the
+    next rung while its confidence is below OCR_MIN_CONF (or, for page 1,
+    no anchor was found). The top rung is always accepted.
+    """
+    ladder = _dpi_ladder()
+    min_conf = _min_conf()
+    text, conf = "", 0.0
+    for rung, dpi in enumerate(ladder):
+        if rung:
+            img = next(_render_for_ocr(pdf_path, dpi=dpi, max_pages=page_no, first_page=page_no), None)
+            if img is None:
+                break
+        text, conf = _ocr_image_scored(_preprocess_for_ocr(img))
+        anchored = page_no != 1 or bool(_OCR_ANCHOR_RE.search(text))
+        last = rung == len(ladder) - 1
+        if (conf >= min_conf and anchored) or last:
+            print(
+                f"DEBUG: OCR page {page_no}: dpi={dpi} conf={conf:.1f} "
+                f"anchor={'yes' if anchored else 'no'}"
+                f"{'' if conf >= min_conf and anchored else ' (top rung)'}"
+            )
             break
-        pre = _preprocess_for_ocr(img)
-        page_text = _ocr_image(pre)
-        texts.append(page_text)
-    return "\n\n".join(texts).strip()
+    return text
 
 
 # -----------------------------
-# Generic field parsing
+# Region-of-interest OCR (known layouts)
 # -----------------------------
 
-def parse_fields(text: str) -> Dict[str, str]:
+def _roi_enabled() -> bool:
+    return os.environ.get("OCR_ROI", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _ocr_crop(img: Image.Image, multiline: bool = False) -> str:
+    """OCR one crop: psm 7 (single line) for header cells, psm 6 for blocks."""
+    return _ocr_image(img, psm=6 if multiline else 7)
+
+
+def _identify_scanned_layout(pdf_path: str) -> Optional[LayoutTemplate]:
+    """Cheap pass: OCR only the title and footer strips of page 1 at low dpi."""
+    img = next(_pdf_to_images(pdf_path, dpi=OCR_ROI_DETECT_DPI, max_pages=1), None)
+    if img is None:
+        return None
+    img = _ensure_grayscale(img)
+    title = _ocr_crop(img.crop(crop_pixels(TITLE_BOX, *img.size)))
+    footer = _ocr_crop(img.crop(crop_pixels(FOOTER_BOX, *img.size)))
+    return identify_layout(title, footer)
+
+
+def _extract_roi(pdf_path: str) -> Optional[Dict[str, Any]]:
     """
-    Extract common WPS / PQR / WPQ fields from the given OCR text.
-    This is a heuristic parser; adjust regexes as needed for your templates.
+    OCR only the template boxes of page 1 when the layout is known.
+
+    Returns {"source": "roi:<template>", "pages": [crop text, ...]} with one
+    text per template field, or None (unknown layout / required field
+    empty) so the caller falls back to full-page OCR.
     """
-    fields: Dict[str, str] = {}
-    t = text or ""
+    template = _identify_scanned_layout(pdf_path)
+    if template is None:
+        print("DEBUG: ROI OCR: no known layout, using full-page OCR")
+        return None
+
+    page = next(_pdf_to_images(pdf_path, dpi=OCR_DPI, max_pages=1), None)
+    if page is None:
+        return None
+    page = _preprocess_for_ocr(page)
+    crops = [(page.crop(crop_pixels(f.box, *page.size)), f.multiline) for f in template.fields]
+    # Threads are enough here: tesserocr releases the GIL while recognising
+    # (pytesseract runs a subprocess per crop). With the warm pool, more
+    # threads than instances would only queue on TesseractPool.api()
+    tess = _tess_pool()
+    threads = min(len(crops), tess.size if tess is not None else max(2, os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        texts = list(pool.map(lambda c: _ocr_crop(*c), crops))
+
+    if not template.to_fields(texts).get(template.required):
+        print(f"DEBUG: ROI OCR: {template.name} matched but {template.required} is empty; using full-page OCR")
+        return None
+    print(f"DEBUG: ROI OCR: {template.name}, {len(crops)} crops")
+    return {"source": f"roi:{template.name}", "pages": texts}
 
-    # --- Document type detection (header-based, then fallback) ---
-    if re.search(r'WELDING\s+PROCEDURE\s+SPECIFICATION', t, re.IGNORECASE):
-        fields["doc_type"] = "WPS"
-        fields["type"] = "wps"
-
-    if re.search(r'PROCEDURE\s+QUALIFICATION\s+RECORD', t, re.IGNORECASE):
-        fields["doc_type"] = "PQR"
-        fields["type"] = "pqr"
-
-    if re.search(r'WELDER\s+PERFORMANCE\s+QUALIFICATION', t, re.IGNORECASE):
-        fields["doc_type"] = "WPQ"
-        fields["type"] = "wpq"
-
-    if "doc_type" not in fields:
-        if re.search(r'\bWPQ\b|\bWPQR\b', t):
-            fields["doc_type"] = "WPQ"
-            fields["type"] = "wpq"
-        elif re.search(r'\bPQR\b', t):
-            fields["doc_type"] = "PQR"
-            fields["type"] = "pqr"
-        elif re.search(r'\bWPS\b', t):
-            fields["doc_type"] = "WPS"
-            fields["type"] = "wps"
-
-    # --- Company name (line after WPS header) ---
-    m = re.search(
-        r'WELDING\s+PROCEDURE\s+SPECIFICATION[^\n]*\n([^\n]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["company_name"] = m.group(1).strip()
 
-    # --- Designation line ---
-    m = re.search(r'\bDesignation\s+(.+)', t, re.IGNORECASE)
-    if m:
-        fields["designation"] = m.group(1).strip()
+# -----------------------------
+# Early doc-type classification
+# -----------------------------
 
-    # --- Code / Construction code line ---
-    m = re.search(
-        r'Code/Standard\s+(.+?)\s+Constr\.?\s*Code\s+(.+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["code_standard"] = m.group(1).strip()
-        fields["construction_code"] = m.group(2).strip()
-
-    # --- Improved WPS number + date extraction (matches WeldTrace style) ---
-    m = re.search(
-        r'WPS\s*Number\s*([A-Z0-9\-\/]+).*?Rev/?\s*Ver\s*([0-9]+).*?Date\s*(\d{2}/\d{2}/\d{4})',
-        t,
-        re.IGNORECASE | re.DOTALL,
-    )
-    if m:
-        fields["wps_number"] = m.group(1).strip()
-        fields["wps_rev"] = m.group(2).strip()
-        fields["wps_date"] = m.group(3).strip()
-
-    # --- Improved PQR number + date extraction ---
-    m = re.search(
-        r'PQR\s*Number\s*([A-Z0-9\-\/]+).*?Rev/?\s*Ver\s*([0-9]+).*?Date\s*(\d{2}/\d{2}/\d{4})',
-        t,
-        re.IGNORECASE | re.DOTALL,
-    )
-    if m:
-        fields["pqr_number"] = m.group(1).strip()
-        fields["pqr_rev"] = m.group(2).strip()
-        fields["pqr_date"] = m.group(3).strip()
+def _classify_enabled() -> bool:
+    return os.environ.get("OCR_CLASSIFY", "1").strip().lower() not in ("0", "false", "no", "off")
 
-    # --- Generic fallbacks if still missing ---
-    if "wps_number" not in fields:
-        m = re.search(
-            r'\bWPS\s*(?:No\.?|Number)?\s*[:\-]?\s*([A-Z0-9][A-Z0-9\-/ ]+)',
-            t,
-            re.IGNORECASE,
-        )
-        if m:
-            fields["wps_number"] = m.group(1).strip()
 
-    if "pqr_number" not in fields:
-        m = re.search(
-            r'\bPQR\s*(?:No\.?|Number)?\s*[:\-]?\s*((?!ASME)[A-Z0-9][A-Z0-9\-/ ]+)',
-            t,
-            re.IGNORECASE,
-        )
-        if m:
-            fields["pqr_number"] = m.group(1).strip()
+def _box_rect(page, box):
+    r = page.rect
+    x0, y0, x1, y1 = box
+    return fitz.Rect(r.x0 + x0 * r.width, r.y0 + y0 * r.height, r.x0 + x1 * r.width, r.y0 + y1 * r.height)
 
-    # --- Thickness & OD ranges (WPS) ---
-    m = re.search(
-        r'Thickness,\s*T\s*\(mm\)\s*([0-9.,]+\s*[–\-]\s*[0-9.,]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["thickness_range_mm"] = m.group(1).strip()
 
-    m = re.search(
-        r'Outside\s*Diameter\s*\(mm\)\s*(.+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["outside_diameter_range"] = m.group(1).strip()
+def _band_text_layer(pdf_path: str, box) -> str:
+    """Text layer inside a fractional box of page 1 ("" if none)."""
+    try:
+        if fitz:
+            with _FITZ_LOCK, fitz.open(pdf_path) as doc:
+                if len(doc) == 0:
+                    return ""
+                return doc[0].get_text("text", clip=_box_rect(doc[0], box))
+        if pdfplumber:
+            with pdfplumber.open(pdf_path) as pdf:
+                page = pdf.pages[0]
+                x0, y0, x1, y1 = box
+                return page.crop((x0 * page.width, y0 * page.height, x1 * page.width, y1 * page.height)).extract_text() or ""
+    except Exception:
+        pass
+    return ""
 
-    # --- Joint section ---
-    m = re.search(r'Joint\s*Type\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["joint_type"] = m.group(1).strip()
 
-    m = re.search(r'Joint\s*Design\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["joint_design"] = m.group(1).strip()
+def _render_band(pdf_path: str, box, dpi: int) -> Optional[Image.Image]:
+    """A fractional box of page 1 at `dpi`; PyMuPDF renders only the clip."""
+    backend_override = os.environ.get("OCR_RASTER_BACKEND", "").strip().lower()
+    if fitz and backend_override in ("pymupdf", ""):
+        try:
+            with _FITZ_LOCK, fitz.open(pdf_path) as doc:
+                page = doc[0]
+                pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72.0, dpi / 72.0), clip=_box_rect(page, box),
+                                      colorspace=fitz.csGRAY, alpha=False)
+            return _pixmap_image(pix)
+        except Exception:
+            pass
+    img = next(_pdf_to_images(pdf_path, dpi=dpi, max_pages=1), None)
+    if img is None:
+        return None
+    img = _ensure_grayscale(img)
+    return img.crop(crop_pixels(box, *img.size))
 
-    m = re.search(r'Surface\s*Preparation\s*Method\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["surface_prep"] = m.group(1).strip()
 
-    m = re.search(r'Groove\s*Angle[°]?\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["groove_angle"] = m.group(1).strip()
+def classify_document(pdf_path: str) -> Optional[str]:
+    """
+    Doc type ("wps" / "pqr" / "wpq") from the title in the top band of
+    page 1, or None. Uses the band's text layer when it has one; otherwise
+    OCRs only that band at OCR_ROI_DETECT_DPI.
+    """
+    t0 = time.perf_counter()
+    band_text = _band_text_layer(pdf_path, CLASSIFY_BAND)
+    how = "text"
+    if len(band_text.strip()) < 10:
+        img = _render_band(pdf_path, CLASSIFY_BAND, OCR_ROI_DETECT_DPI)
+        band_text = _ocr_image(img) if img is not None else ""
+        how = "ocr"
+    doc_type = classify_title(band_text)
+    print(f"DEBUG: classified {doc_type or 'unknown'} from page 1 title ({how}, "
+          f"{(time.perf_counter() - t0) * 1000:.0f} ms)")
+    return doc_type.lower() if doc_type else None
+
+
+def _page_budget(max_ocr_pages: Optional[int], doc_type: Optional[str]) -> Optional[int]:
+    """OCR page limit: max_ocr_pages, lowered to the doc type's budget."""
+    budget = DOC_TYPE_PAGE_BUDGET.get(doc_type or "")
+    if budget is None:
+        return max_ocr_pages
+    return budget if max_ocr_pages is None else min(max_ocr_pages, budget)
+
+
+class _OcrBudget:
+    """
+    Which image-only pages get OCR'd, decided page by page in document order
+    (shared by _extract_pages and iter_extract_and_parse):
+
+    - while every page so far is image-only (a scan), at most the doc type's
+      DOC_TYPE_PAGE_BUDGET pages are OCR'd: the first N pages, where the
+      WeldTrace fields are;
+    - once a page with a text layer is seen the document is mixed: its text
+      pages cost nothing and a scan can sit anywhere (e.g. a signed last
+      page), so only `max_ocr_pages` caps the image-only pages.
+
+    Image-only pages before the first text page count against the doc-type
+    budget (the streaming path cannot know yet that the document is mixed).
+    """
 
-    m = re.search(r'Root\s*Face\s*\(mm\)\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["root_face_mm"] = m.group(1).strip()
+    def __init__(self, max_ocr_pages: Optional[int], doc_type: Optional[str]):
+        self.max_ocr_pages = max_ocr_pages
+        self.scan_limit = _page_budget(max_ocr_pages, doc_type)
+        self.used = 0
+        self.mixed = False
 
-    m = re.search(r'Root\s*Gap\s*\(mm\)\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["root_gap_mm"] = m.group(1).strip()
+    def take(self, needs_ocr: bool) -> bool:
+        """Record the next page; True if it should be OCR'd."""
+        if not needs_ocr:
+            self.mixed = True
+            return False
+        limit = self.max_ocr_pages if self.mixed else self.scan_limit
+        if limit is not None and self.used >= limit:
+            return False
+        self.used += 1
+        return True
 
-    m = re.search(r'Max\.\s*misalignment\s*\(mm\)\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["max_misalignment_mm"] = m.group(1).strip()
 
-    m = re.search(r'Back\s*Gouging\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["back_gouging"] = m.group(1).strip()
+# -----------------------------
+# Page-parallel OCR
+# -----------------------------
 
-    m = re.search(r'\bBacking\s+([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["backing"] = m.group(1).strip()
+_OCR_POOL: Optional[ProcessPoolExecutor] = None
+_OCR_POOL_SIZE = 0
+_OCR_POOL_LOCK = threading.Lock()
 
-    # Backing type often appears as "Backing\nType Machining & Grinding"
-    m = re.search(r'Backing\s*[\r\n]+Type\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["backing_type"] = m.group(1).strip()
 
-    # --- Process & type ---
-    m = re.search(r'\bPROCESS\s+([A-Z0-9 /,+]+)', t, re.IGNORECASE)
-    if m:
-        fields["process"] = m.group(1).strip(" .,")
+def _ocr_workers(workers: Optional[int] = None) -> int:
+    """Resolve the OCR worker count (argument first, then OCR_WORKERS env var)."""
+    if workers is None:
+        try:
+            workers = int(os.environ.get("OCR_WORKERS", "1") or 1)
+        except ValueError:
+            workers = 1
+    return max(1, min(workers, os.cpu_count() or 1))
 
-    m = re.search(r'\bType\s+([A-Za-z]+)', t, re.IGNORECASE)
-    if m:
-        fields["process_type"] = m.group(1).strip()
 
-    # --- Base metals (very WeldTrace-specific, first two rows) ---
-    base_rows = re.findall(
-        r'Steel\s*&\s*steel\s*alloy\s+Pipe\s+([A/0-9A-Z\- ,]+)\s+[0-9]+\s+[0-9]+\s+[A-Z0-9]+',
-        t,
-        re.IGNORECASE,
-    )
-    if base_rows:
-        fields["base_material_1_spec"] = base_rows[0].strip()
-        if len(base_rows) > 1:
-            fields["base_material_2_spec"] = base_rows[1].strip()
+def _init_ocr_worker(tesseract_cmd: Optional[str]) -> None:
+    """Pool initializer: reuse the parent's tesseract binary in spawned workers."""
+    if pytesseract and tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
 
-    # --- Shielding / backing gas ---
-    m = re.search(r'Shielding\s*Gas\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["shielding_gas"] = m.group(1).strip()
 
-    m = re.search(r'Backing\s*Gas\s*([^\n]+)', t, re.IGNORECASE)
-    if m:
-        fields["backing_gas"] = m.group(1).strip()
+def _ocr_page(img: Image.Image) -> str:
+    """Pre-process and OCR one page; identical for the serial and pool paths."""
+    return _ocr_image(_preprocess_for_ocr(img))
 
-    # --- Preheat / interpass ---
-    m = re.search(r'Preheat\s*Temp\.\s*Min\s*\(°C\)\s*([0-9.,]+)', t, re.IGNORECASE)
-    if m:
-        fields["preheat_min_c"] = m.group(1).strip()
 
-    m = re.search(r'Interpass\s*Temp\.\s*Max\s*\(°C\)\s*([0-9.,]+)', t, re.IGNORECASE)
-    if m:
-        fields["interpass_max_c"] = m.group(1).strip()
+def _get_ocr_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared OCR process pool, (re)creating it for a new size."""
+    global _OCR_POOL, _OCR_POOL_SIZE
+    with _OCR_POOL_LOCK:
+        if _OCR_POOL is None or _OCR_POOL_SIZE != workers:
+            if _OCR_POOL is not None:
+                _OCR_POOL.shutdown(wait=True)
+            cmd = pytesseract.pytesseract.tesseract_cmd if pytesseract else None
+            _OCR_POOL = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_ocr_worker,
+                initargs=(cmd,),
+            )
+            _OCR_POOL_SIZE = workers
+        return _OCR_POOL
 
-    # --- Amps / Volts / Travel speed / Heat input ---
-    m = re.search(r'Amps\s*range,\s*A\s*([0-9–\- ]+)', t, re.IGNORECASE)
-    if m:
-        fields["amps_range"] = m.group(1).strip()
 
-    m = re.search(r'Volts\s*range,\s*V\s*([0-9–\- ]+)', t, re.IGNORECASE)
-    if m:
-        fields["volts_range"] = m.group(1).strip()
+def _shutdown_ocr_pool() -> None:
+    """Stop the shared pool (also registered to run at interpreter exit)."""
+    global _OCR_POOL, _OCR_POOL_SIZE
+    with _OCR_POOL_LOCK:
+        if _OCR_POOL is not None:
+            _OCR_POOL.shutdown(wait=True)
+        _OCR_POOL = None
+        _OCR_POOL_SIZE = 0
 
-    m = re.search(
-        r'Travel\s*speed,\s*\(mm/min\)\s*([0-9–\- ]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["travel_speed_range_mm_min"] = m.group(1).strip()
 
-    m = re.search(
-        r'Max\.\s*Heat\s*input,\s*\(kJ/mm\)\s*([0-9., –\-]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["max_heat_input_kj_mm"] = m.group(1).strip()
+atexit.register(_shutdown_ocr_pool)
 
-    # --- Fallback date scan if needed ---
-    if "wps_date" not in fields or "pqr_date" not in fields:
-        dates = re.findall(r'\d{2}/\d{2}/\d{4}', t)
-        if dates:
-            if "wps_date" not in fields:
-                fields["wps_date"] = dates[0]
-            if "pqr_date" not in fields and len(dates) > 1:
-                fields["pqr_date"] = dates[-1]
 
-    # --- WPQ / WPQR specific fields ---
+# -----------------------------
+# Page progress
+# -----------------------------
 
-    # Certificate number
-    m = re.search(
-        r'Certificate\s*(?:No\.?|Number)?\s*[:\-]?\s*([A-Za-z0-9\-\/]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["certificate_no"] = m.group(1).strip()
+_PROGRESS = threading.local()
 
-    # WPQ / Welder Performance Qualification Record number
-    m = re.search(
-        r'(?:WPQ\s*Record|Welder\s*Performance\s*Qualification\s*Record)\s*(?:No\.?|Number)?\s*[:\-]?\s*([A-Za-z0-9\-\/]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["wpq_record_no"] = m.group(1).strip()
 
-    # Qualified To (e.g. process / range / position)
-    m = re.search(
-        r'Qualified\s*To\s*[:\-]?\s*([A-Za-z0-9 /,\-]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["qualified_to"] = m.group(1).strip()
+@contextmanager
+def page_progress(callback):
+    """
+    Within the block, extract_and_parse() on this thread calls
+    callback(page_no, source) as each page's text becomes available
+    ("text", "ocr", "roi:<template>" or "cache"), e.g. for a web job's
+    progress. Callback errors are logged and ignored.
+    """
+    previous = getattr(_PROGRESS, "callback", None)
+    _PROGRESS.callback = callback
+    try:
+        yield
+    finally:
+        _PROGRESS.callback = previous
 
-    # Test date (date of test)
-    m = re.search(
-        r'(?:Test\s*Date|Date\s*of\s*Test)\s*[:\-]?\s*(\d{2}/\d{2}/\d{4})',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["test_date"] = m.group(1).strip()
 
-    # Date issued
-    m = re.search(
-        r'(?:Date\s*Issued|Date\s*of\s*Issue)\s*[:\-]?\s*(\d{2}/\d{2}/\d{4})',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["date_issued"] = m.group(1).strip()
+def _page_done(page_no: int, source: str) -> None:
+    callback = getattr(_PROGRESS, "callback", None)
+    if callback is None:
+        return
+    try:
+        callback(page_no, source)
+    except Exception as e:
+        print(f"DEBUG: page progress callback failed: {e}")
 
-    # Job knowledge (often a short phrase / rating)
-    m = re.search(
-        r'Job\s*Knowledge\s*[:\-]?\s*([A-Za-z0-9 ,]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["job_knowledge"] = m.group(1).strip()
 
-    # --- WPQ / WPQR specific fields ---
+def _ocr_pages_parallel(
+    images: Iterable[Image.Image],
+    workers: int,
+    adaptive_pdf: Optional[str] = None,
+) -> List[str]:
+    """
+    OCR pages on the shared process pool.
 
-    # Certificate number (often "Certificate No." or "Certificate Number")
-    m = re.search(
-        r'Certificate\s*(?:No\.?|Number)?\s*[:\-]?\s*([A-Za-z0-9\-\/]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["certificate_no"] = m.group(1).strip()
+    At most `workers` pages are in flight at once and results are collected
+    in submission order, so the output lines up with the serial path.
+    With `adaptive_pdf`, pages go through _ocr_page_adaptive instead.
+    """
+    pool = _get_ocr_pool(workers)
+    texts: List[str] = []
+    pending: deque = deque()
+    for page_no, img in enumerate(images, 1):
+        if len(pending) >= workers:
+            texts.append(pending.popleft().result())
+            _page_done(len(texts), "ocr")
+        if adaptive_pdf:
+            pending.append(pool.submit(_ocr_page_adaptive, img, adaptive_pdf, page_no))
+        else:
+            pending.append(pool.submit(_ocr_page, img))
+    while pending:
+        texts.append(pending.popleft().result())
+        _page_done(len(texts), "ocr")
+    return texts
+
+
+def _ocr_pdf_page_texts(
+    pdf_path: str,
+    max_pages: Optional[int] = 3,
+    workers: Optional[int] = None,
+) -> List[str]:
+    """
+    OCR the first N pages of the PDF, returning one text per page.
 
-    # WPQ / WPQR record number (handles "WPQ Record No", "WPQR No", etc.)
-    m = re.search(
-        r'(?:WPQ|WPQR)\s*(?:Record\s*)?(?:No\.?|Number)?\s*[:\-]?\s*([A-Za-z0-9\-\/]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["wpq_record_no"] = m.group(1).strip()
+    Pages are rasterized lazily, so only about one page per worker is held
+    in memory. With more than one worker (see _ocr_workers) the pages are
+    sent to a bounded process pool; otherwise they are processed serially.
+    """
+    n_workers = _ocr_workers(workers)
+    ladder = _dpi_ladder()
+    adaptive = len(ladder) > 1
+    if n_workers > 1 and max_pages != 1:
+        try:
+            images = _render_for_ocr(pdf_path, dpi=ladder[0], max_pages=max_pages)
+            return _ocr_pages_parallel(images, n_workers, pdf_path if adaptive else None)
+        except BrokenProcessPool as e:
+            # e.g. a frozen build without multiprocessing.freeze_support()
+            print(f"DEBUG: OCR process pool failed ({e}); falling back to serial OCR")
+            _shutdown_ocr_pool()
+
+    images = _render_for_ocr(pdf_path, dpi=ladder[0], max_pages=max_pages)
+    texts: List[str] = []
+    for n, img in enumerate(images, 1):
+        texts.append(_ocr_page_adaptive(img, pdf_path, n) if adaptive else _ocr_page(img))
+        _page_done(n, "ocr")
+    return texts
+
+
+def _ocr_selected_pages(pdf_path: str, page_numbers: List[int]) -> Dict[int, str]:
+    """OCR only the given 1-based pages (rendered one at a time)."""
+    ladder = _dpi_ladder()
+    out: Dict[int, str] = {}
+    for n in page_numbers:
+        img = next(_render_for_ocr(pdf_path, dpi=ladder[0], max_pages=n, first_page=n), None)
+        if img is None:
+            continue
+        out[n] = _ocr_page_adaptive(img, pdf_path, n) if len(ladder) > 1 else _ocr_page(img)
+        _page_done(n, "ocr")
+    return out
 
-    # Qualified To (e.g. "Qualified To: ASME IX", "Qualified To: WPS-SA304L")
-    m = re.search(
-        r'Qualified\s*To\s*[:\-]?\s*([A-Za-z0-9 /,\-]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["qualified_to"] = m.group(1).strip()
 
-    # Test date (Date of test)
-    m = re.search(
-        r'(?:Test\s*Date|Date\s*of\s*Test|Date\s*Tested)\s*[:\-]?\s*(\d{2}/\d{2}/\d{4})',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["test_date"] = m.group(1).strip()
+def _ocr_pdf_pages(
+    pdf_path: str,
+    max_pages: Optional[int] = 3,
+    workers: Optional[int] = None,
+) -> str:
+    """OCR the first N pages of the PDF, returning concatenated text."""
+    return _join_pages(_ocr_pdf_page_texts(pdf_path, max_pages=max_pages, workers=workers))
 
-    # Date issued (certificate issue date)
-    m = re.search(
-        r'(?:Date\s*Issued|Date\s*of\s*Issue|Issue\s*Date)\s*[:\-]?\s*(\d{2}/\d{2}/\d{4})',
-        t,
-        re.IGNORECASE,
+
+# -----------------------------
+# Cached text extraction
+# -----------------------------
+
+def _ocr_settings(max_ocr_pages: Optional[int]) -> Dict[str, Any]:
+    """Everything that changes the extracted text, for the cache key."""
+    ladder = _dpi_ladder()
+    return {
+        "dpi": ladder[0] if len(ladder) == 1 else f"adaptive:{','.join(map(str, ladder))}@{_min_conf():g}",
+        "lang": OCR_LANG,
+        "psm": OCR_PSM,
+        "backend": os.environ.get("OCR_RASTER_BACKEND", "").strip().lower() or "auto",
+        "max_pages": max_ocr_pages,
+        "roi": layouts_signature() if _roi_enabled() else None,
+        "text_min_chars": OCR_TEXT_MIN_CHARS,
+        "preprocess": _preprocess_profile(),
+        # budget v2: the doc-type budget no longer caps mixed documents (_OcrBudget)
+        "classify": {"budget": DOC_TYPE_PAGE_BUDGET, "rule": 2} if _classify_enabled() else None,
+    }
+
+
+def _extract_pages(
+    pdf_path: str,
+    max_ocr_pages: Optional[int] = 3,
+    ocr_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Per-page text for a PDF, classified page by page:
+
+    - every page has a dense text layer: use it ("text");
+    - some pages are image-only: keep the text layer of the others and OCR
+      just those pages, at most N of them ("mixed:<pages>");
+    - no page has a text layer: ROI OCR of a known layout, otherwise OCR of
+      the first N pages ("roi:<template>" / "ocr").
+
+    Returns {"source": ..., "pages": [...]}; for ROI the "pages" are the
+    crop texts in template field order. Before any OCR the doc type is
+    classified from the page 1 title ("doc_type"); _OcrBudget decides which
+    image-only pages are OCR'd.
+    """
+    layer = _text_layer_pages(pdf_path)
+    base_pages = [text for text, _ in layer]
+    need_ocr = [n for n, (text, cover) in enumerate(layer, 1) if _page_needs_ocr(text, cover)]
+    for n in range(1, len(layer) + 1):
+        if n not in need_ocr:
+            _page_done(n, "text")
+    if layer and not need_ocr:
+        return {"source": "text", "pages": base_pages}
+    doc_type = classify_document(pdf_path) if _classify_enabled() else None
+    budget = _OcrBudget(max_ocr_pages, doc_type)
+    if layer and len(need_ocr) < len(layer):
+        todo = [n for n, (text, cover) in enumerate(layer, 1) if budget.take(_page_needs_ocr(text, cover))]
+        t0 = time.perf_counter()
+        ocr_texts = _ocr_selected_pages(pdf_path, todo)
+        elapsed = time.perf_counter() - t0
+        for n, text in ocr_texts.items():
+            base_pages[n - 1] = text
+        done = sorted(ocr_texts)
+        per_page = elapsed / len(done) if done else 0.0
+        print(
+            f"DEBUG: text layer used for {len(layer) - len(need_ocr)} of {len(layer)} pages; "
+            f"OCR'd pages {done} in {elapsed:.2f}s "
+            f"(~{per_page * (len(layer) - len(need_ocr)):.2f}s saved vs OCR of every page)"
+        )
+        return {"source": "mixed:" + ",".join(map(str, done)), "pages": base_pages, "doc_type": doc_type}
+    if _roi_enabled():
+        roi = _extract_roi(pdf_path)
+        if roi is not None:
+            _page_done(1, roi["source"])
+            return dict(roi, doc_type=doc_type)
+    pages = _ocr_pdf_page_texts(pdf_path, max_pages=budget.scan_limit, workers=ocr_workers)
+    return {"source": "ocr", "pages": pages, "doc_type": doc_type}
+
+
+def _extract_pages_cached(
+    pdf_path: str,
+    max_ocr_pages: Optional[int] = 3,
+    ocr_workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """_extract_pages() backed by the on-disk OCR cache (see ocr_cache.py)."""
+    cache = get_cache() if use_cache else None
+    if cache is None:
+        return _extract_pages(pdf_path, max_ocr_pages, ocr_workers)
+
+    settings = _ocr_settings(max_ocr_pages)
+    try:
+        digest = file_digest(pdf_path)
+        key = make_key(digest, settings)
+        entry = cache.get(key)
+    except Exception as e:
+        print(f"DEBUG: OCR cache lookup failed: {e}")
+        return _extract_pages(pdf_path, max_ocr_pages, ocr_workers)
+
+    if entry is not None:
+        print(f"DEBUG: OCR cache hit ({entry.source}, {len(entry.pages)} pages)")
+        for n in range(1, (1 if entry.source.startswith("roi:") else len(entry.pages)) + 1):
+            _page_done(n, "cache")
+        return {"source": entry.source, "pages": entry.pages, "doc_type": entry.doc_type}
+
+    result = _extract_pages(pdf_path, max_ocr_pages, ocr_workers)
+    try:
+        cache.put(key, digest, settings, result["source"], result["pages"], result.get("doc_type"))
+    except Exception as e:
+        print(f"DEBUG: OCR cache store failed: {e}")
+    return result
+
+
+# -----------------------------
+# Generic field parsing
+# -----------------------------
+
+class _FieldRule(NamedTuple):
+    """One declarative parse_fields() rule (see _rule)."""
+    keys: Tuple[str, ...]
+    patterns: Tuple[Tuple[Tuple[str, ...], "re.Pattern[str]"], ...]
+    strip: Optional[str]
+    if_missing: bool
+    findall: bool
+
+
+def _rule(
+    keys,
+    *patterns: Tuple[str, str],
+    flags: int = re.IGNORECASE,
+    strip: Optional[str] = None,
+    if_missing: bool = False,
+    findall: bool = False,
+) -> _FieldRule:
+    """
+    Build a field rule, compiling its regexes once at import time.
+
+    keys:       output key per capture group (a str for a single group)
+    patterns:   (keywords, regex) pairs tried in order, first hit wins;
+                keywords (a str or tuple of upper-case words) are what
+                every match starts with, so the LineIndex can skip the
+                regex entirely or start it at the first line holding one
+    strip:      characters passed to str.strip() on each value
+    if_missing: only run when keys[0] has not been set by an earlier rule
+    findall:    keys take group 1 of successive matches instead of groups
+    """
+    if isinstance(keys, str):
+        keys = (keys,)
+    compiled = tuple(
+        ((kw,) if isinstance(kw, str) else tuple(kw), re.compile(regex, flags))
+        for kw, regex in patterns
     )
-    if m:
-        fields["date_issued"] = m.group(1).strip()
+    return _FieldRule(tuple(keys), compiled, strip, if_missing, findall)
+
+
+# Document type: first hit wins. Title headers beat bare abbreviations, and
+# WPQ beats PQR beats WPS when several titles appear.
+_DOC_TYPE_RULES = [
+    ("WELDER", re.compile(r'WELDER\s+PERFORMANCE\s+QUALIFICATION', re.IGNORECASE), "WPQ"),
+    ("PROCEDURE", re.compile(r'PROCEDURE\s+QUALIFICATION\s+RECORD', re.IGNORECASE), "PQR"),
+    ("WELDING", re.compile(r'WELDING\s+PROCEDURE\s+SPECIFICATION', re.IGNORECASE), "WPS"),
+    ("WPQ", re.compile(r'\bWPQ\b|\bWPQR\b'), "WPQ"),
+    ("PQR", re.compile(r'\bPQR\b'), "PQR"),
+    ("WPS", re.compile(r'\bWPS\b'), "WPS"),
+]
+
+# WPS / PQR header and welding-data fields (WeldTrace layout), in output order.
+_WPS_FIELD_RULES = [
+    # Company name (line after WPS header)
+    _rule("company_name", ("WELDING", r'WELDING\s+PROCEDURE\s+SPECIFICATION[^\n]*\n([^\n]+)')),
+    _rule("designation", ("DESIGNATION", r'\bDesignation\s+(.+)')),
+    _rule(("code_standard", "construction_code"),
+          ("CODE", r'Code/Standard\s+(.+?)\s+Constr\.?\s*Code\s+(.+)')),
+
+    # WPS / PQR number + rev + date (WeldTrace style), then generic fallbacks
+    _rule(("wps_number", "wps_rev", "wps_date"),
+          ("WPS", r'WPS\s*Number\s*([A-Z0-9\-\/]+).*?Rev/?\s*Ver\s*([0-9]+).*?Date\s*(\d{2}/\d{2}/\d{4})'),
+          flags=re.IGNORECASE | re.DOTALL),
+    _rule(("pqr_number", "pqr_rev", "pqr_date"),
+          ("PQR", r'PQR\s*Number\s*([A-Z0-9\-\/]+).*?Rev/?\s*Ver\s*([0-9]+).*?Date\s*(\d{2}/\d{2}/\d{4})'),
+          flags=re.IGNORECASE | re.DOTALL),
+    _rule("wps_number", ("WPS", r'\bWPS\s*(?:No\.?|Number)?\s*[:\-]?\s*([A-Z0-9][A-Z0-9\-/ ]+)'),
+          if_missing=True),
+    _rule("pqr_number", ("PQR", r'\bPQR\s*(?:No\.?|Number)?\s*[:\-]?\s*((?!ASME)[A-Z0-9][A-Z0-9\-/ ]+)'),
+          if_missing=True),
+
+    # Thickness & OD ranges
+    _rule("thickness_range_mm", ("THICKNESS", r'Thickness,\s*T\s*\(mm\)\s*([0-9.,]+\s*[–\-]\s*[0-9.,]+)')),
+    _rule("outside_diameter_range", ("OUTSIDE", r'Outside\s*Diameter\s*\(mm\)\s*(.+)')),
+
+    # Joint section
+    _rule("joint_type", ("JOINT", r'Joint\s*Type\s*([^\n]+)')),
+    _rule("joint_design", ("JOINT", r'Joint\s*Design\s*([^\n]+)')),
+    _rule("surface_prep", ("SURFACE", r'Surface\s*Preparation\s*Method\s*([^\n]+)')),
+    _rule("groove_angle", ("GROOVE", r'Groove\s*Angle[°]?\s*([^\n]+)')),
+    _rule("root_face_mm", ("ROOT", r'Root\s*Face\s*\(mm\)\s*([^\n]+)')),
+    _rule("root_gap_mm", ("ROOT", r'Root\s*Gap\s*\(mm\)\s*([^\n]+)')),
+    _rule("max_misalignment_mm", ("MAX", r'Max\.\s*misalignment\s*\(mm\)\s*([^\n]+)')),
+    _rule("back_gouging", ("BACK", r'Back\s*Gouging\s*([^\n]+)')),
+    _rule("backing", ("BACKING", r'\bBacking\s+([^\n]+)')),
+    # Backing type often appears as "Backing\nType Machining & Grinding"
+    _rule("backing_type", ("BACKING", r'Backing\s*[\r\n]+Type\s*([^\n]+)')),
+
+    # Process & type
+    _rule("process", ("PROCESS", r'\bPROCESS\s+([A-Z0-9 /,+]+)'), strip=" .,"),
+    _rule("process_type", ("TYPE", r'\bType\s+([A-Za-z]+)')),
+
+    # Base metals (very WeldTrace-specific, first two rows)
+    _rule(("base_material_1_spec", "base_material_2_spec"),
+          ("STEEL", r'Steel\s*&\s*steel\s*alloy\s+Pipe\s+([A/0-9A-Z\- ,]+)\s+[0-9]+\s+[0-9]+\s+[A-Z0-9]+'),
+          findall=True),
+
+    # Shielding / backing gas
+    _rule("shielding_gas", ("SHIELDING", r'Shielding\s*Gas\s*([^\n]+)')),
+    _rule("backing_gas", ("BACKING", r'Backing\s*Gas\s*([^\n]+)')),
+
+    # Preheat / interpass
+    _rule("preheat_min_c", ("PREHEAT", r'Preheat\s*Temp\.\s*Min\s*\(°C\)\s*([0-9.,]+)')),
+    _rule("interpass_max_c", ("INTERPASS", r'Interpass\s*Temp\.\s*Max\s*\(°C\)\s*([0-9.,]+)')),
+
+    # Amps / Volts / Travel speed / Heat input
+    _rule("amps_range", ("AMPS", r'Amps\s*range,\s*A\s*([0-9–\- ]+)')),
+    _rule("volts_range", ("VOLTS", r'Volts\s*range,\s*V\s*([0-9–\- ]+)')),
+    _rule("travel_speed_range_mm_min", ("TRAVEL", r'Travel\s*speed,\s*\(mm/min\)\s*([0-9–\- ]+)')),
+    _rule("max_heat_input_kj_mm", ("MAX", r'Max\.\s*Heat\s*input,\s*\(kJ/mm\)\s*([0-9., –\-]+)')),
+]
+
+_DATE_RE = re.compile(r'\d{2}/\d{2}/\d{4}')
 
+# WPQ / WPQR specific fields
+_WPQ_FIELD_RULES = [
+    # Certificate number (often "Certificate No." or "Certificate Number")
+    _rule("certificate_no", ("CERTIFICATE", r'Certificate\s*(?:No\.?|Number)?\s*[:\-]?\s*([A-Za-z0-9\-\/]+)')),
+    # WPQ / WPQR record number ("WPQ Record No", "WPQR No", ...), else the
+    # spelled-out "Welder Performance Qualification Record"
+    _rule("wpq_record_no",
+          ("WPQ", r'(?:WPQ|WPQR)\s*(?:Record\s*)?(?:No\.?|Number)?\s*[:\-]?\s*([A-Za-z0-9\-\/]+)'),
+          (("WPQ", "WELDER"), r'(?:WPQ\s*Record|Welder\s*Performance\s*Qualification\s*Record)\s*(?:No\.?|Number)?\s*[:\-]?\s*([A-Za-z0-9\-\/]+)')),
+    # Qualified To (e.g. "Qualified To: ASME IX", "Qualified To: WPS-SA304L")
+    _rule("qualified_to", ("QUALIFIED", r'Qualified\s*To\s*[:\-]?\s*([A-Za-z0-9 /,\-]+)')),
+    # Test date (Date of test)
+    _rule("test_date",
+          (("TEST", "DATE"), r'(?:Test\s*Date|Date\s*of\s*Test|Date\s*Tested)\s*[:\-]?\s*(\d{2}/\d{2}/\d{4})')),
+    # Date issued (certificate issue date)
+    _rule("date_issued",
+          (("DATE", "ISSUE"), r'(?:Date\s*Issued|Date\s*of\s*Issue|Issue\s*Date)\s*[:\-]?\s*(\d{2}/\d{2}/\d{4})')),
     # Job knowledge (can be a rating or short phrase)
-    m = re.search(
-        r'Job\s*Knowledge\s*[:\-]?\s*([A-Za-z0-9 ,]+)',
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        fields["job_knowledge"] = m.group(1).strip()
+    _rule("job_knowledge", ("JOB", r'Job\s*Knowledge\s*[:\-]?\s*([A-Za-z0-9 ,]+)')),
+]
+
+
+def _apply_field_rules(
+    rules: List[_FieldRule],
+    index: LineIndex,
+    fields: Dict[str, str],
+) -> None:
+    """Run a rule table over the indexed text, writing hits into `fields` in table order."""
+    for rule in rules:
+        if rule.if_missing and rule.keys[0] in fields:
+            continue
+        for keywords, regex in rule.patterns:
+            if rule.findall:
+                matches = islice(index.finditer(regex, *keywords), len(rule.keys))
+                values = [m.group(1) for m in matches]
+                for key, value in zip(rule.keys, values):
+                    fields[key] = value.strip(rule.strip)
+                if values:
+                    break
+            else:
+                m = index.search(regex, *keywords)
+                if m:
+                    for group, key in enumerate(rule.keys, 1):
+                        fields[key] = m.group(group).strip(rule.strip)
+                    break
+
+
+def parse_fields(text: str, index: Optional[LineIndex] = None) -> Dict[str, str]:
+    """
+    Extract common WPS / PQR / WPQ fields from the given OCR text.
+    This is a heuristic parser; adjust the rule tables above as needed
+    for your templates. Pass a LineIndex of `text` to share it with the
+    other parsers.
+    """
+    fields: Dict[str, str] = {}
+    if index is None:
+        index = LineIndex(text)
+    t = index.text
+
+    # --- Document type detection (header-based, then fallback) ---
+    for keyword, regex, doc_type in _DOC_TYPE_RULES:
+        if index.search(regex, keyword):
+            fields["doc_type"] = doc_type
+            fields["type"] = doc_type.lower()
+            break
+
+    _apply_field_rules(_WPS_FIELD_RULES, index, fields)
+
+    # --- Fallback date scan if needed ---
+    if "wps_date" not in fields or "pqr_date" not in fields:
+        dates = _DATE_RE.findall(t)
+        if dates:
+            if "wps_date" not in fields:
+                fields["wps_date"] = dates[0]
+            if "pqr_date" not in fields and len(dates) > 1:
+                fields["pqr_date"] = dates[-1]
+
+    _apply_field_rules(_WPQ_FIELD_RULES, index, fields)
 
     return fields
 
@@ -777,15 +1673,17 @@ def parse_fields(text: str) -> Dict[str, str]:
 # WeldTrace-style layout parser (light overrides)
 # -----------------------------
 
-def parse_weldtrace_layout(text: str) -> Dict[str, str]:
+def parse_weldtrace_layout(text: str, index: Optional[LineIndex] = None) -> Dict[str, str]:
     """
     Additional layout-specific parsing for documents that look like WeldTrace exports.
     Currently very minimal; extend as needed.
     """
     out: Dict[str, str] = {}
+    if index is None:
+        index = LineIndex(text)
 
     # Example: "Process: GTAW"
-    m = re.search(r'\bProcess\s*:\s*([A-Z0-9 /,+]+)', text, re.IGNORECASE)
+    m = index.search(r'\bProcess\s*:\s*([A-Z0-9 /,+]+)', "PROCESS")
     if m:
         out["process"] = m.group(1).strip(" .,")
 
@@ -796,42 +1694,25 @@ def parse_weldtrace_layout(text: str) -> Dict[str, str]:
 # PUBLIC API
 # -----------------------------
 
-def extract_and_parse(pdf_path: str, max_ocr_pages: int = 3) -> Dict[str, Any]:
-    """
-    High-level function:
-        1. Try direct text extraction (pdfplumber).
-        2. If too little text, OCR the first N pages.
-        3. Parse fields from the resulting text.
-        4. For WPS/PQR docs, enrich with PQR-specific regex parsing.
-    """
-    if not os.path.isfile(pdf_path):
-        raise FileNotFoundError(pdf_path)
-
-    # 1) Try direct text extraction
-    base_text = _extract_text_pdfplumber(pdf_path)
-
-    # 2) If not enough text, run OCR
-    if len((base_text or "").strip()) < 50:
-        text = _ocr_pdf_pages(pdf_path, max_pages=max_ocr_pages)
-    else:
-        text = base_text
-
-    # 3) Parse generic fields
-    fields = parse_fields(text)
+def _fields_from_text(text: str) -> Dict[str, Any]:
+    """Steps 3-4 of extract_and_parse(): generic, WeldTrace and PQR/WPS parsing of `text`."""
+    # Generic fields (one line index shared by all parsers)
+    index = LineIndex(text)
+    fields = parse_fields(text, index)
 
-    # 3a) WeldTrace-specific overrides
-    wt_fields = parse_weldtrace_layout(text)
+    # WeldTrace-specific overrides
+    wt_fields = parse_weldtrace_layout(text, index)
     for k, v in wt_fields.items():
         if v and not fields.get(k):
             fields[k] = v
 
-    # 4) PQR/WPS-specific enrichment
+    # PQR/WPS-specific enrichment
     doc_type_main = (fields.get("doc_type") or fields.get("type") or "").lower().strip()
     print(f"DEBUG: doc_type_raw = {doc_type_main}")
 
     if doc_type_main in ("pqr", "wps", "wpq"):
         try:
-            pqr_fields = _parse_pqr_from_text(text, fields)
+            pqr_fields = _parse_pqr_from_text(text, fields, index)
 
             override_keys = {
                 "pqr_number",
@@ -856,7 +1737,244 @@ def extract_and_parse(pdf_path: str, max_ocr_pages: int = 3) -> Dict[str, Any]:
         except Exception as e:
             print(f"DEBUG: _parse_pqr_from_text error: {e}")
 
-    # Always include raw text
+    return fields
+
+
+def _apply_doc_type_hint(fields: Dict[str, Any], doc_type: Optional[str]) -> None:
+    if doc_type and not fields.get("doc_type"):
+        fields["doc_type"] = doc_type.upper()
+        fields["type"] = doc_type
+
+
+def extract_and_parse(
+    pdf_path: str,
+    max_ocr_pages: int = 3,
+    ocr_workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    High-level function:
+        1. Try direct text extraction (pdfplumber), page by page; pages
+           without a usable text layer are OCR'd on their own
+           (listed in "_ocr_pages").
+        2. If no page has text, OCR only the header boxes of a known layout
+           (ocr_layouts.py) and map them straight to fields, else OCR the
+           first N pages (page-parallel when ocr_workers / OCR_WORKERS is
+           greater than 1).
+           Steps 1-2 are served from the OCR cache when this file was
+           already extracted with the same settings.
+        3. Parse fields from the resulting text.
+        4. For WPS/PQR docs, enrich with PQR-specific regex parsing.
+    """
+    if not os.path.isfile(pdf_path):
+        raise FileNotFoundError(pdf_path)
+
+    # 1-2) Direct text extraction, falling back to OCR (cached)
+    extracted = _extract_pages_cached(
+        pdf_path,
+        max_ocr_pages=max_ocr_pages,
+        ocr_workers=ocr_workers,
+        use_cache=use_cache,
+    )
+    source = extracted["source"]
+    template = LAYOUT_TEMPLATES.get(source[4:]) if source.startswith("roi:") else None
+    if template is not None:
+        # 2a) ROI crops map straight to fields; no full-page regex pass
+        fields = template.to_fields(extracted["pages"])
+        fields["_raw_text"] = "\n".join(p.strip() for p in extracted["pages"] if p.strip())
+        fields["_ocr_pages"] = [1]
+        return fields
+    text = _join_pages(extracted["pages"])
+    if source == "ocr":
+        ocr_pages = list(range(1, len(extracted["pages"]) + 1))
+    elif source.startswith("mixed:"):
+        ocr_pages = [int(n) for n in source[6:].split(",") if n]
+    else:
+        ocr_pages = []
+
+    # 3-4) Parse fields from the text (the title classification fills in an undetected type)
+    fields = _fields_from_text(text)
+    _apply_doc_type_hint(fields, extracted.get("doc_type"))
+
+    # Always include raw text (+ which pages had to be OCR'd, if any)
     fields["_raw_text"] = text
+    if ocr_pages:
+        fields["_ocr_pages"] = ocr_pages
 
     return fields
+
+
+# -----------------------------
+# Streaming extraction
+# -----------------------------
+
+# Fields that make a record usable per doc type; iter_extract_and_parse()
+# stops reading pages once all of them are filled.
+MANDATORY_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "wps": ("wps_number", "pqr_number", "process", "code_standard"),
+    "pqr": ("pqr_number", "wps_number", "process", "code_standard"),
+    "wpq": ("welder_name", "welder_id", "wps_number"),
+}
+
+
+class PageResult(NamedTuple):
+    """One step of iter_extract_and_parse()."""
+    page_no: int
+    text: str                # this page's text ("" for skipped pages)
+    source: str              # "text" | "ocr" | "roi:<template>" | "cache"
+    fields: Dict[str, Any]   # fields parsed from all pages so far
+    missing: Tuple[str, ...]  # mandatory fields still empty (all of them while the doc type is unknown)
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+
+def missing_fields(fields: Dict[str, Any], doc_type: Optional[str] = None) -> Tuple[str, ...]:
+    """Mandatory fields of the parsed doc type (else `doc_type`) that are still empty."""
+    doc_type = (fields.get("doc_type") or fields.get("type") or doc_type or "").lower().strip()
+    required = MANDATORY_FIELDS.get(doc_type)
+    if required is None:
+        return ("doc_type",)
+    return tuple(k for k in required if not fields.get(k))
+
+
+def _cached_extract(pdf_path: str, max_ocr_pages: Optional[int]) -> Optional[Dict[str, Any]]:
+    """OCR cache lookup only (streaming never stores partial results)."""
+    cache = get_cache()
+    if cache is None:
+        return None
+    try:
+        entry = cache.get(make_key(file_digest(pdf_path), _ocr_settings(max_ocr_pages)))
+    except Exception as e:
+        print(f"DEBUG: OCR cache lookup failed: {e}")
+        return None
+    if entry is None:
+        return None
+    print(f"DEBUG: OCR cache hit ({entry.source}, {len(entry.pages)} pages)")
+    return {"source": entry.source, "pages": entry.pages, "doc_type": entry.doc_type}
+
+
+def iter_extract_and_parse(
+    pdf_path: str,
+    max_ocr_pages: int = 3,
+    stop_when_complete: bool = True,
+    use_cache: bool = True,
+) -> Iterator[PageResult]:
+    """
+    Streaming extract_and_parse(): yields a PageResult as each page is done,
+    with the fields parsed from every page so far.
+
+    The doc type is classified from the page 1 title first, which picks the
+    mandatory field set and its page budget.
+    Pages are read in order: a dense text layer is used as is, image-only
+    pages are OCR'd one at a time, as _OcrBudget allows. A
+    scanned page 1 of a known layout is first tried with ROI OCR, whose
+    header fields seed the dict. With `stop_when_complete`, iteration ends
+    as soon as MANDATORY_FIELDS of the detected doc type are all filled, so
+    the remaining pages are never extracted or OCR'd. Closing the generator
+    early (e.g. a cancelled GUI load) also skips them.
+
+    With stop_when_complete=False the last result's fields match
+    extract_and_parse() for text and mixed PDFs. A fully scanned PDF goes
+    on to page-by-page OCR after its ROI result (extract_and_parse() stops
+    at ROI) and does not use the OCR process pool.
+    """
+    if not os.path.isfile(pdf_path):
+        raise FileNotFoundError(pdf_path)
+
+    hint: Optional[str] = None  # set after the cache lookup
+
+    def result(page_no: int, page_text: str, source: str, fields: Dict[str, Any]) -> PageResult:
+        _apply_doc_type_hint(fields, hint)
+        missing = missing_fields(fields)
+        print(f"DEBUG: stream page {page_no} ({source}): missing={list(missing)}")
+        return PageResult(page_no, page_text, source, fields, missing)
+
+    extracted = _cached_extract(pdf_path, max_ocr_pages) if use_cache else None
+    if extracted is not None:
+        hint = extracted.get("doc_type")
+        template = LAYOUT_TEMPLATES.get(extracted["source"][4:]) if extracted["source"].startswith("roi:") else None
+        if template is not None:
+            fields = template.to_fields(extracted["pages"])
+            fields["_raw_text"] = "\n".join(p.strip() for p in extracted["pages"] if p.strip())
+            yield result(1, fields["_raw_text"], "cache", fields)
+            return
+        for n in range(1, len(extracted["pages"]) + 1):
+            text = _join_pages(extracted["pages"][:n])
+            fields = _fields_from_text(text)
+            fields["_raw_text"] = text
+            res = result(n, extracted["pages"][n - 1], "cache", fields)
+            yield res
+            if stop_when_complete and res.complete:
+                return
+        return
+
+    hint = classify_document(pdf_path) if _classify_enabled() else None
+    budget = _OcrBudget(max_ocr_pages, hint)
+    try:
+        layer: Iterator[Tuple[str, float]] = _iter_text_layer_pages(pdf_path)
+        first = next(layer, None)
+    except Exception:
+        first = None
+    if first is None:
+        # No readable text layer: OCR the first pages in order
+        ladder = _dpi_ladder()
+        images = _render_for_ocr(pdf_path, dpi=ladder[0], max_pages=budget.scan_limit)
+        pages_iter: Iterator[Tuple[str, float]] = iter(())
+    else:
+        images = None
+        pages_iter = chain([first], layer)
+
+    pages: List[str] = []
+    ocr_pages: List[int] = []
+    seed: Dict[str, Any] = {}
+
+    def page_stream() -> Iterator[Tuple[int, str, str]]:
+        if images is not None:
+            adaptive = len(_dpi_ladder()) > 1
+            for n, img in enumerate(images, 1):
+                yield n, (_ocr_page_adaptive(img, pdf_path, n) if adaptive else _ocr_page(img)), "ocr"
+            return
+        n = 0
+        while True:
+            try:
+                text, cover = next(pages_iter)
+            except StopIteration:
+                return
+            except Exception as e:
+                print(f"DEBUG: text layer read failed after page {n} ({e}); stopping")
+                return
+            n += 1
+            if budget.take(_page_needs_ocr(text, cover)):
+                yield n, _ocr_selected_pages(pdf_path, [n]).get(n, ""), "ocr"
+            else:
+                yield n, text, "text"
+
+    if first is not None and _page_needs_ocr(*first) and _roi_enabled():
+        roi = _extract_roi(pdf_path)
+        if roi is not None:
+            template = LAYOUT_TEMPLATES[roi["source"][4:]]
+            seed = template.to_fields(roi["pages"])
+            roi_text = "\n".join(p.strip() for p in roi["pages"] if p.strip())
+            res = result(1, roi_text, roi["source"], dict(seed, _raw_text=roi_text, _ocr_pages=[1]))
+            yield res
+            if stop_when_complete and res.complete:
+                return
+
+    for n, page_text, source in page_stream():
+        pages.append(page_text)
+        if source == "ocr":
+            ocr_pages.append(n)
+        text = _join_pages(pages)
+        fields = _fields_from_text(text)
+        for k, v in seed.items():
+            if v and not fields.get(k):
+                fields[k] = v
+        fields["_raw_text"] = text
+        if ocr_pages:
+            fields["_ocr_pages"] = list(ocr_pages)
+        res = result(n, page_text, source, fields)
+        yield res
+        if stop_when_complete and res.complete:
+            return
@@ -0,0 +1,359 @@
+"""
+ocr_cache.py
+------------
+Persistent on-disk cache of extracted PDF text for WeldAdmin Pro.
+
+ocr.extract_and_parse() stores the raw text of every page it extracted
+(pdfplumber text layer or Tesseract OCR) here, keyed by:
+
+    SHA-256(file bytes) + OCR settings (dpi, lang, psm, backend, page budget)
+
+so re-imports, "Reload last" in the GUI and /api/parse followed by
+/api/import skip the expensive extraction. Only text is cached; fields are
+always re-parsed, so parser fixes apply to cached documents immediately.
+
+The cache is a single SQLite file with size-based LRU eviction.
+
+Configuration (environment variables):
+    OCR_CACHE=0             disable the cache
+    OCR_CACHE_PATH=...      cache file (default: ocr_cache.db)
+    OCR_CACHE_MAX_MB=200    evict least-recently-used entries above this size
+
+CLI:
+    python ocr_cache.py stats
+    python ocr_cache.py list [--limit 50]
+    python ocr_cache.py show <key-prefix>
+    python ocr_cache.py purge (--all | --older-than DAYS | --file PDF)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CACHE_PATH = "ocr_cache.db"
+DEFAULT_MAX_MB = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_cache (
+    key TEXT PRIMARY KEY,
+    file_sha256 TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    source TEXT NOT NULL,
+    pages TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    doc_type TEXT                   -- page 1 title classification (wps/pqr/wpq), if any
+);
+CREATE INDEX IF NOT EXISTS idx_ocr_cache_lru ON ocr_cache(last_used_at);
+CREATE INDEX IF NOT EXISTS idx_ocr_cache_sha ON ocr_cache(file_sha256);
+"""
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    file_sha256: str
+    settings: Dict[str, Any]
+    source: str  # "text" (pdfplumber) or "ocr"
+    pages: List[str]
+    size_bytes: int
+    created_at: float
+    last_used_at: float
+    hits: int
+    doc_type: Optional[str] = None  # classified before OCR; not derivable from the cached text
+
+
+# -----------------------------
+# Keys
+# -----------------------------
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of the file contents (read in chunks)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def make_key(file_sha256: str, settings: Dict[str, Any]) -> str:
+    """Combine the file hash with the OCR settings into one cache key."""
+    blob = file_sha256 + "|" + json.dumps(settings, sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# Cache store
+# -----------------------------
+
+class OcrCache:
+    """SQLite-backed page-text cache with size-based LRU eviction."""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or os.environ.get("OCR_CACHE_PATH") or DEFAULT_CACHE_PATH
+        if max_bytes is None:
+            try:
+                max_mb = float(os.environ.get("OCR_CACHE_MAX_MB", DEFAULT_MAX_MB))
+            except ValueError:
+                max_mb = DEFAULT_MAX_MB
+            max_bytes = int(max_mb * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(ocr_cache)")}
+            if "doc_type" not in columns:
+                conn.execute("ALTER TABLE ocr_cache ADD COLUMN doc_type TEXT")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation keeps the cache safe to
+        # use from GUI worker threads and OCR processes alike.
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_entry(row) -> CacheEntry:
+        return CacheEntry(
+            key=row[0],
+            file_sha256=row[1],
+            settings=json.loads(row[2]),
+            source=row[3],
+            pages=json.loads(row[4]),
+            size_bytes=row[5],
+            created_at=row[6],
+            last_used_at=row[7],
+            hits=row[8],
+            doc_type=row[9],
+        )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for `key` (and mark it recently used), or None."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT key, file_sha256, settings, source, pages, size_bytes, "
+                "created_at, last_used_at, hits, doc_type FROM ocr_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute(
+                "UPDATE ocr_cache SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), key),
+            )
+        return self._row_to_entry(row)
+
+    def put(
+        self,
+        key: str,
+        file_sha256: str,
+        settings: Dict[str, Any],
+        source: str,
+        pages: List[str],
+        doc_type: Optional[str] = None,
+    ) -> None:
+        """Store the per-page text (and early doc type) for `key`, then enforce the size limit."""
+        pages_json = json.dumps(pages, ensure_ascii=False)
+        size = len(pages_json.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache(key, file_sha256, settings, source, pages, "
+                "size_bytes, created_at, last_used_at, hits, doc_type) VALUES (?,?,?,?,?,?,?,?,0,?)",
+                (key, file_sha256, json.dumps(settings, sort_keys=True), source,
+                 pages_json, size, now, now, doc_type),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Drop least-recently-used entries until the cache fits max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM ocr_cache").fetchone()[0]
+        removed = 0
+        if total <= self.max_bytes:
+            return removed
+        rows = conn.execute(
+            "SELECT key, size_bytes FROM ocr_cache ORDER BY last_used_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM ocr_cache WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            count, total, hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(hits), 0) FROM ocr_cache"
+            ).fetchone()
+            by_source = dict(conn.execute(
+                "SELECT source, COUNT(*) FROM ocr_cache GROUP BY source"
+            ).fetchall())
+        return {
+            "path": os.path.abspath(self.path),
+            "entries": count,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "by_source": by_source,
+        }
+
+    def entries(self, limit: Optional[int] = None) -> List[CacheEntry]:
+        """Entries, most recently used first."""
+        sql = (
+            "SELECT key, file_sha256, settings, source, pages, size_bytes, "
+            "created_at, last_used_at, hits, doc_type FROM ocr_cache ORDER BY last_used_at DESC"
+        )
+        params: tuple = ()
+        if limit:
+            sql += " LIMIT ?"
+            params = (limit,)
+        with self._connect() as conn:
+            return [self._row_to_entry(r) for r in conn.execute(sql, params).fetchall()]
+
+    def find(self, key_prefix: str) -> List[CacheEntry]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, file_sha256, settings, source, pages, size_bytes, "
+                "created_at, last_used_at, hits, doc_type FROM ocr_cache WHERE key LIKE ?",
+                (key_prefix + "%",),
+            ).fetchall()
+        return [self._row_to_entry(r) for r in rows]
+
+    def purge(
+        self,
+        older_than_days: Optional[float] = None,
+        file_sha256: Optional[str] = None,
+    ) -> int:
+        """
+        Delete entries. With no arguments everything is removed; otherwise
+        only entries unused for `older_than_days` and/or for one file hash.
+        """
+        where: List[str] = []
+        params: List[Any] = []
+        if older_than_days is not None:
+            where.append("last_used_at < ?")
+            params.append(time.time() - older_than_days * 86400)
+        if file_sha256:
+            where.append("file_sha256 = ?")
+            params.append(file_sha256)
+        sql = "DELETE FROM ocr_cache"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with self._lock, self._connect() as conn:
+            cur = conn.execute(sql, params)
+            removed = cur.rowcount
+        with self._connect() as conn:
+            conn.execute("VACUUM")
+        return removed
+
+
+_CACHE: Optional[OcrCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("OCR_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_cache() -> Optional[OcrCache]:
+    """Process-wide cache instance, or None when disabled via OCR_CACHE=0."""
+    global _CACHE
+    if not cache_enabled():
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = OcrCache()
+        return _CACHE
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def _fmt_time(ts: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+def _fmt_size(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024.0
+    return str(n)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="WeldAdmin Pro – OCR text cache")
+    parser.add_argument("--path", help="Cache file (default: OCR_CACHE_PATH or ocr_cache.db)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("stats", help="Show entry count, size and hit totals")
+
+    p_list = sub.add_parser("list", help="List entries, most recently used first")
+    p_list.add_argument("--limit", type=int, default=50)
+
+    p_show = sub.add_parser("show", help="Print the cached pages for one entry")
+    p_show.add_argument("key", help="Cache key (or unique prefix)")
+
+    p_purge = sub.add_parser("purge", help="Delete entries")
+    grp = p_purge.add_mutually_exclusive_group(required=True)
+    grp.add_argument("--all", action="store_true", help="Delete every entry")
+    grp.add_argument("--older-than", type=float, metavar="DAYS",
+                     help="Delete entries not used in the last DAYS days")
+    grp.add_argument("--file", metavar="PDF", help="Delete all entries for this file")
+
+    args = parser.parse_args(argv)
+    cache = OcrCache(path=args.path)
+
+    if args.cmd == "stats":
+        st = cache.stats()
+        print(f"Cache:   {st['path']}")
+        print(f"Entries: {st['entries']} ({', '.join(f'{k}={v}' for k, v in st['by_source'].items()) or 'empty'})")
+        print(f"Size:    {_fmt_size(st['size_bytes'])} / {_fmt_size(st['max_bytes'])}")
+        print(f"Hits:    {st['hits']}")
+    elif args.cmd == "list":
+        for e in cache.entries(limit=args.limit):
+            print(
+                f"{e.key[:16]}  {e.source:<4}  pages={len(e.pages):<3} {_fmt_size(e.size_bytes):>9}  "
+                f"hits={e.hits:<4} used={_fmt_time(e.last_used_at)}  file={e.file_sha256[:12]}  "
+                f"{json.dumps(e.settings, sort_keys=True)}"
+            )
+    elif args.cmd == "show":
+        matches = cache.find(args.key)
+        if len(matches) != 1:
+            print(f"{len(matches)} entries match '{args.key}'.")
+            return 1
+        e = matches[0]
+        print(f"Key: {e.key}\nFile SHA-256: {e.file_sha256}\nSource: {e.source}\nDoc type: {e.doc_type or '-'}\nSettings: {e.settings}")
+        for i, page in enumerate(e.pages, 1):
+            print(f"\n----- PAGE {i} -----\n{page}")
+    elif args.cmd == "purge":
+        if args.all:
+            removed = cache.purge()
+        elif args.older_than is not None:
+            removed = cache.purge(older_than_days=args.older_than)
+        else:
+            removed = cache.purge(file_sha256=file_digest(args.file))
+        print(f"Removed {removed} entr{'y' if removed == 1 else 'ies'}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,269 @@
+"""
+ocr_layouts.py
+--------------
+Region-of-interest (ROI) templates for known document layouts.
+
+A scanned WeldTrace export always puts its header values in the same boxes,
+so instead of OCR'ing the whole page and running the regex tables of
+ocr.parse_fields() over it, ocr.extract_and_parse() can:
+
+    1. OCR two thin strips (title + footer) of page 1 at low dpi and
+       identify the layout with identify_layout(),
+    2. crop only the template's boxes from page 1 at full dpi and OCR them
+       in parallel,
+    3. map crop texts straight to field names with LayoutTemplate.to_fields().
+
+Boxes are fractions of the page size (x0, y0, x1, y1), so they do not
+depend on the render dpi. Only the fixed header / joint-design block is
+templated; sections below it flow with their content and are left to the
+full-page parser.
+
+Register extra layouts with register_layout(). Disable ROI OCR with
+OCR_ROI=0.
+
+classify_title() names the document type (WPS / PQR / WPQ) from the title
+strings alone, for any layout; ocr.classify_document() runs it on the top
+band of page 1 (CLASSIFY_BAND) before the expensive extraction pass.
+
+CLI (needs PyMuPDF and a PDF with a text layer, e.g. the original export):
+    python ocr_layouts.py check <file.pdf>    show what each box covers
+"""
+
+import hashlib
+import re
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import fitz  # PyMuPDF (only for the check CLI)  # type: ignore
+except Exception:  # pragma: no cover
+    fitz = None
+
+
+Box = Tuple[float, float, float, float]
+
+# Strips OCR'd by the cheap identification pass (page 1, low dpi)
+TITLE_BOX: Box = (0.05, 0.004, 0.95, 0.029)
+FOOTER_BOX: Box = (0.30, 0.977, 0.75, 0.996)
+# Top band of page 1 searched for a title by classify_title() (any layout)
+CLASSIFY_BAND: Box = (0.0, 0.0, 1.0, 0.12)
+
+# Title strings -> doc type; WPQ first so "...QUALIFICATION RECORD" of a
+# welder record is not taken for a PQR
+DOC_TYPE_TITLES: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    ("WPQ", re.compile(r"WELDER\s*PERFORMANCE\s*QUALIFICATION", re.IGNORECASE)),
+    ("PQR", re.compile(r"PROCEDURE\s*QUALIFICATION\s*RECORD", re.IGNORECASE)),
+    ("WPS", re.compile(r"WELDING\s*PROCEDURE\s*SPECIFICATION", re.IGNORECASE)),
+)
+
+
+class RoiField(NamedTuple):
+    """One templated box: OCR text of `box` becomes fields[key]."""
+    key: str
+    box: Box
+    multiline: bool = False
+    strip_label: Optional["re.Pattern[str]"] = None
+
+
+class LayoutTemplate(NamedTuple):
+    name: str
+    doc_type: str
+    title: "re.Pattern[str]"
+    footer: "re.Pattern[str]"
+    fields: Tuple[RoiField, ...]
+    required: str  # crops are only trusted if this field came out non-empty
+
+    def to_fields(self, texts: List[str]) -> Dict[str, str]:
+        """Map crop texts (in self.fields order) to a parse_fields()-style dict."""
+        out: Dict[str, str] = {"doc_type": self.doc_type, "type": self.doc_type.lower()}
+        for spec, raw in zip(self.fields, texts):
+            value = _clean(raw, spec)
+            if value:
+                out[spec.key] = value
+        if "process" not in out and out.get("designation"):
+            m = _PROCESS_RE.search(out["designation"])
+            if m:
+                out["process"] = m.group(1).upper()
+        return out
+
+
+_PROCESS_RE = re.compile(r"\b(GTAW|SMAW|GMAW|FCAW|SAW|PAW)\b", re.IGNORECASE)
+
+
+def _clean(raw: str, spec: RoiField) -> str:
+    """Collapse the crop text to one line and drop any label OCR'd with it."""
+    value = " ".join((raw or "").split())
+    if spec.strip_label is not None:
+        value = spec.strip_label.sub("", value, count=1)
+    return value.strip(" :|_")
+
+
+def _f(key: str, x0: float, y0: float, x1: float, y1: float, **kw) -> RoiField:
+    return RoiField(key, (x0, y0, x1, y1), **kw)
+
+
+# Labels OCR'd into a value crop (anything before them is border/scan noise)
+_DESIGNATION = re.compile(r"^.{0,12}?\bDesignation\s*", re.IGNORECASE)
+_CERTIFICATE = re.compile(r"^.{0,12}?\bCertificate\s*(?:No\.?|Number)?\s*", re.IGNORECASE)
+_WELDTRACE_FOOTER = re.compile(r"Weld\s*Trace", re.IGNORECASE)
+
+# Value column x-ranges of the WeldTrace header grid
+_COL1 = (0.180, 0.450)
+_COL2 = (0.540, 0.705)
+_COL3 = (0.795, 0.965)
+# Joint design table (right-hand values column)
+_JOINT = (0.780, 0.975)
+
+# Header rows shared by WPS and PQR: (row1 = own number, row2 = other number, row3 = code)
+_ROW1 = (0.098, 0.1135)
+_ROW2 = (0.1135, 0.1275)
+_ROW3 = (0.1275, 0.1415)
+
+
+def _joint_fields() -> Tuple[RoiField, ...]:
+    rows = [
+        ("joint_type", 0.181, 0.1955),
+        ("joint_design", 0.1955, 0.2085),
+        ("surface_prep", 0.2085, 0.2215),
+        ("groove_angle", 0.2215, 0.2345),
+        ("root_face_mm", 0.2345, 0.2475),
+        ("root_gap_mm", 0.2475, 0.2605),
+        ("max_misalignment_mm", 0.2735, 0.2865),
+        ("back_gouging", 0.2865, 0.2995),
+        ("backing", 0.2995, 0.3125),
+    ]
+    return tuple(_f(key, _JOINT[0], y0, _JOINT[1], y1) for key, y0, y1 in rows)
+
+
+def _header_fields(own: str, other: str) -> Tuple[RoiField, ...]:
+    return (
+        _f("company_name", 0.05, 0.027, 0.95, 0.047),
+        _f("designation", 0.05, 0.063, 0.95, 0.091, multiline=True, strip_label=_DESIGNATION),
+        _f(f"{own}_number", _COL1[0], _ROW1[0], _COL1[1], _ROW1[1]),
+        _f(f"{own}_rev", _COL2[0], _ROW1[0], _COL2[1], _ROW1[1]),
+        _f(f"{own}_date", _COL3[0], _ROW1[0], _COL3[1], _ROW1[1]),
+        _f(f"{other}_number", _COL1[0], _ROW2[0], _COL1[1], _ROW2[1]),
+        _f(f"{other}_rev", _COL2[0], _ROW2[0], _COL2[1], _ROW2[1]),
+        _f(f"{other}_date", _COL3[0], _ROW2[0], _COL3[1], _ROW2[1]),
+        _f("code_standard", _COL1[0], _ROW3[0], _COL1[1], _ROW3[1]),
+        _f("construction_code", _COL2[0], _ROW3[0], _COL2[1], _ROW3[1]),
+    )
+
+
+WELDTRACE_WPS = LayoutTemplate(
+    name="weldtrace_wps",
+    doc_type="WPS",
+    title=re.compile(r"WELDING\s+PROCEDURE\s+SPECIFICATION", re.IGNORECASE),
+    footer=_WELDTRACE_FOOTER,
+    fields=_header_fields("wps", "pqr") + _joint_fields(),
+    required="wps_number",
+)
+
+WELDTRACE_PQR = LayoutTemplate(
+    name="weldtrace_pqr",
+    doc_type="PQR",
+    title=re.compile(r"PROCEDURE\s+QUALIFICATION\s+RECORD", re.IGNORECASE),
+    footer=_WELDTRACE_FOOTER,
+    fields=_header_fields("pqr", "wps") + _joint_fields(),
+    required="pqr_number",
+)
+
+WELDTRACE_WPQ = LayoutTemplate(
+    name="weldtrace_wpq",
+    doc_type="WPQ",
+    title=re.compile(r"WELDER\s+PERFORMANCE\s+QUALIFICATION", re.IGNORECASE),
+    footer=_WELDTRACE_FOOTER,
+    fields=(
+        _f("company_name", 0.05, 0.027, 0.95, 0.047),
+        _f("designation", 0.05, 0.063, 0.95, 0.098, multiline=True, strip_label=_DESIGNATION),
+        _f("welder_name", 0.225, 0.119, 0.520, 0.1335),
+        _f("welder_id", 0.225, 0.1335, 0.520, 0.148),
+        _f("stamp_number", 0.225, 0.148, 0.520, 0.1625),
+        _f("wpq_record_no", 0.650, 0.119, 0.970, 0.1335),
+        _f("qualified_to", 0.650, 0.1335, 0.970, 0.148),
+        _f("wps_number", 0.650, 0.148, 0.970, 0.1595),
+        _f("job_knowledge", 0.650, 0.1595, 0.970, 0.1745),
+        _f("test_date", 0.225, 0.183, 0.520, 0.1995),
+        _f("certificate_no", 0.035, 0.959, 0.400, 0.9755, strip_label=_CERTIFICATE),
+    ),
+    required="welder_name",
+)
+
+# name -> template; identify_layout() tries them in registration order
+LAYOUT_TEMPLATES: Dict[str, LayoutTemplate] = {}
+
+
+def register_layout(template: LayoutTemplate) -> None:
+    """Add (or replace) a layout template."""
+    LAYOUT_TEMPLATES[template.name] = template
+
+
+for _t in (WELDTRACE_WPQ, WELDTRACE_PQR, WELDTRACE_WPS):
+    register_layout(_t)
+
+
+def identify_layout(title_text: str, footer_text: str) -> Optional[LayoutTemplate]:
+    """Template whose title and footer patterns both match the OCR'd strips."""
+    for template in LAYOUT_TEMPLATES.values():
+        if template.title.search(title_text or "") and template.footer.search(footer_text or ""):
+            return template
+    return None
+
+
+def classify_title(text: str) -> Optional[str]:
+    """Doc type ("WPS" / "PQR" / "WPQ") whose title string appears in `text`, else None."""
+    for doc_type, pattern in DOC_TYPE_TITLES:
+        if pattern.search(text or ""):
+            return doc_type
+    return None
+
+
+def layouts_signature() -> str:
+    """Short hash of the registered templates (part of the OCR cache key)."""
+    parts = []
+    for t in LAYOUT_TEMPLATES.values():
+        parts.append(repr((t.name, t.doc_type, t.title.pattern, t.footer.pattern, t.required,
+                           [(f.key, f.box, f.multiline) for f in t.fields])))
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def crop_pixels(box: Box, width: int, height: int) -> Tuple[int, int, int, int]:
+    """Fractional box -> integer pixel box for Image.crop()."""
+    x0, y0, x1, y1 = box
+    return (int(x0 * width), int(y0 * height), int(round(x1 * width)), int(round(y1 * height)))
+
+
+# -----------------------------
+# CLI: check boxes against a PDF text layer
+# -----------------------------
+
+def _clip_text(page, box: Box) -> str:
+    r = page.rect
+    x0, y0, x1, y1 = box
+    clip = fitz.Rect(x0 * r.width, y0 * r.height, x1 * r.width, y1 * r.height)
+    return page.get_text("text", clip=clip)
+
+
+def _cmd_check(pdf_path: str) -> int:
+    if fitz is None:
+        print("PyMuPDF is required for 'check'.")
+        return 1
+    with fitz.open(pdf_path) as doc:
+        page = doc[0]
+        title, footer = _clip_text(page, TITLE_BOX), _clip_text(page, FOOTER_BOX)
+        template = identify_layout(title, footer)
+        if template is None:
+            print(f"No layout matched.\n  title:  {' '.join(title.split())!r}\n  footer: {' '.join(footer.split())!r}")
+            return 1
+        texts = [_clip_text(page, spec.box) for spec in template.fields]
+    print(f"Layout: {template.name}")
+    for key, value in template.to_fields(texts).items():
+        print(f"  {key:<22} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "check":
+        sys.exit(_cmd_check(sys.argv[2]))
+    print("Usage: python ocr_layouts.py check <file.pdf>")
+    sys.exit(2)
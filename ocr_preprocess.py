@@ -0,0 +1,245 @@
+"""
+ocr_preprocess.py
+-----------------
+NumPy image preprocessing profiles for OCR (WeldAdmin Pro).
+
+ocr.py's default ("basic") preprocessing is PIL grayscale + sharpen. For
+poor scans a profile can be selected with OCR_PREPROCESS=<name>:
+
+    basic     grayscale + sharpen (PIL; no NumPy needed)
+    otsu      global Otsu binarization
+    sauvola   adaptive Sauvola binarization (uneven lighting, stamps)
+    clean     deskew + Sauvola + removal of table rules and scan borders
+
+All NumPy steps work on 2-D uint8 grayscale arrays (0 = black) and are
+batched: same-sized pages are stacked so histograms, thresholds and line
+detection run once per batch. gray_view() wraps a PyMuPDF grayscale
+pixmap's samples without copying.
+
+NumPy is optional; without it every profile behaves like "basic".
+"""
+
+from typing import Callable, Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None
+
+
+DEFAULT_PROFILE = "basic"
+
+# Tunables (pixels are at the OCR render dpi, ~300)
+SAUVOLA_WINDOW = 33       # local window (px)
+SAUVOLA_K = 0.2
+SAUVOLA_BLOCK = 4         # statistics are computed on BLOCK x BLOCK means
+DESKEW_MAX_ANGLE = 5.0    # degrees searched either side of 0
+DESKEW_STEP = 0.25
+LINE_MIN_FRACTION = 0.12  # a rule is a dark run of >= this fraction of the width/height
+BORDER_MAX_FRACTION = 0.03
+
+
+def available() -> bool:
+    return np is not None
+
+
+def gray_view(pix) -> "np.ndarray":
+    """
+    Zero-copy (H, W) uint8 view of a 1-channel PyMuPDF pixmap.
+
+    The view borrows the pixmap's memory, so keep `pix` alive while it is used.
+    """
+    buf = np.frombuffer(pix.samples_mv, dtype=np.uint8)
+    return buf.reshape(pix.height, pix.stride)[:, : pix.width]
+
+
+# -----------------------------
+# Batched steps: List[(H, W) uint8] -> List[(H, W) uint8]
+# -----------------------------
+
+def _by_shape(pages: Sequence["np.ndarray"]) -> Dict[Tuple[int, int], List[int]]:
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    for i, a in enumerate(pages):
+        groups.setdefault(a.shape, []).append(i)
+    return groups
+
+
+def _batched(fn: Callable[["np.ndarray"], "np.ndarray"]) -> Callable[[Sequence["np.ndarray"]], List["np.ndarray"]]:
+    """Run a (B, H, W) -> (B, H, W) step on same-shape stacks of pages."""
+    def run(pages: Sequence["np.ndarray"]) -> List["np.ndarray"]:
+        out: List["np.ndarray"] = [None] * len(pages)  # type: ignore[list-item]
+        for idx in _by_shape(pages).values():
+            stack = fn(np.stack([pages[i] for i in idx]))
+            for j, i in enumerate(idx):
+                out[i] = stack[j]
+        return out
+    run.__name__ = fn.__name__
+    return run
+
+
+def _otsu_thresholds(stack: "np.ndarray") -> "np.ndarray":
+    """Per-page Otsu threshold for a (B, H, W) stack, from one bincount."""
+    b = stack.shape[0]
+    offsets = (np.arange(b, dtype=np.int64) * 256)[:, None, None]
+    hist = np.bincount((stack + offsets).ravel(), minlength=256 * b).reshape(b, 256).astype(np.float64)
+    levels = np.arange(256, dtype=np.float64)
+    w0 = np.cumsum(hist, axis=1)
+    m0 = np.cumsum(hist * levels, axis=1)
+    total = w0[:, -1:]
+    w1 = total - w0
+    mean0 = m0 / np.maximum(w0, 1)
+    mean1 = (m0[:, -1:] - m0) / np.maximum(w1, 1)
+    between = w0 * w1 * (mean0 - mean1) ** 2
+    return between.argmax(axis=1).astype(np.uint8)
+
+
+@_batched
+def otsu(stack: "np.ndarray") -> "np.ndarray":
+    t = _otsu_thresholds(stack)[:, None, None]
+    return np.where(stack > t, 255, 0).astype(np.uint8)
+
+
+def _box_mean(small: "np.ndarray", radius: int) -> "np.ndarray":
+    """Mean over a (2r+1)^2 window of a (B, h, w) float array via integral images."""
+    b, h, w = small.shape
+    ii = np.zeros((b, h + 1, w + 1), dtype=np.float64)
+    ii[:, 1:, 1:] = small.cumsum(axis=1).cumsum(axis=2)
+    y0 = np.clip(np.arange(h) - radius, 0, h)
+    y1 = np.clip(np.arange(h) + radius + 1, 0, h)
+    x0 = np.clip(np.arange(w) - radius, 0, w)
+    x1 = np.clip(np.arange(w) + radius + 1, 0, w)
+    s = (ii[:, y1][:, :, x1] - ii[:, y0][:, :, x1] - ii[:, y1][:, :, x0] + ii[:, y0][:, :, x0])
+    area = ((y1 - y0)[:, None] * (x1 - x0)[None, :]).astype(np.float64)
+    return s / area
+
+
+@_batched
+def sauvola(stack: "np.ndarray") -> "np.ndarray":
+    """
+    Sauvola: T = m * (1 + k * (s / 128 - 1)) over a local window.
+
+    Local mean / std are computed on BLOCK-averaged pages and expanded back,
+    which keeps memory at a fraction of the page size.
+    """
+    bs = SAUVOLA_BLOCK
+    b, h, w = stack.shape
+    hh, ww = -(-h // bs) * bs, -(-w // bs) * bs
+    padded = np.pad(stack, ((0, 0), (0, hh - h), (0, ww - w)), mode="edge")
+    blocks = padded.reshape(b, hh // bs, bs, ww // bs, bs)
+    mean_b = blocks.mean(axis=(2, 4), dtype=np.float64)
+    sq = blocks.astype(np.uint16)
+    sq *= sq  # 255**2 fits in uint16
+    sq_b = sq.mean(axis=(2, 4), dtype=np.float64)
+    del sq
+    radius = max(1, SAUVOLA_WINDOW // (2 * bs))
+    m = _box_mean(mean_b, radius)
+    sd = np.sqrt(np.maximum(_box_mean(sq_b, radius) - m ** 2, 0.0))
+    t = m * (1.0 + SAUVOLA_K * (sd / 128.0 - 1.0))
+    t = np.repeat(np.repeat(t, bs, axis=1), bs, axis=2)[:, :h, :w]
+    return np.where(stack > t, 255, 0).astype(np.uint8)
+
+
+def _long_runs(dark: "np.ndarray", length: int) -> "np.ndarray":
+    """
+    Mask of pixels inside dark runs of >= `length` along the last axis (B, H, W).
+
+    Running sums are uint16 and allowed to wrap: every difference taken is
+    at most `length` (< 65536), so modular arithmetic gives exact results
+    at a quarter of the memory of int64.
+    """
+    w = dark.shape[-1]
+    if length > w or length >= 1 << 16:
+        return np.zeros_like(dark)
+    cs = np.zeros(dark.shape[:-1] + (w + 1,), dtype=np.uint16)
+    np.cumsum(dark, axis=-1, dtype=np.uint16, out=cs[..., 1:])
+    starts = (cs[..., length:] - cs[..., :-length]) == length  # window [x, x+length) all dark
+    del cs
+    diff = np.zeros(dark.shape[:-1] + (w + 1,), dtype=np.uint16)
+    diff[..., : w - length + 1] += starts
+    diff[..., length:] -= starts
+    return np.cumsum(diff[..., :w], axis=-1, dtype=np.uint16) != 0
+
+
+@_batched
+def remove_lines(stack: "np.ndarray") -> "np.ndarray":
+    """Whiten long horizontal / vertical rules (table grid lines) in binarized pages."""
+    dark = stack < 128
+    h, w = stack.shape[1:]
+    rules = _long_runs(dark, max(2, int(w * LINE_MIN_FRACTION)))
+    rules |= _long_runs(dark.transpose(0, 2, 1), max(2, int(h * LINE_MIN_FRACTION))).transpose(0, 2, 1)
+    out = stack.copy()
+    out[rules] = 255
+    return out
+
+
+@_batched
+def remove_borders(stack: "np.ndarray") -> "np.ndarray":
+    """Whiten mostly-dark bands along the page edges (scanner shadows / black borders)."""
+    out = stack.copy()
+    b, h, w = stack.shape
+    dark = stack < 128
+    mh, mw = max(1, int(h * BORDER_MAX_FRACTION)), max(1, int(w * BORDER_MAX_FRACTION))
+    rows = dark.mean(axis=2) > 0.5  # (B, H)
+    cols = dark.mean(axis=1) > 0.5  # (B, W)
+    for i in range(b):
+        out[i, :mh][rows[i, :mh]] = 255
+        out[i, h - mh:][rows[i, h - mh:]] = 255
+        out[i, :, :mw][:, cols[i, :mw]] = 255
+        out[i, :, w - mw:][:, cols[i, w - mw:]] = 255
+    return out
+
+
+def skew_angle(page: "np.ndarray", sample: int = 4) -> float:
+    """
+    Skew in degrees by projection profiles: the angle whose sheared row
+    histogram of dark pixels is sharpest. All angles are scored at once.
+    """
+    small = page[::sample, ::sample]
+    ys, xs = np.nonzero(small < 128)
+    if ys.size < 50:
+        return 0.0
+    if ys.size > 200_000:
+        keep = np.linspace(0, ys.size - 1, 200_000).astype(np.int64)
+        ys, xs = ys[keep], xs[keep]
+    angles = np.arange(-DESKEW_MAX_ANGLE, DESKEW_MAX_ANGLE + 1e-9, DESKEW_STEP)
+    shear = np.tan(np.radians(angles))[:, None]
+    rows = np.rint(ys[None, :] - xs[None, :] * shear).astype(np.int64)
+    rows -= rows.min()
+    n_rows = int(rows.max()) + 1
+    offsets = (np.arange(len(angles), dtype=np.int64) * n_rows)[:, None]
+    hist = np.bincount((rows + offsets).ravel(), minlength=n_rows * len(angles)).reshape(len(angles), n_rows)
+    score = (hist.astype(np.float64) ** 2).sum(axis=1)
+    return float(angles[int(score.argmax())])
+
+
+def deskew(pages: Sequence["np.ndarray"]) -> List["np.ndarray"]:
+    from PIL import Image
+
+    out = []
+    for page in pages:
+        angle = skew_angle(page)
+        if abs(angle) < DESKEW_STEP:
+            out.append(page)
+            continue
+        img = Image.fromarray(page).rotate(-angle, resample=Image.BILINEAR, fillcolor=255)
+        out.append(np.asarray(img))
+    return out
+
+
+PROFILES: Dict[str, Tuple[Callable[[Sequence["np.ndarray"]], List["np.ndarray"]], ...]] = {
+    "basic": (),
+    "otsu": (otsu,),
+    "sauvola": (sauvola,),
+    "clean": (deskew, sauvola, remove_borders, remove_lines),
+}
+
+
+def preprocess_batch(pages: Sequence["np.ndarray"], profile: str) -> List["np.ndarray"]:
+    """Run a profile's steps over a batch of (H, W) uint8 grayscale pages."""
+    steps = PROFILES.get(profile)
+    if steps is None:
+        raise ValueError(f"unknown preprocessing profile {profile!r} (choose from {', '.join(PROFILES)})")
+    out = list(pages)
+    for step in steps:
+        out = step(out)
+    return out
@@ -0,0 +1,183 @@
+"""
+serve.py
+--------
+Production entry point for the WeldAdmin Pro web app (app.py).
+
+`python app.py` is the development server (one process, reloader, debugger)
+and only listens on 127.0.0.1. This serves the same Flask app on:
+
+  waitress   (default, Windows and Linux) one process, WEB_THREADS request threads
+  gunicorn   (Linux/macOS, when installed) WEB_WORKERS processes, each with
+             WEB_THREADS request threads (gthread workers)
+
+Both are in requirements.txt (gunicorn is skipped on Windows).
+
+Every worker process warms up before it takes requests: the OCR stack is
+imported, Tesseract traineddata is loaded into the warm pool (one instance
+per job worker thread), the OCR cache and DB tables are opened, and the
+job-queue workers and upload sweeper are started. Job-queue SQLite
+connections are kept per thread, so each worker reuses its own connections
+instead of opening one per request (see job_queue.JobQueue._connect).
+
+GET /health reports the process, its server settings, warmup and the job
+queue (503 when the queue DB cannot be read).
+
+Configuration (environment variables; command-line flags win):
+    WEB_HOST=0.0.0.0
+    WEB_PORT=5000
+    WEB_SERVER=waitress    or gunicorn
+    WEB_WORKERS=1          processes (gunicorn only)
+    WEB_THREADS=8          request threads per process
+    WEB_WARM_OCR=1         0 skips loading Tesseract at startup
+
+Usage:
+    python serve.py [--host 0.0.0.0] [--port 5000] [--server waitress|gunicorn]
+                    [--workers 2] [--threads 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional
+
+try:
+    import waitress  # type: ignore
+except Exception:  # pragma: no cover
+    waitress = None
+
+try:
+    from gunicorn.app.base import BaseApplication  # type: ignore
+except Exception:  # pragma: no cover
+    BaseApplication = None
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 5000
+DEFAULT_THREADS = 8
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# -----------------------------
+# Worker warmup
+# -----------------------------
+
+def _warm_ocr() -> int:
+    """Load traineddata into the warm Tesseract pool; returns the instances created."""
+    import ocr
+    from PIL import Image
+
+    pool = ocr._tess_pool()
+    if pool is None:
+        return 0
+    n = min(pool.size, max(1, _env_int("JOB_WORKERS", 2)))
+    blank = Image.new("L", (64, 32), 255)
+    with ExitStack() as stack:
+        # Borrow n at once so n instances get created, not one reused n times
+        apis = [stack.enter_context(pool.api()) for _ in range(n)]
+        for api in apis:
+            api.SetImage(blank)
+            api.GetUTF8Text()
+    return n
+
+
+def warm_worker(app, server: Dict[str, Any]) -> Dict[str, Any]:
+    """Warm this worker process and record it in app.config (read by /health)."""
+    t0 = time.perf_counter()
+    import ocr  # noqa: F401  (imports PyMuPDF / pdfplumber / Tesseract bindings)
+    from ocr_cache import get_cache
+    from weldadmin_import_to_db import ensure_tables
+    from weldadmin_web import _start_job_workers
+
+    warm: Dict[str, Any] = {"tesseract": 0}
+    if os.environ.get("WEB_WARM_OCR", "1") != "0":
+        try:
+            warm["tesseract"] = _warm_ocr()
+        except Exception as e:
+            warm["error"] = str(e)
+            print(f"DEBUG: OCR warmup failed: {e}")
+    get_cache()
+    ensure_tables()
+    _start_job_workers()  # job-queue workers + upload sweeper
+    warm["seconds"] = round(time.perf_counter() - t0, 2)
+
+    app.config["WEB_SERVER"] = dict(server, pid=os.getpid(), started_at=time.time())
+    app.config["WEB_WARMUP"] = warm
+    print(f"DEBUG: worker {os.getpid()} warm in {warm['seconds']:.2f}s "
+          f"({warm['tesseract']} Tesseract instance(s))")
+    return warm
+
+
+# -----------------------------
+# Servers
+# -----------------------------
+
+def _serve_waitress(host: str, port: int, threads: int) -> None:
+    from app import app
+
+    warm_worker(app, {"server": "waitress", "workers": 1, "threads": threads})
+    print(f"Serving on http://{host}:{port} (waitress, {threads} threads)")
+    # channel_timeout: /api/import/batch may stream NDJSON for minutes
+    waitress.serve(app, host=host, port=port, threads=threads, channel_timeout=300)
+
+
+def _serve_gunicorn(host: str, port: int, workers: int, threads: int) -> None:
+    server = {"server": "gunicorn", "workers": workers, "threads": threads}
+
+    class _Gunicorn(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("timeout", 300)
+            # Warm inside each worker after the fork (threads and Tesseract
+            # handles must not be inherited from the arbiter)
+            self.cfg.set("post_worker_init", lambda worker: warm_worker(worker.wsgi, server))
+
+        def load(self):
+            from app import app
+            return app
+
+    print(f"Serving on http://{host}:{port} (gunicorn, {workers} workers x {threads} threads)")
+    _Gunicorn().run()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="WeldAdmin Pro – production web server")
+    parser.add_argument("--host", default=os.environ.get("WEB_HOST", DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=_env_int("WEB_PORT", DEFAULT_PORT))
+    parser.add_argument("--server", choices=("waitress", "gunicorn"), default=os.environ.get("WEB_SERVER"))
+    parser.add_argument("--workers", type=int, default=_env_int("WEB_WORKERS", 1))
+    parser.add_argument("--threads", type=int, default=_env_int("WEB_THREADS", DEFAULT_THREADS))
+    args = parser.parse_args(argv)
+
+    server = args.server
+    if server is None:
+        server = "gunicorn" if args.workers > 1 and BaseApplication is not None else "waitress"
+    workers, threads = max(1, args.workers), max(1, args.threads)
+
+    if server == "gunicorn":
+        if BaseApplication is None:
+            print("gunicorn is not installed (pip install gunicorn; Linux/macOS only).")
+            return 1
+        _serve_gunicorn(args.host, args.port, workers, threads)
+        return 0
+
+    if waitress is None:
+        print("waitress is not installed (pip install waitress).")
+        return 1
+    if workers > 1:
+        print(f"DEBUG: waitress runs one process; ignoring --workers {workers} (use --server gunicorn)")
+    _serve_waitress(args.host, args.port, threads)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+upload_store.py
+---------------
+Content-addressed upload storage for the WeldAdmin Pro web API.
+
+Uploads are streamed to disk in chunks and hashed while they are written
+(nothing is held in memory), then stored under their SHA-256:
+
+    uploads/<sha[:2]>/<sha256>.pdf
+
+so identical uploads share one file and same-named uploads never overwrite
+each other. The web layer uses the hash to hand back the existing job for a
+file that is already queued, running or parsed (no second OCR pass).
+
+A background sweeper keeps uploads/ under a disk quota by deleting the least
+recently uploaded files first (a duplicate upload counts as a use), never
+touching files that queued / running jobs still need. Files saved by name
+before content addressing count toward the quota, and abandoned temp files
+are removed too.
+
+Configuration (environment variables):
+    UPLOAD_QUOTA_MB=500     disk quota for uploads/
+    UPLOAD_MAX_MB=50        largest accepted upload (larger ones get 413)
+    UPLOAD_SWEEP_S=300      seconds between sweeps
+
+CLI:
+    python upload_store.py stats [--root uploads]
+    python upload_store.py sweep [--root uploads] [--quota-mb 500]
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterable, List, Optional
+
+DEFAULT_QUOTA_MB = 500
+DEFAULT_MAX_MB = 50
+DEFAULT_SWEEP_S = 300
+CHUNK_SIZE = 1 << 20
+_TMP_DIR = ".tmp"
+_TMP_MAX_AGE_S = 3600  # temp files older than this belong to dead uploads
+_MIN_AGE_S = 300       # just stored / reused files may be about to be queued
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+@dataclass
+class StoredUpload:
+    sha256: str
+    path: str
+    size: int
+    existed: bool  # identical content was already stored
+
+
+# -----------------------------
+# Store
+# -----------------------------
+
+class UploadStore:
+    """SHA-256 addressed files under one root directory, with an LRU disk quota."""
+
+    def __init__(self, root: str, quota_bytes: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.root = root
+        if quota_bytes is None:
+            quota_bytes = int(_env_number("UPLOAD_QUOTA_MB", DEFAULT_QUOTA_MB) * 1024 * 1024)
+        if max_bytes is None:
+            max_bytes = int(_env_number("UPLOAD_MAX_MB", DEFAULT_MAX_MB) * 1024 * 1024)
+        self.quota_bytes = quota_bytes
+        self.max_bytes = max_bytes
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweep_lock = threading.Lock()
+        os.makedirs(os.path.join(root, _TMP_DIR), exist_ok=True)
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256 + ".pdf")
+
+    def save_stream(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> StoredUpload:
+        """
+        Copy `stream` to a temp file in chunks while hashing it, then move it
+        to its content address (or drop it if that file already exists).
+        Raises UploadTooLarge past max_bytes.
+        """
+        h = hashlib.sha256()
+        size = 0
+        tmp = os.path.join(self.root, _TMP_DIR, uuid.uuid4().hex)
+        try:
+            with open(tmp, "wb") as out:
+                for chunk in iter(lambda: stream.read(chunk_size), b""):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise UploadTooLarge(f"upload exceeds {self.max_bytes // (1024 * 1024)} MB")
+                    h.update(chunk)
+                    out.write(chunk)
+            sha = h.hexdigest()
+            dest = self.path_for(sha)
+            if os.path.exists(dest):
+                os.utime(dest)  # recently used, for the quota sweep
+                return StoredUpload(sha, dest, size, existed=True)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(tmp, dest)  # atomic; a concurrent identical upload writes the same bytes
+            return StoredUpload(sha, dest, size, existed=False)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _files(self) -> List[os.DirEntry]:
+        """Stored uploads, plus flat files saved by name before content addressing."""
+        out: List[os.DirEntry] = []
+        for sub in os.scandir(self.root):
+            if sub.is_file():
+                out.append(sub)
+            elif sub.is_dir() and sub.name != _TMP_DIR and len(sub.name) == 2:
+                out += [e for e in os.scandir(sub.path) if e.is_file()]
+        return out
+
+    def usage(self) -> int:
+        return sum(e.stat().st_size for e in self._files())
+
+    def sweep(self, keep: Iterable[str] = ()) -> int:
+        """
+        Delete stale temp files, then the least recently used uploads until
+        the store fits quota_bytes. Paths in `keep` are never deleted.
+        Returns the number of uploads removed.
+        """
+        with self._sweep_lock:
+            now = time.time()
+            tmp_dir = os.path.join(self.root, _TMP_DIR)
+            for e in os.scandir(tmp_dir):
+                try:
+                    if e.stat().st_mtime < now - _TMP_MAX_AGE_S:
+                        os.remove(e.path)
+                except OSError:
+                    pass
+
+            keep_set = {os.path.abspath(p) for p in keep}
+            entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in self._files()]
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for mtime, size, path in sorted(entries):
+                if total <= self.quota_bytes:
+                    break
+                if os.path.abspath(path) in keep_set or mtime > now - _MIN_AGE_S:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            if removed:
+                print(f"DEBUG: upload sweep removed {removed} file(s); {total / (1024 * 1024):.1f} MB in use")
+            return removed
+
+    def start_sweeper(self, keep: Callable[[], Iterable[str]] = lambda: (), interval_s: Optional[float] = None) -> None:
+        """Sweep every `interval_s` seconds in a daemon thread (idempotent)."""
+        if self._sweeper is not None:
+            return
+        if interval_s is None:
+            interval_s = _env_number("UPLOAD_SWEEP_S", DEFAULT_SWEEP_S)
+
+        def loop():
+            while True:
+                try:
+                    self.sweep(keep())
+                except Exception as e:
+                    print(f"DEBUG: upload sweep failed: {e}")
+                time.sleep(interval_s)
+
+        self._sweeper = threading.Thread(target=loop, name="upload-sweeper", daemon=True)
+        self._sweeper.start()
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="WeldAdmin Pro – upload store")
+    parser.add_argument("--root", default=os.path.join(os.getcwd(), "uploads"))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="Show file count and disk usage")
+    p_sweep = sub.add_parser("sweep", help="Enforce the disk quota now")
+    p_sweep.add_argument("--quota-mb", type=float)
+
+    args = parser.parse_args(argv)
+    quota = int(args.quota_mb * 1024 * 1024) if getattr(args, "quota_mb", None) is not None else None
+    store = UploadStore(args.root, quota_bytes=quota)
+
+    if args.cmd == "stats":
+        files = store._files()
+        print(f"Uploads: {os.path.abspath(store.root)}")
+        print(f"Files:   {len(files)}, {store.usage() / (1024 * 1024):.1f} MB "
+              f"of {store.quota_bytes / (1024 * 1024):.0f} MB quota")
+    elif args.cmd == "sweep":
+        try:
+            from job_queue import get_queue
+            keep = get_queue().active_paths()
+        except Exception:
+            keep = []
+        removed = store.sweep(keep)
+        print(f"Removed {removed} file{'' if removed == 1 else 's'}; {store.usage() / (1024 * 1024):.1f} MB in use.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
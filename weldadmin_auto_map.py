@@ -22,7 +22,14 @@ def parse_pdf(path: str) -> Dict[str, Any]:
     - Uses parser_weldadmin.parse_weldtrace_layout on the raw text
     - Merges the two dicts (parser_weldadmin values win on key clashes)
     """
-    result = extract_and_parse(path)
+    return merge_layout_fields(extract_and_parse(path))
+
+
+def merge_layout_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Second half of parse_pdf(): merge parse_weldtrace_layout() over the
+    fields of an extract_and_parse() / iter_extract_and_parse() result.
+    """
     raw_text = result.get("_raw_text", "") or ""
     extra = parse_weldtrace_layout(raw_text)
 
@@ -221,7 +228,11 @@ def parse_pdf_to_model(path: str) -> Dict[str, Any]:
             "record": { ...mapped fields... }
         }
     """
-    data = parse_pdf(path)
+    return model_from_data(parse_pdf(path))
+
+
+def model_from_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map merged parse data (see parse_pdf) to the {"table", "record"} model."""
     doc_type = (data.get("doc_type") or data.get("type") or "").upper()
 
     if doc_type == "WPS":
@@ -7,6 +7,8 @@ Features:
 - Tabs for WPS / PQR / WPQ records
 - Browse, Parse, Import buttons
 - Background parsing and importing using ThreadPoolExecutor
+- Parse/Preview streams pages (ocr.iter_extract_and_parse): the tab fills in
+  page by page and stops once the key fields are found
 - Status bar and progress indicator
 - Uses your project helper modules:
     - weldadmin_import_to_db.import_pdf_to_db(path)
@@ -15,9 +17,10 @@ Features:
 import os
 import sys
 import concurrent.futures
+import multiprocessing
 from typing import Dict, Any
 
-from PyQt5.QtCore import Qt, QTimer, QSize
+from PyQt5.QtCore import Qt, QTimer, QSize, pyqtSignal
 from PyQt5.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -64,9 +67,10 @@ except Exception as e:
 
 # OCR + parser from ocr.py
 try:
-    from ocr import extract_and_parse
+    from ocr import extract_and_parse, iter_extract_and_parse
 except Exception:
     extract_and_parse = None
+    iter_extract_and_parse = None
 
 
 # Thread pool for background tasks (still used for import)
@@ -118,6 +122,10 @@ class WelcomeDialog(QDialog):
 
 
 class WeldAdminGUI(QMainWindow):
+    # Emitted from the parse worker thread; delivered on the GUI thread
+    page_parsed = pyqtSignal(object)
+    parse_finished = pyqtSignal(object)
+
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
         self.setWindowTitle("WeldAdmin Pro - OCR Import GUI")
@@ -133,6 +141,8 @@ class WeldAdminGUI(QMainWindow):
             print("DEBUG: ensure_tables() failed:", e)
 
         self._build_ui()
+        self.page_parsed.connect(self._on_page_parsed)
+        self.parse_finished.connect(self._on_parse_finished)
         QTimer.singleShot(50, self._show_welcome)
 
     # -------------------------
@@ -423,7 +433,12 @@ class WeldAdminGUI(QMainWindow):
             QMessageBox.warning(self, "No file", "Please select a valid PDF.")
             return
 
-        # Do everything synchronously for now – MUCH simpler to debug
+        # Stream pages on a worker thread; fields fill in as each page is parsed
+        if iter_extract_and_parse:
+            self._set_busy(True)
+            _EXECUTOR.submit(self._stream_parse, path)
+            return
+
         self._set_busy(True)
         try:
             result = self._background_parse(path)
@@ -436,7 +451,9 @@ class WeldAdminGUI(QMainWindow):
             QMessageBox.critical(self, "Parse Error", result.get("error", "Unknown"))
             return
 
-        model = result.get("model", {}) or {}
+        self._show_model(result.get("model", {}) or {}, path)
+
+    def _show_model(self, model: Dict[str, Any], path: str) -> None:
         table = model.get("table")
         record = model.get("record", {}) if isinstance(model, Dict) else {}
 
@@ -462,12 +479,7 @@ class WeldAdminGUI(QMainWindow):
             self.tabs.setCurrentIndex(2)
 
     def _background_parse(self, path: str) -> Dict[str, Any]:
-        """
-        Run OCR + built-in parser.
-
-        Uses doc_type/type/code_standard to decide which tab (wps / pqr / wpq) to populate,
-        and builds a record that matches that tab's fields.
-        """
+        """Run OCR + built-in parser on the whole document (blocking)."""
         if not extract_and_parse:
             return {"ok": False, "error": "OCR module (ocr.py) not available."}
 
@@ -475,139 +487,182 @@ class WeldAdminGUI(QMainWindow):
             print("DEBUG: starting OCR extract_and_parse on", path)
             fields = extract_and_parse(path)
             print("DEBUG: OCR fields:", list(fields.keys()))
-
-            # Shared helpers
-            thickness_text = fields.get("thickness_range_mm", "") or ""
-            tmin, tmax = _parse_range_mm(thickness_text)
-
-            joint_raw = fields.get("joint_type", "") or ""
-            joint_line = joint_raw.splitlines()[0].strip() if joint_raw else ""
-
-            # Decide which table (wps/pqr/wpq) based on multiple hints
-            doc_type_raw = " ".join(
-                [
-                    str(fields.get("doc_type", "")),
-                    str(fields.get("type", "")),
-                    str(fields.get("code_standard", "")),
-                ]
-            ).lower()
-
-            print("DEBUG: doc_type_raw =", doc_type_raw)
-
-            if "pqr" in doc_type_raw:
-                table = "pqr"
-            elif "wpq" in doc_type_raw or "wpqr" in doc_type_raw:
-                table = "wpq"
-            else:
-                table = "wps"
-
-            # Build a record that matches the chosen tab
-            if table == "wps":
-                rec: Dict[str, Any] = {
-                    "doc_type": fields.get("doc_type", ""),
-                    "company_name": fields.get("company_name", ""),
-                    "designation": fields.get("designation", ""),
-
-                    "wps_number": fields.get("wps_number", ""),
-                    "wps_rev": fields.get("wps_rev", ""),
-                    "wps_date": fields.get("wps_date", ""),
-
-                    "pqr_number": fields.get("pqr_number", ""),
-                    "pqr_rev": fields.get("pqr_rev", ""),
-                    "pqr_date": fields.get("pqr_date", ""),
-
-                    "code_standard": fields.get("code_standard", ""),
-                    "construction_code": fields.get("construction_code", ""),
-
-                    "thickness_range_text": thickness_text,
-                    "thickness_min_mm": str(tmin) if tmin is not None else "",
-                    "thickness_max_mm": str(tmax) if tmax is not None else "",
-                    "outside_diameter_range_text": fields.get("outside_diameter_range", "") or fields.get("outside_diameter_range_mm", ""),
-
-                    "joint_type": joint_line,
-                    "joint_design": fields.get("joint_design", ""),
-                    "surface_prep": fields.get("surface_prep", ""),
-                    "groove_angle": fields.get("groove_angle", ""),
-                    "root_face_mm": fields.get("root_face_mm", ""),
-                    "root_gap_mm": fields.get("root_gap_mm", ""),
-                    "max_misalignment_mm": fields.get("max_misalignment_mm", ""),
-                    "back_gouging": fields.get("back_gouging", ""),
-                    "backing": fields.get("backing", ""),
-                    "backing_type": fields.get("backing_type", ""),
-
-                    "process": fields.get("process", ""),
-                    "process_type": fields.get("process_type", ""),
-                    "shielding_gas": fields.get("shielding_gas", ""),
-                    "backing_gas": fields.get("backing_gas", ""),
-                    "preheat_min_c": fields.get("preheat_min_c", ""),
-                    "interpass_max_c": fields.get("interpass_max_c", ""),
-                    "amps_range": fields.get("amps_range", ""),
-                    "volts_range": fields.get("volts_range", ""),
-                    "travel_speed_range_mm_min": fields.get("travel_speed_range_mm_min", ""),
-                    "max_heat_input_kj_mm": fields.get("max_heat_input_kj_mm", ""),
-
-                    "base_material_1_spec": fields.get("base_material_1_spec", ""),
-                    "base_material_2_spec": fields.get("base_material_2_spec", ""),
-                }
-
-            elif table == "pqr":
-                rec = {
-                    "pqr_number": fields.get("pqr_number", ""),
-                    "wps_number": fields.get("wps_number", ""),
-                    "code_standard": fields.get("code_standard", ""),
-                    "pqr_date": fields.get("pqr_date", ""),
-                    "wps_date": fields.get("wps_date", ""),
-                    "process": fields.get("process", ""),
-                    "position": fields.get("position", ""),
-                    "joint_type": joint_line,
-                    "base_material_spec": fields.get("base_material_spec", ""),
-                    "base_material_thickness_mm": fields.get("base_material_thickness_mm", "") or (str(tmax) if tmax is not None else ""),
-                    "welder_name": fields.get("welder_name", ""),
-                    "welder_id": fields.get("welder_id", ""),
-                    "stamp_number": fields.get("stamp_number", ""),
-                    "test_lab": fields.get("test_lab", ""),
-                    "test_report_no": fields.get("test_report_no", ""),
-                }
-
-            else:  # table == "wpq"
-                test_date = (
-                    fields.get("test_date")
-                    or fields.get("pqr_date")
-                    or fields.get("wps_date")
-                    or ""
-                )
-                date_issued = (
-                    fields.get("date_issued")
-                    or (fields.get("wps_date") if fields.get("wps_date") and fields.get("wps_date") != test_date else "")
-                    or fields.get("pqr_date")
-                    or ""
-                )
-
-                rec = {
-                    "certificate_no": fields.get("certificate_no", ""),
-                    "wpq_record_no": fields.get("wpq_record_no", ""),
-                    "welder_name": fields.get("welder_name", ""),
-                    "welder_id": fields.get("welder_id", ""),
-                    "qualified_to": fields.get("qualified_to", ""),
-                    "stamp_number": fields.get("stamp_number", ""),
-                    "wps_number": fields.get("wps_number", ""),
-                    "process": fields.get("process", ""),
-                    "position": fields.get("position", ""),
-                    "base_material_spec": fields.get("base_material_spec", ""),
-                    "test_date": test_date,
-                    "date_issued": date_issued,
-                    "job_knowledge": fields.get("job_knowledge", ""),
-                }
-
-            model = {"table": table, "record": rec}
-            print("DEBUG: model built:", model)
-            return {"ok": True, "model": model}
+            return {"ok": True, "model": self._model_from_fields(fields)}
 
         except Exception as e:
             import traceback
             traceback.print_exc()
             return {"ok": False, "error": f"OCR parse error: {e}"}
 
+    def _model_from_fields(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Uses doc_type/type/code_standard to decide which tab (wps / pqr / wpq) to populate,
+        and builds a record that matches that tab's fields.
+        """
+        # Shared helpers
+        thickness_text = fields.get("thickness_range_mm", "") or ""
+        tmin, tmax = _parse_range_mm(thickness_text)
+
+        joint_raw = fields.get("joint_type", "") or ""
+        joint_line = joint_raw.splitlines()[0].strip() if joint_raw else ""
+
+        # Decide which table (wps/pqr/wpq) based on multiple hints
+        doc_type_raw = " ".join(
+            [
+                str(fields.get("doc_type", "")),
+                str(fields.get("type", "")),
+                str(fields.get("code_standard", "")),
+            ]
+        ).lower()
+
+        print("DEBUG: doc_type_raw =", doc_type_raw)
+
+        if "pqr" in doc_type_raw:
+            table = "pqr"
+        elif "wpq" in doc_type_raw or "wpqr" in doc_type_raw:
+            table = "wpq"
+        else:
+            table = "wps"
+
+        # Build a record that matches the chosen tab
+        if table == "wps":
+            rec: Dict[str, Any] = {
+                "doc_type": fields.get("doc_type", ""),
+                "company_name": fields.get("company_name", ""),
+                "designation": fields.get("designation", ""),
+
+                "wps_number": fields.get("wps_number", ""),
+                "wps_rev": fields.get("wps_rev", ""),
+                "wps_date": fields.get("wps_date", ""),
+
+                "pqr_number": fields.get("pqr_number", ""),
+                "pqr_rev": fields.get("pqr_rev", ""),
+                "pqr_date": fields.get("pqr_date", ""),
+
+                "code_standard": fields.get("code_standard", ""),
+                "construction_code": fields.get("construction_code", ""),
+
+                "thickness_range_text": thickness_text,
+                "thickness_min_mm": str(tmin) if tmin is not None else "",
+                "thickness_max_mm": str(tmax) if tmax is not None else "",
+                "outside_diameter_range_text": fields.get("outside_diameter_range", "") or fields.get("outside_diameter_range_mm", ""),
+
+                "joint_type": joint_line,
+                "joint_design": fields.get("joint_design", ""),
+                "surface_prep": fields.get("surface_prep", ""),
+                "groove_angle": fields.get("groove_angle", ""),
+                "root_face_mm": fields.get("root_face_mm", ""),
+                "root_gap_mm": fields.get("root_gap_mm", ""),
+                "max_misalignment_mm": fields.get("max_misalignment_mm", ""),
+                "back_gouging": fields.get("back_gouging", ""),
+                "backing": fields.get("backing", ""),
+                "backing_type": fields.get("backing_type", ""),
+
+                "process": fields.get("process", ""),
+                "process_type": fields.get("process_type", ""),
+                "shielding_gas": fields.get("shielding_gas", ""),
+                "backing_gas": fields.get("backing_gas", ""),
+                "preheat_min_c": fields.get("preheat_min_c", ""),
+                "interpass_max_c": fields.get("interpass_max_c", ""),
+                "amps_range": fields.get("amps_range", ""),
+                "volts_range": fields.get("volts_range", ""),
+                "travel_speed_range_mm_min": fields.get("travel_speed_range_mm_min", ""),
+                "max_heat_input_kj_mm": fields.get("max_heat_input_kj_mm", ""),
+
+                "base_material_1_spec": fields.get("base_material_1_spec", ""),
+                "base_material_2_spec": fields.get("base_material_2_spec", ""),
+            }
+
+        elif table == "pqr":
+            rec = {
+                "pqr_number": fields.get("pqr_number", ""),
+                "wps_number": fields.get("wps_number", ""),
+                "code_standard": fields.get("code_standard", ""),
+                "pqr_date": fields.get("pqr_date", ""),
+                "wps_date": fields.get("wps_date", ""),
+                "process": fields.get("process", ""),
+                "position": fields.get("position", ""),
+                "joint_type": joint_line,
+                "base_material_spec": fields.get("base_material_spec", ""),
+                "base_material_thickness_mm": fields.get("base_material_thickness_mm", "") or (str(tmax) if tmax is not None else ""),
+                "welder_name": fields.get("welder_name", ""),
+                "welder_id": fields.get("welder_id", ""),
+                "stamp_number": fields.get("stamp_number", ""),
+                "test_lab": fields.get("test_lab", ""),
+                "test_report_no": fields.get("test_report_no", ""),
+            }
+
+        else:  # table == "wpq"
+            test_date = (
+                fields.get("test_date")
+                or fields.get("pqr_date")
+                or fields.get("wps_date")
+                or ""
+            )
+            date_issued = (
+                fields.get("date_issued")
+                or (fields.get("wps_date") if fields.get("wps_date") and fields.get("wps_date") != test_date else "")
+                or fields.get("pqr_date")
+                or ""
+            )
+
+            rec = {
+                "certificate_no": fields.get("certificate_no", ""),
+                "wpq_record_no": fields.get("wpq_record_no", ""),
+                "welder_name": fields.get("welder_name", ""),
+                "welder_id": fields.get("welder_id", ""),
+                "qualified_to": fields.get("qualified_to", ""),
+                "stamp_number": fields.get("stamp_number", ""),
+                "wps_number": fields.get("wps_number", ""),
+                "process": fields.get("process", ""),
+                "position": fields.get("position", ""),
+                "base_material_spec": fields.get("base_material_spec", ""),
+                "test_date": test_date,
+                "date_issued": date_issued,
+                "job_knowledge": fields.get("job_knowledge", ""),
+            }
+
+        model = {"table": table, "record": rec}
+        print("DEBUG: model built:", model)
+        return model
+
+    def _stream_parse(self, path: str) -> None:
+        """
+        Worker thread: stream pages from iter_extract_and_parse and emit a
+        partial model per page (Qt queues the signals to the GUI thread).
+        """
+        try:
+            print("DEBUG: starting streaming parse on", path)
+            for res in iter_extract_and_parse(path):
+                self.page_parsed.emit({
+                    "path": path,
+                    "page": res.page_no,
+                    "source": res.source,
+                    "missing": list(res.missing),
+                    "model": self._model_from_fields(res.fields),
+                })
+            self.parse_finished.emit({"ok": True, "path": path})
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            self.parse_finished.emit({"ok": False, "path": path, "error": f"OCR parse error: {e}"})
+
+    def _on_page_parsed(self, update: Dict[str, Any]) -> None:
+        self._show_model(update["model"], update["path"])
+        missing = update["missing"]
+        self.status.showMessage(
+            f"Page {update['page']} ({update['source']}) parsed"
+            + (f" - still looking for: {', '.join(missing)}" if missing else " - all key fields found")
+        )
+
+    def _on_parse_finished(self, result: Dict[str, Any]) -> None:
+        self._set_busy(False)
+        if not result.get("ok"):
+            QMessageBox.critical(self, "Parse Error", result.get("error", "Unknown"))
+            return
+        table = self.current_model.get("table")
+        self.status.showMessage(f"Parsed as {table.upper() if table else 'unknown'}", 5000)
+
     def on_import_clicked(self) -> None:
         path = self.pdf_path_edit.text().strip()
         if not path or not os.path.isfile(path):
@@ -707,6 +762,8 @@ class WeldAdminGUI(QMainWindow):
 
 
 def main() -> None:
+    # Needed for the OCR process pool (OCR_WORKERS > 1) in frozen builds
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = WeldAdminGUI()
     window.show()
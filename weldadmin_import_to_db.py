@@ -7,16 +7,28 @@ Uses weldadmin_auto_map.parse_pdf_to_model(...) to:
   - detect document type (WPS / PQR / WPQ)
   - build a clean record dict aligned with GUI tabs
   - insert or replace into SQLite tables: wps, pqr, wpq
+
+Every import path (GUI, web API, CLI) goes through get_connection(): one
+pooled connection per thread and DB file, opened once in WAL mode with
+synchronous=NORMAL and a busy_timeout, so concurrent importers wait for
+each other instead of failing with "database is locked". ensure_tables()
+checks the schema once per process and DB file.
+
+Configuration (environment variables):
+    DB_BUSY_TIMEOUT_MS=5000   how long a writer waits for the DB lock
 """
 
 import os
 import sqlite3
-from typing import Dict, Any
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
 
 from weldadmin_auto_map import parse_pdf_to_model
 
 
 DB_PATH = "weldadmin.db"  # change if you want a different location/name
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
 
 # -------------------------------------------------
 # Column order (excluding primary key "id")
@@ -182,6 +194,63 @@ WPQ_COL_TYPES = {
     "job_knowledge": "TEXT",
 }
 
+# ---------- Connections ----------
+
+_LOCAL = threading.local()
+_SCHEMA_READY: set = set()  # DB files whose tables ensure_tables() already checked
+_SCHEMA_LOCK = threading.Lock()
+
+
+def _db_file() -> str:
+    # DB_PATH may be changed at runtime (and may be relative to the cwd)
+    return os.path.abspath(DB_PATH)
+
+
+def _open_connection(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=DB_BUSY_TIMEOUT_MS / 1000)
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL; no fsync per commit
+    return conn
+
+
+def get_connection() -> sqlite3.Connection:
+    """This thread's pooled connection to DB_PATH (opened on first use, kept open)."""
+    conns = getattr(_LOCAL, "conns", None)
+    if conns is None or _LOCAL.pid != os.getpid():
+        # First use in this thread, or a forked process: never share a parent's handle
+        conns = _LOCAL.conns = {}
+        _LOCAL.pid = os.getpid()
+    path = _db_file()
+    conn = conns.get(path)
+    if conn is None:
+        conn = conns[path] = _open_connection(path)
+    return conn
+
+
+def close_connection() -> None:
+    """Close this thread's pooled connections (e.g. before deleting the DB file)."""
+    for conn in (getattr(_LOCAL, "conns", None) or {}).values():
+        conn.close()
+    _LOCAL.conns = {}
+    _LOCAL.pid = os.getpid()
+
+
+@contextmanager
+def transaction(conn: Optional[sqlite3.Connection] = None) -> Iterator[sqlite3.Cursor]:
+    """Cursor on the pooled (or given) connection; commits on success, rolls back on error."""
+    conn = conn or get_connection()
+    cur = conn.cursor()
+    try:
+        yield cur
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
 # ---------- Helpers for schema management ----------
 
 
@@ -218,17 +287,19 @@ def _ensure_table_columns(cur: sqlite3.Cursor, table: str, columns: Dict[str, st
 # ---------- Table setup ----------
 
 
-def ensure_tables() -> None:
-    """Create or upgrade WPS / PQR / WPQ tables as needed."""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    _ensure_table_columns(cur, "wps", WPS_COL_TYPES)
-    _ensure_table_columns(cur, "pqr", PQR_COL_TYPES)
-    _ensure_table_columns(cur, "wpq", WPQ_COL_TYPES)
-
-    conn.commit()
-    conn.close()
+def ensure_tables(force: bool = False) -> None:
+    """Create or upgrade WPS / PQR / WPQ tables as needed (checked once per DB file)."""
+    path = _db_file()
+    if not force and path in _SCHEMA_READY:
+        return
+    with _SCHEMA_LOCK:
+        if not force and path in _SCHEMA_READY:
+            return
+        with transaction() as cur:
+            _ensure_table_columns(cur, "wps", WPS_COL_TYPES)
+            _ensure_table_columns(cur, "pqr", PQR_COL_TYPES)
+            _ensure_table_columns(cur, "wpq", WPQ_COL_TYPES)
+        _SCHEMA_READY.add(path)
 
 
 # ---------- Import logic ----------
@@ -274,7 +345,11 @@ def import_pdf_to_db(pdf_path: str) -> Dict[str, Any]:
     Returns the model dict:
         { "table": str | None, "record": dict }
     """
-    model = parse_pdf_to_model(pdf_path)
+    return save_model(parse_pdf_to_model(pdf_path), pdf_path)
+
+
+def save_model(model: Dict[str, Any], pdf_path: str = "") -> Dict[str, Any]:
+    """Insert/update an already parsed model (see parse_pdf_to_model); returns it."""
     table = model["table"]
     rec = model["record"]
 
@@ -282,23 +357,39 @@ def import_pdf_to_db(pdf_path: str) -> Dict[str, Any]:
         print("⚠️ Unknown or unsupported document type. Not saving to DB.")
         return model
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    if table == "wps":
-        _insert_generic(cur, "wps", WPS_COL_ORDER, rec)
-    elif table == "pqr":
-        _insert_generic(cur, "pqr", PQR_COL_ORDER, rec)
-    elif table == "wpq":
-        _insert_generic(cur, "wpq", WPQ_COL_ORDER, rec)
-
-    conn.commit()
-    conn.close()
+    with transaction() as cur:
+        if table == "wps":
+            _insert_generic(cur, "wps", WPS_COL_ORDER, rec)
+        elif table == "pqr":
+            _insert_generic(cur, "pqr", PQR_COL_ORDER, rec)
+        elif table == "wpq":
+            _insert_generic(cur, "wpq", WPQ_COL_ORDER, rec)
 
     print(f"✅ Imported '{pdf_path}' as {table.upper()} into '{DB_PATH}'.")
     return model
 
 
+_COL_ORDER_BY_TABLE = {"wps": WPS_COL_ORDER, "pqr": PQR_COL_ORDER, "wpq": WPQ_COL_ORDER}
+
+
+def save_models(models: List[Dict[str, Any]], conn: Optional[sqlite3.Connection] = None) -> int:
+    """
+    Insert/update several parsed models in ONE transaction (batch import).
+    Models of unknown type are skipped. Uses this thread's pooled connection
+    unless `conn` is given; on error the whole group is rolled back and
+    re-raised. Returns the number of records written.
+    """
+    written = 0
+    with transaction(conn) as cur:
+        for model in models:
+            col_order = _COL_ORDER_BY_TABLE.get(model.get("table") or "")
+            if col_order is None:
+                continue
+            _insert_generic(cur, model["table"], col_order, model["record"])
+            written += 1
+    return written
+
+
 # ---------- CLI entry point ----------
 
 
@@ -1,16 +1,159 @@
 # weldadmin_web.py
 # Flask blueprint for the WeldAdmin Pro web UI/API
+#
+# /api/parse and /api/import queue the upload as a background job (see
+# job_queue.py) and answer 202 with its id at once; poll GET /api/jobs/<id>
+# for status, per-page progress and, when done, the same payload the
+# endpoints used to return inline ({"ok": true, "parsed"|"imported": ...}).
+#
+# Uploads are streamed to disk while being hashed and stored under their
+# SHA-256 (see upload_store.py): either a multipart "file" field, or the raw
+# PDF as the request body (Content-Type: application/pdf, name in
+# ?filename= / X-Filename), which is never parsed or buffered by Flask.
+# Re-uploading a file that is already queued / running (or, for parse,
+# already parsed) returns that job instead of OCR'ing it again.
+#
+# /api/import/batch takes many files and/or zip archives in one request and
+# streams NDJSON progress while a thread pool parses them and the records
+# are committed in groups of BATCH_COMMIT_EVERY (pooled SQLite connection).
 
-from flask import Blueprint, render_template, jsonify, request
+from flask import Blueprint, Response, render_template, jsonify, request, stream_with_context, url_for
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
 import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zipfile
 
-from weldadmin_auto_map import parse_pdf_to_model
-from weldadmin_import_to_db import import_pdf_to_db
+from job_queue import get_queue
+from ocr import extract_and_parse, page_progress
+from weldadmin_auto_map import merge_layout_fields, model_from_data, parse_pdf_to_model
+from weldadmin_import_to_db import ensure_tables, get_connection, save_model, save_models
+from upload_store import UploadStore, UploadTooLarge
 
 bp = Blueprint("weldadmin", __name__, template_folder="templates")
 
 UPLOAD_FOLDER = os.path.join(os.getcwd(), "uploads")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+_uploads = UploadStore(UPLOAD_FOLDER)
+
+_RAW_UPLOAD_TYPES = ("application/pdf", "application/octet-stream")
+_ZIP_TYPES = ("application/zip", "application/x-zip-compressed")
+
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "2"))
+BATCH_COMMIT_EVERY = int(os.environ.get("BATCH_COMMIT_EVERY", "25"))
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", "1000"))
+BATCH_MAX_MB = float(os.environ.get("BATCH_MAX_MB", "500"))  # whole request body
+
+
+# ---------- Background jobs ----------
+
+
+def _parse_with_progress(path, report):
+    """extract_and_parse + model mapping, reporting each page as its text is ready."""
+    pages = []
+
+    def on_page(page_no, source):
+        pages.append({"page": page_no, "source": source})
+        report({"stage": "extracting", "pages_done": len(pages), "pages": pages})
+
+    report({"stage": "extracting", "pages_done": 0, "pages": pages})
+    with page_progress(on_page):
+        fields = extract_and_parse(path)
+    report({"stage": "parsing", "pages_done": len(pages), "pages": pages})
+    return model_from_data(merge_layout_fields(fields)), pages
+
+
+def _parse_job(path, report):
+    model, _ = _parse_with_progress(path, report)
+    return {"ok": True, "parsed": model}
+
+
+def _import_job(path, report):
+    model, pages = _parse_with_progress(path, report)
+    report({"stage": "storing", "pages_done": len(pages), "pages": pages})
+    ensure_tables()
+    return {"ok": True, "imported": save_model(model, path)}
+
+
+_jobs = get_queue()
+_jobs.register("parse", _parse_job)
+_jobs.register("import", _import_job)
+
+
+# Upload paths of /api/import/batch requests still being parsed (path ->
+# number of batches using it); batch files never become jobs, so the quota
+# sweeper must be told about them separately
+_batch_paths = {}
+_batch_paths_lock = threading.Lock()
+
+
+def _hold_batch_paths(paths):
+    with _batch_paths_lock:
+        for p in paths:
+            _batch_paths[p] = _batch_paths.get(p, 0) + 1
+
+
+def _release_batch_paths(paths):
+    with _batch_paths_lock:
+        for p in paths:
+            n = _batch_paths.get(p, 0) - 1
+            if n > 0:
+                _batch_paths[p] = n
+            else:
+                _batch_paths.pop(p, None)
+
+
+def _in_use_paths():
+    """Uploads the sweeper must keep: queued / running jobs and in-flight batches."""
+    with _batch_paths_lock:
+        batch = list(_batch_paths)
+    return _jobs.active_paths() + batch
+
+
+@bp.before_app_request
+def _start_job_workers():
+    # Started on the first request so only the serving process runs workers
+    # (not the debug reloader's parent); both are idempotent
+    _jobs.start()
+    _uploads.start_sweeper(keep=_in_use_paths)
+
+
+def _upload_stream():
+    """(stream, filename) of the upload: raw PDF body or multipart "file" field."""
+    if request.mimetype in _RAW_UPLOAD_TYPES:
+        filename = request.args.get("filename") or request.headers.get("X-Filename") or "upload.pdf"
+        return request.stream, filename
+    if "file" not in request.files:
+        return None, None
+    f = request.files["file"]
+    return f.stream, f.filename
+
+
+def _enqueue(kind):
+    if (request.content_length or 0) > _uploads.max_bytes:
+        return jsonify({"error": f"upload exceeds {_uploads.max_bytes // (1024 * 1024)} MB"}), 413
+    stream, filename = _upload_stream()
+    if stream is None:
+        return jsonify({"error": "no file uploaded"}), 400
+    try:
+        stored = _uploads.save_stream(stream)
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+
+    # Same content already queued / running (or parsed): hand back that job
+    job = _jobs.find_reusable(kind, stored.sha256, include_done=(kind == "parse"))
+    if job is not None:
+        job_id, status = job.id, job.status
+    else:
+        job_id = _jobs.submit(kind, stored.path, filename=filename, sha256=stored.sha256)
+        status = "queued"
+    status_url = url_for("weldadmin.api_job", job_id=job_id)
+    body = {"ok": True, "job_id": job_id, "status": status, "status_url": status_url,
+            "sha256": stored.sha256, "deduplicated": job is not None}
+    return jsonify(body), (200 if status == "done" else 202), {"Location": status_url}
 
 
 @bp.route("/")
@@ -21,29 +164,239 @@ def home():
 
 @bp.route("/api/parse", methods=["POST"])
 def api_parse():
-    """Parse PDF without saving to DB"""
-    if "file" not in request.files:
-        return jsonify({"error": "no file uploaded"}), 400
-
-    f = request.files["file"]
-    filename = f.filename
-    saved_path = os.path.join(UPLOAD_FOLDER, filename)
-    f.save(saved_path)
-
-    result = parse_pdf_to_model(saved_path)
-    return jsonify({"ok": True, "parsed": result})
+    """Parse PDF without saving to DB (background job)"""
+    return _enqueue("parse")
 
 
 @bp.route("/api/import", methods=["POST"])
 def api_import():
-    """Parse AND import to DB"""
-    if "file" not in request.files:
+    """Parse AND import to DB (background job)"""
+    return _enqueue("import")
+
+
+@bp.route("/api/jobs/<job_id>", methods=["GET"])
+def api_job(job_id):
+    """Job status: queued | running | done | failed, per-page progress, result or error"""
+    job = _jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown or expired job"}), 404
+    body = job.to_dict()
+    if job.status == "queued":
+        body["queue_position"] = _jobs.queue_position(job)
+    return jsonify(body)
+
+
+# ---------- Batch import ----------
+
+
+def _is_zip(name, stream):
+    if (name or "").lower().endswith(".zip"):
+        return True
+    head = stream.read(4)
+    stream.seek(0)
+    return head == b"PK\x03\x04"
+
+
+def _zip_members(zf):
+    """(member name, open member) for every PDF in the archive, skipping folders / macOS metadata."""
+    for info in zf.infolist():
+        name = info.filename
+        if info.is_dir() or name.startswith("__MACOSX/") or not name.lower().endswith(".pdf"):
+            continue
+        if info.file_size > _uploads.max_bytes:
+            yield name, UploadTooLarge(f"{info.file_size // (1024 * 1024)} MB exceeds the upload limit")
+            continue
+        yield name, zf.open(info)
+
+
+def _expand_upload(name, stream):
+    """(name, stream) for a PDF upload, or for each PDF inside a zip archive."""
+    if not _is_zip(name, stream):
+        yield name, stream
+        return
+    try:
+        with zipfile.ZipFile(stream) as zf:
+            for member, opened in _zip_members(zf):
+                yield f"{name}/{member}", opened
+    except zipfile.BadZipFile as e:
+        yield name, e
+
+
+def _spool_body(out):
+    """Copy the raw request body to `out` in chunks; UploadTooLarge past BATCH_MAX_MB."""
+    limit = int(BATCH_MAX_MB * 1024 * 1024)
+    size = 0
+    for chunk in iter(lambda: request.stream.read(1 << 20), b""):
+        size += len(chunk)
+        if size > limit:
+            raise UploadTooLarge(f"batch exceeds {BATCH_MAX_MB:g} MB")
+        out.write(chunk)
+    out.seek(0)
+
+
+def _batch_sources():
+    """(name, stream) per uploaded file; zip archives are expanded into their PDFs."""
+    if request.mimetype in _ZIP_TYPES:
+        # Raw zip body: zipfile needs a seekable file, so spool it to disk
+        # first (ZipFile does not close a file object it was given)
+        with tempfile.TemporaryFile(dir=os.path.join(UPLOAD_FOLDER, ".tmp")) as spool:
+            _spool_body(spool)
+            yield from _expand_upload(request.args.get("filename") or "upload.zip", spool)
+    elif request.mimetype in _RAW_UPLOAD_TYPES:
+        # Raw PDF body (not seekable, so not sniffed for zip)
+        stream, filename = _upload_stream()
+        yield filename, stream
+    else:
+        for f in request.files.getlist("file"):
+            yield from _expand_upload(f.filename, f.stream)
+
+
+def _store_batch():
+    """
+    Stream every source into the upload store: ([(name, StoredUpload)], [(name, error)]).
+    Stored paths are held against the quota sweep (see _hold_batch_paths);
+    the caller releases them.
+    """
+    stored, rejected = [], []
+    try:
+        _store_sources(stored, rejected)
+    except BaseException:
+        _release_batch_paths([up.path for _, up in stored])
+        raise
+    return stored, rejected
+
+
+def _store_sources(stored, rejected):
+    for name, src in _batch_sources():
+        if len(stored) >= BATCH_MAX_FILES:
+            rejected.append((name, f"batch limit of {BATCH_MAX_FILES} files reached"))
+            continue
+        if isinstance(src, Exception):
+            rejected.append((name, str(src)))
+            continue
+        try:
+            up = _uploads.save_stream(src)
+            _hold_batch_paths([up.path])
+            stored.append((name, up))
+        except UploadTooLarge as e:
+            rejected.append((name, str(e)))
+        finally:
+            if hasattr(src, "close") and src is not request.stream:
+                src.close()
+
+
+_BATCH_NUMBER_FIELD = {"wps": "wps_number", "pqr": "pqr_number", "wpq": "stamp_number"}
+
+
+def _ndjson(event, **fields):
+    return json.dumps(dict(event=event, **fields), ensure_ascii=False, default=str) + "\n"
+
+
+@bp.route("/api/import/batch", methods=["POST"])
+def api_import_batch():
+    """
+    Parse AND import many PDFs: multipart "file" fields (PDFs and/or .zip
+    archives) or a raw zip body (Content-Type: application/zip). Bodies over
+    BATCH_MAX_MB get 413; a file / zip member over UPLOAD_MAX_MB is rejected.
+
+    Streams NDJSON, one event per line:
+        accepted  {files, rejected}                    after the upload is stored
+        rejected  {file, error}                        not a readable PDF / too large
+        duplicate {file, same_as}                      identical content earlier in the batch
+        parsed    {file, table, number}                parsed, waiting for its group commit
+        skipped   {file, reason}                       unknown document type
+        failed    {file, error}                        parse or commit error
+        committed {count, total}                       one grouped transaction done
+        done      {imported, failed, skipped, duplicates, seconds}
+    """
+    t0 = time.perf_counter()
+    if (request.content_length or 0) > BATCH_MAX_MB * 1024 * 1024:
+        return jsonify({"error": f"batch exceeds {BATCH_MAX_MB:g} MB"}), 413
+    try:
+        stored, rejected = _store_batch()
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    held = [up.path for _, up in stored]
+    released = []
+
+    def release():
+        # From the generator's finally, or on response close if it never ran
+        if not released:
+            released.append(True)
+            _release_batch_paths(held)
+
+    if not stored and not rejected:
         return jsonify({"error": "no file uploaded"}), 400
 
-    f = request.files["file"]
-    filename = f.filename
-    saved_path = os.path.join(UPLOAD_FOLDER, filename)
-    f.save(saved_path)
+    def generate():
+        yield _ndjson("accepted", files=len(stored), rejected=len(rejected))
+        for name, error in rejected:
+            yield _ndjson("rejected", file=name, error=error)
+
+        first_by_sha = {}
+        unique = []
+        duplicates = 0
+        for name, up in stored:
+            if up.sha256 in first_by_sha:
+                duplicates += 1
+                yield _ndjson("duplicate", file=name, same_as=first_by_sha[up.sha256])
+                continue
+            first_by_sha[up.sha256] = name
+            unique.append((name, up))
+
+        ensure_tables()
+        conn = get_connection()  # this request thread's pooled connection
+        pool = ThreadPoolExecutor(max_workers=max(1, BATCH_WORKERS), thread_name_prefix="batch-import")
+        group = []
+        counts = {"imported": 0, "failed": 0, "skipped": 0}
+
+        def commit_group():
+            names = [name for name, _ in group]
+            models = [model for _, model in group]
+            group.clear()
+            try:
+                counts["imported"] += save_models(models, conn)
+            except sqlite3.Error as e:
+                counts["failed"] += len(names)
+                return [_ndjson("failed", file=name, error=f"commit failed: {e}") for name in names]
+            return [_ndjson("committed", count=len(names), total=counts["imported"])]
+
+        try:
+            futures = {pool.submit(parse_pdf_to_model, up.path): name for name, up in unique}
+            for fut in as_completed(futures):
+                name = futures[fut]
+                try:
+                    model = fut.result()
+                except Exception as e:
+                    counts["failed"] += 1
+                    yield _ndjson("failed", file=name, error=str(e) or e.__class__.__name__)
+                    continue
+                if model.get("table") is None:
+                    counts["skipped"] += 1
+                    yield _ndjson("skipped", file=name, reason="unknown document type")
+                    continue
+                number = (model.get("record") or {}).get(_BATCH_NUMBER_FIELD[model["table"]], "")
+                group.append((name, model))
+                yield _ndjson("parsed", file=name, table=model["table"], number=number)
+                if len(group) >= BATCH_COMMIT_EVERY:
+                    yield from commit_group()
+            if group:
+                yield from commit_group()
+            yield _ndjson("done", duplicates=duplicates, seconds=round(time.perf_counter() - t0, 2), **counts)
+        finally:
+            # Client gone: drop queued parses, keep what was already parsed
+            pool.shutdown(wait=False, cancel_futures=True)
+            if group:
+                try:
+                    save_models([model for _, model in group], conn)
+                except sqlite3.Error:
+                    pass
+            release()
 
-    result = import_pdf_to_db(saved_path)
-    return jsonify({"ok": True, "imported": result})
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    response.call_on_close(release)
+    return response